@@ -0,0 +1,144 @@
+"""Generated sketches of increasing size for benchmarking."""
+
+import numpy as np
+from pygeosolve import Problem
+
+
+def _perturbed(coords, rng, scale):
+    """Coordinates with random offsets added, so there's something to solve."""
+    return np.asarray(coords, dtype=float) + rng.normal(scale=scale, size=2)
+
+
+def chain(n, seed=0):
+    """A chain of `n` unit lines, each at a right angle to the last.
+
+    The first line is fixed.
+    """
+    rng = np.random.default_rng(seed)
+    problem = Problem()
+    problem.add_line("l0", (0, 0), (1, 0))
+    problem.constrain_position("l0")
+    end = np.array([1.0, 0.0])
+
+    for i in range(1, n):
+        # Zig-zag up and right.
+        end = end + ((0, 1) if i % 2 else (1, 0))
+        problem.add_line(f"l{i}", problem[f"l{i - 1}"].end, _perturbed(end, rng, 0.1))
+        problem.constrain_line_length(f"l{i}", 1)
+        problem.constrain_angle_between_lines(
+            f"l{i - 1}", f"l{i}", -90 if i % 2 else 90
+        )
+
+    return problem
+
+
+def polygon(n, seed=0, offset=(0, 0), prefix=""):
+    """A regular `n`-gon of unit sides built like ``examples/polygon.py``.
+
+    The first side is fixed.
+    """
+    rng = np.random.default_rng(seed)
+    problem = Problem()
+    _add_polygon(problem, n, rng, offset, prefix)
+    return problem
+
+
+def _add_polygon(problem, n, rng, offset, prefix):
+    turn = 2 * np.pi / n
+    angles = turn * np.arange(n)
+    vertices = np.cumsum(np.column_stack((np.cos(angles), np.sin(angles))), axis=0)
+    vertices = np.vstack(((0, 0), vertices[:-1])) + offset
+    names = [f"{prefix}l{i}" for i in range(n)]
+
+    problem.add_line(names[0], vertices[0], vertices[1])
+    for i in range(1, n - 1):
+        problem.add_line(
+            names[i], problem[names[i - 1]].end, _perturbed(vertices[i + 1], rng, 0.05)
+        )
+    problem.add_line(names[-1], problem[names[-2]].end, problem[names[0]].start)
+
+    problem.constrain_position(names[0])
+    for i in range(1, n):
+        problem.constrain_line_length(names[i], 1)
+        problem.constrain_angle_between_lines(names[i - 1], names[i], -np.degrees(turn))
+
+
+def grid(n, seed=0):
+    """An `n` by `n` grid of unit squares.
+
+    The bottom left line is fixed.
+    """
+    rng = np.random.default_rng(seed)
+    problem = Problem()
+
+    for j in range(n + 1):
+        for i in range(n + 1):
+            coords = (i, j) if j == 0 and i < 2 else _perturbed((i, j), rng, 0.05)
+            problem.add_point(f"p{i},{j}", *coords)
+
+    for j in range(n + 1):
+        for i in range(n + 1):
+            if i < n:
+                problem.add_line(
+                    f"h{i},{j}", problem[f"p{i},{j}"], problem[f"p{i + 1},{j}"]
+                )
+                problem.constrain_line_length(f"h{i},{j}", 1)
+            if j < n:
+                problem.add_line(
+                    f"v{i},{j}", problem[f"p{i},{j}"], problem[f"p{i},{j + 1}"]
+                )
+                problem.constrain_line_length(f"v{i},{j}", 1)
+            if i < n and j < n:
+                problem.constrain_angle_between_lines(f"h{i},{j}", f"v{i},{j}", -90)
+
+    problem.constrain_position("h0,0")
+    return problem
+
+
+def bulk_grid(n, seed=0):
+    """The same sketch as :func:`grid`, built with the bulk construction methods."""
+    rng = np.random.default_rng(seed)
+    problem = Problem()
+
+    j, i = np.mgrid[: n + 1, : n + 1]
+    coords = np.column_stack((i.ravel(), j.ravel())).astype(float)
+    coords[2:] += rng.normal(scale=0.05, size=(len(coords) - 2, 2))
+    points = np.arange(len(coords)).reshape(n + 1, n + 1)
+
+    h = [f"h{i},{j}" for j in range(n + 1) for i in range(n)]
+    v = [f"v{i},{j}" for j in range(n) for i in range(n + 1)]
+    problem.add_points(coords)
+    problem.add_lines(h, points[:, :-1].ravel(), points[:, 1:].ravel())
+    problem.add_lines(v, points[:-1].ravel(), points[1:].ravel())
+    problem.constrain_line_lengths(h + v, np.ones(len(h) + len(v)))
+
+    # The horizontal and vertical lines from each point, excluding the top and right.
+    corners = [f"{i},{j}" for j in range(n) for i in range(n)]
+    problem.constrain_angles_between_lines(
+        [f"h{corner}" for corner in corners],
+        [f"v{corner}" for corner in corners],
+        np.full(len(corners), -90),
+    )
+    problem.constrain_positions(["h0,0"])
+    return problem
+
+
+def clusters(k, n=6, seed=0):
+    """`k` disconnected regular `n`-gons."""
+    rng = np.random.default_rng(seed)
+    problem = Problem()
+
+    for c in range(k):
+        _add_polygon(problem, n, rng, (3 * c, 0), f"c{c}")
+
+    return problem
+
+
+#: Sketch generators, by name.
+SKETCHES = {
+    "chain": chain,
+    "polygon": polygon,
+    "grid": grid,
+    "bulk_grid": bulk_grid,
+    "clusters": clusters,
+}
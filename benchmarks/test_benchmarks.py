@@ -0,0 +1,118 @@
+"""Benchmarks of import time, objective throughput, solve time, memory and evaluations.
+
+These use `pytest-benchmark <https://pytest-benchmark.readthedocs.io/>`__ and are not
+part of the test suite. Run them with::
+
+    pytest benchmarks --benchmark-json=results.json
+
+to write machine-readable results, which can be compared between releases with
+``pytest-benchmark compare``.
+"""
+
+import subprocess
+import sys
+import tracemalloc
+import pytest
+from sketches import SKETCHES
+
+# Sketch sizes to benchmark, by sketch name.
+SIZES = {
+    "chain": (10, 100, 1000),
+    "polygon": (10, 100, 300),
+    "grid": (3, 10, 30),
+    "bulk_grid": (3, 10, 30),
+    "clusters": (10, 100, 500),
+}
+
+CASES = [(name, size) for name, sizes in SIZES.items() for size in sizes]
+IDS = [f"{name}-{size}" for name, size in CASES]
+
+
+@pytest.fixture(params=CASES, ids=IDS)
+def sketch(request):
+    """A function to generate a sketch, and its size."""
+    name, size = request.param
+    return lambda: SKETCHES[name](size), size
+
+
+def _describe(benchmark, problem, size):
+    benchmark.extra_info["size"] = size
+    benchmark.extra_info["free_params"] = len(problem.free_params)
+    benchmark.extra_info["constraints"] = len(problem.constraints)
+
+
+def test_import(benchmark):
+    """Time taken to import pygeosolve in a fresh interpreter.
+
+    This includes the interpreter's own startup time, which can be measured for
+    comparison with ``python -c pass``.
+    """
+    command = [sys.executable, "-c", "import pygeosolve"]
+    benchmark.pedantic(
+        subprocess.run, args=(command,), kwargs={"check": True}, rounds=10
+    )
+
+
+def test_build(benchmark, sketch):
+    """Time taken to build a sketch."""
+    make, size = sketch
+    _describe(benchmark, make(), size)
+    benchmark(make)
+
+
+def test_error(benchmark, sketch):
+    """Throughput of :meth:`.Problem.error`."""
+    make, size = sketch
+    problem = make()
+    _describe(benchmark, problem, size)
+    benchmark(problem.error)
+
+
+def test_compiled_error(benchmark, sketch):
+    """Throughput of the compiled objective used during solves."""
+    make, size = sketch
+    problem = make()
+    compiled = problem.compile()
+    _describe(benchmark, problem, size)
+    benchmark(compiled.error, compiled.x0)
+
+
+def test_solve(benchmark, sketch):
+    """Wall time, peak memory and number of function evaluations of
+    :meth:`.Problem.solve`."""
+    make, size = sketch
+    problem = make()
+    _describe(benchmark, problem, size)
+
+    # Measure memory and evaluations in a separate, untimed solve, since tracing
+    # allocations slows the solve down.
+    tracemalloc.start()
+    result = problem.solve()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark.extra_info["peak_memory"] = peak
+    benchmark.extra_info["nfev"] = int(result.nfev)
+    benchmark.extra_info["success"] = bool(result.success)
+    benchmark.extra_info["error"] = float(result.error)
+
+    benchmark.pedantic(lambda problem: problem.solve(), setup=lambda: ((make(),), {}))
+
+
+def test_drag(benchmark):
+    """Time taken by an incremental :meth:`.Problem.solve` after dragging one point of a
+    large sketch, which must fit in a frame at 60 frames per second."""
+    problem = SKETCHES["clusters"](2000)
+    _describe(benchmark, problem, 2000)
+    assert problem.solve(incremental=True).success
+    point = problem["c7l2"].end
+
+    def drag():
+        point.params[0] += 0.01
+        return problem.solve(incremental=True)
+
+    result = benchmark(drag)
+
+    assert result.success
+    assert len(result.components) == 1
+    assert benchmark.stats.stats.median < 1 / 60
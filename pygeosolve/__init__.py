@@ -7,6 +7,8 @@ except ImportError:
     raise FileNotFoundError("Could not find _version.py. Ensure you have run setup.")
 
 
-from .problem import Problem
+from .cache import SolutionCache
+from .pipeline import solve_stream
+from .problem import Problem, solve_many
 
-__all__ = ("__version__", "Problem")
+__all__ = ("__version__", "Problem", "SolutionCache", "solve_many", "solve_stream")
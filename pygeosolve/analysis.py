@@ -0,0 +1,236 @@
+"""Degrees of freedom analysis."""
+
+import numpy as np
+
+# Indent size.
+INDENT = " " * 4
+
+#: The largest number of free parameters or residuals of a component to analyse with a
+#: dense decomposition of its Jacobian.
+DENSE_LIMIT = 500
+
+
+class ComponentAnalysis:
+    """Degrees of freedom analysis of one of a problem's independent components.
+
+    Normally this should not be instantiated directly, but via :meth:`.Problem.analyse`.
+
+    Parameters
+    ----------
+    constraints : :class:`list` of :class:`.Constraint`
+        The component's constraints.
+
+    nfree : :class:`int`
+        The number of free parameters of the component's points.
+
+    rank : :class:`int`
+        The rank of the component's residual Jacobian.
+
+    redundant : :class:`list` of :class:`.Constraint`
+        The constraints that do not remove each of their degrees of freedom given the
+        others.
+
+    error : :class:`float`
+        The component's total error.
+
+    structural : :class:`bool`, optional
+        Whether `rank` and `redundant` were estimated from the structure of the
+        Jacobian rather than its values; see :func:`analyse_component`.
+    """
+
+    def __init__(self, constraints, nfree, rank, redundant, error, structural=False):
+        self.constraints = constraints
+        self.nfree = nfree
+        self.rank = rank
+        self.redundant = redundant
+        self.error = error
+        self.structural = structural
+
+    @property
+    def dof(self):
+        """The number of remaining degrees of freedom.
+
+        This includes the rigid body motions of components not anchored to fixed
+        points.
+        """
+        return self.nfree - self.rank
+
+    @property
+    def status(self):
+        """The constraint status.
+
+        This is "over-constrained" if the component has redundant constraints,
+        otherwise "under-constrained" if it has degrees of freedom remaining, otherwise
+        "well-constrained".
+        """
+        if self.redundant:
+            return "over-constrained"
+        if self.dof:
+            return "under-constrained"
+        return "well-constrained"
+
+    def __str__(self):
+        return (
+            f"{self.status} component with {len(self.constraints)} constraint(s), "
+            f"{self.nfree} free parameter(s), {self.dof} degree(s) of freedom and "
+            f"{len(self.redundant)} redundant constraint(s)"
+        )
+
+
+class Analysis:
+    """Degrees of freedom analysis of a problem.
+
+    Normally this should not be instantiated directly, but via :meth:`.Problem.analyse`.
+
+    Parameters
+    ----------
+    components : :class:`list` of :class:`.ComponentAnalysis`
+        The analysis of each of the problem's independent components.
+
+    fixed : :class:`list` of :class:`.Constraint`
+        The constraints involving only fixed points.
+
+    violated : :class:`list` of :class:`.Constraint`
+        Those of the `fixed` constraints that are not satisfied, and so never can be.
+    """
+
+    def __init__(self, components, fixed, violated):
+        self.components = components
+        self.fixed = fixed
+        self.violated = violated
+
+    @property
+    def dof(self):
+        """The total number of remaining degrees of freedom."""
+        return sum(component.dof for component in self.components)
+
+    @property
+    def redundant(self):
+        """The redundant constraints of all components."""
+        return [
+            constraint
+            for component in self.components
+            for constraint in component.redundant
+        ]
+
+    @property
+    def consistent(self):
+        """False if some constraints can never be satisfied, True otherwise.
+
+        True does not guarantee a solution exists, since redundant constraints may
+        still conflict.
+        """
+        return not self.violated
+
+    def __str__(self):
+        chunks = [
+            f"Analysis with {self.dof} degree(s) of freedom and "
+            f"{len(self.redundant)} redundant constraint(s)",
+        ]
+        chunks.extend(f"\n{INDENT}{component}" for component in self.components)
+
+        if self.violated:
+            violated = ", ".join(str(constraint) for constraint in self.violated)
+            chunks.append(f"\nViolated constraints between fixed points: {violated}")
+
+        return "".join(chunks)
+
+
+def analyse_component(compiled, tolerance=1e-10, dense_limit=DENSE_LIMIT):
+    """Analyse the degrees of freedom of a compiled problem.
+
+    The analysis uses the rank of the residual Jacobian at the compiled coordinates,
+    found by a column pivoted QR decomposition of its transpose. This orders the
+    residuals by how much each adds to the rank; those after the rank are linear
+    combinations of the others at the current configuration, and their constraints are
+    redundant. Degenerate
+    configurations, such as collinear points, can therefore report more redundant
+    constraints than are redundant in general.
+
+    The decomposition is dense, so components with more than `dense_limit` free
+    parameters or residuals are instead analysed using a maximum matching of the
+    residuals to the free parameters through the Jacobian's nonzero entries, whose
+    time and memory scale with the number of those entries. This gives the structural
+    rank, an upper bound on the rank: it finds constraints that are redundant because
+    of the points they involve, such as more constraints on a group of points than they
+    have free parameters, but not those that are only redundant because of their
+    values, such as two identical constraints.
+
+    Parameters
+    ----------
+    compiled : :class:`.CompiledProblem`
+        The problem to analyse, compiled from an independent component.
+
+    tolerance : :class:`float`, optional
+        The relative tolerance below which a Jacobian singular value, or entry for
+        large components, is considered zero.
+
+    dense_limit : :class:`int`, optional
+        The largest number of free parameters or residuals for which to use a dense
+        decomposition.
+
+    Returns
+    -------
+    :class:`.ComponentAnalysis`
+        The analysis.
+    """
+    constraints = [
+        constraint for group in compiled.groups for constraint in group.constraints
+    ]
+    order = np.concatenate(
+        [group.positions for group in compiled.groups] + [np.zeros(0, dtype=np.intp)]
+    )
+    # The index in constraints of the constraint of each residual.
+    owners = np.repeat(
+        np.arange(len(constraints)),
+        [group.kind.nresiduals for group in compiled.groups for _ in group.constraints],
+    )
+    x0 = compiled.x0
+    jacobian = compiled.jacobian(x0)
+    structural = max(jacobian.shape) > dense_limit
+
+    if structural:
+        rank, rows = _structural_rank(jacobian, tolerance)
+    else:
+        rank, rows = _rank(jacobian.toarray(), tolerance)
+
+    # Report the constraints in the order they were added.
+    redundant = sorted(set(owners[rows].tolist()), key=lambda i: order[i])
+
+    return ComponentAnalysis(
+        [constraints[i] for i in np.argsort(order, kind="stable")],
+        compiled.nfree,
+        rank,
+        [constraints[i] for i in redundant],
+        compiled.error(x0),
+        structural,
+    )
+
+
+def _rank(jacobian, tolerance):
+    """The rank of a dense Jacobian, and the rows that are linear combinations of the
+    others."""
+    from scipy.linalg import qr
+
+    if not jacobian.size:
+        return 0, np.arange(len(jacobian))
+
+    r, pivots = qr(jacobian.T, mode="r", pivoting=True)
+    diagonal = np.abs(np.diag(r))
+    rank = int(np.sum(diagonal > tolerance * max(diagonal[0], 1)))
+
+    return rank, pivots[rank:]
+
+
+def _structural_rank(jacobian, tolerance):
+    """The structural rank of a sparse Jacobian, and the rows left unmatched by a
+    maximum matching of rows to columns."""
+    from scipy.sparse.csgraph import maximum_bipartite_matching
+
+    # Ignore entries that are zero at the current configuration.
+    magnitudes = np.abs(jacobian.data)
+    jacobian.data[magnitudes <= tolerance * max(magnitudes.max(initial=0), 1)] = 0
+    jacobian.eliminate_zeros()
+    matches = maximum_bipartite_matching(jacobian, perm_type="column")
+
+    return int(np.sum(matches >= 0)), np.flatnonzero(matches < 0)
@@ -0,0 +1,236 @@
+"""Solution caching."""
+
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+import numpy as np
+
+
+def problem_keys(problem, quantum=1e-6):
+    """Canonical hashes of a problem.
+
+    The structure key is a hash of the problem's topology (the point indices of its
+    primitives and constraints), constraint types, targets and weights, fixed parameters
+    and their values, and :attr:`~.Problem.scale`. Problems with the same structure key
+    have the same solutions, up to the choice between multiple solutions, which depends
+    on the initial positions.
+
+    The full key additionally includes the initial positions of the free parameters,
+    quantised to multiples of `quantum`, so problems with the same full key are expected
+    to solve to the same solution.
+
+    Primitive and constraint names are not included, so differently named but
+    otherwise identical problems have the same keys.
+
+    Parameters
+    ----------
+    problem : :class:`.Problem`
+        The problem.
+
+    quantum : :class:`float`, optional
+        The quantisation step of the free parameters' initial positions.
+
+    Returns
+    -------
+    key, structure_key : :class:`str`
+        The full and structure keys, as hexadecimal digests.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    def update(*values):
+        for value in values:
+            digest.update(np.ascontiguousarray(value).tobytes())
+            # Separate the values so that different splits hash differently.
+            digest.update(b"|")
+
+    free = problem._free_mask()
+    coords = problem.store.coords
+    update(np.int64(len(coords)))
+
+    for primitive in problem.primitives.values():
+        update(type(primitive).__name__.encode(), np.int64(primitive.point_indices))
+
+    for constraint in problem.constraints:
+        update(
+            type(constraint).__name__.encode(),
+            np.int64(constraint.point_indices),
+            np.float64(constraint.target),
+            np.float64(constraint.weight),
+        )
+
+    scale = np.nan if problem.scale is None else problem.scale
+    update(free, coords[~free], np.float64(scale))
+    structure_key = digest.hexdigest()
+
+    update(np.int64(np.round(coords[free] / quantum)))
+    return digest.hexdigest(), structure_key
+
+
+class SolutionCache:
+    """A cache of solved point coordinates, keyed by canonical problem hashes.
+
+    Solutions are kept in memory, evicting the least recently used beyond `maxsize`,
+    and optionally also written to a directory, which is consulted for solutions not in
+    memory and is not bounded.
+
+    Solutions depend only on the problem's :func:`problem_keys`, not the solver or its
+    options, so a cache should be used with one solver configuration.
+
+    Parameters
+    ----------
+    maxsize : :class:`int`, optional
+        The maximum number of solutions to keep in memory.
+
+    path : :class:`str`, optional
+        Directory in which to also store solutions, created if necessary. Defaults to
+        keeping solutions only in memory.
+
+    quantum : :class:`float`, optional
+        The quantisation step of the initial positions in the cache keys. Problems with
+        initial positions within about this distance of a cached problem's use its
+        solution without solving.
+
+    warm_distance : :class:`float`, optional
+        The distance, relative to the problem's :meth:`~.Problem.length_scale`, within
+        which each point's initial position must be of its initial position in a cached
+        problem with the same structure for a solve to be warm-started from that
+        problem's solution. Further away, the solution may be a different one of the
+        problem's solutions than the solve would otherwise find.
+    """
+
+    def __init__(self, maxsize=128, path=None, quantum=1e-6, warm_distance=0.1):
+        self.maxsize = maxsize
+        self.path = path
+        self.quantum = quantum
+        self.warm_distance = warm_distance
+        self._memory = OrderedDict()
+        #: The number of cache hits.
+        self.hits = 0
+        #: The number of cache misses.
+        self.misses = 0
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def keys(self, problem):
+        """The full and structure keys of a problem; see :func:`problem_keys`."""
+        return problem_keys(problem, self.quantum)
+
+    def get(self, key, initial=None, distance=np.inf):
+        """Get a cached solution.
+
+        Parameters
+        ----------
+        key : :class:`str`
+            The key.
+
+        initial : :class:`numpy.ndarray`, optional
+            The (n, 2) array of initial point coordinates from which the solution is
+            wanted. If given, only a solution cached with initial coordinates within
+            `distance` of these is returned.
+
+        distance : :class:`float`, optional
+            The maximum distance of each point from its cached initial position.
+
+        Returns
+        -------
+        :class:`numpy.ndarray` or None
+            The (n, 2) array of solved point coordinates, or None if there is no
+            solution with the key and, if given, nearby initial coordinates.
+        """
+        try:
+            entry = self._memory[key]
+        except KeyError:
+            entry = self._load(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._remember(key, entry)
+        else:
+            self._memory.move_to_end(key)
+
+        # Solutions cached with their initial coordinates are stacked after them.
+        cached_initial, coords = entry if entry.ndim == 3 else (None, entry)
+
+        if initial is not None:
+            if cached_initial is None or cached_initial.shape != np.shape(initial):
+                self.misses += 1
+                return None
+
+            delta = cached_initial - initial
+            if np.any(np.hypot(delta[:, 0], delta[:, 1]) > distance):
+                self.misses += 1
+                return None
+
+        self.hits += 1
+        return coords
+
+    def put(self, key, coords, initial=None):
+        """Cache a solution.
+
+        Parameters
+        ----------
+        key : :class:`str`
+            The key.
+
+        coords : :class:`numpy.ndarray`
+            The (n, 2) array of solved point coordinates.
+
+        initial : :class:`numpy.ndarray`, optional
+            The (n, 2) array of initial point coordinates from which the solution was
+            found, to limit its use to nearby initial coordinates; see :meth:`get`.
+        """
+        coords = np.array(coords, dtype=float)
+
+        if initial is not None:
+            coords = np.stack((np.asarray(initial, dtype=float), coords))
+
+        self._remember(key, coords)
+
+        if self.path is not None:
+            # Write to a temporary file and rename it so that readers never see a
+            # partial file.
+            handle, temporary = tempfile.mkstemp(dir=self.path, suffix=".npy")
+            with os.fdopen(handle, "wb") as file:
+                np.save(file, coords)
+            os.replace(temporary, self._file(key))
+
+    def _remember(self, key, coords):
+        self._memory[key] = coords
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npy")
+
+    def _load(self, key):
+        if self.path is None:
+            return None
+
+        try:
+            return np.load(self._file(key))
+        except FileNotFoundError:
+            return None
+
+    def clear(self):
+        """Remove all solutions from memory and disk."""
+        self._memory.clear()
+
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith(".npy"):
+                    os.remove(os.path.join(self.path, name))
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__}(size={len(self)}, maxsize={self.maxsize}, "
+            f"path={self.path!r})>"
+        )
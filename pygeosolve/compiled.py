@@ -0,0 +1,600 @@
+"""Compiled problems."""
+
+import numpy as np
+
+
+class ConstraintGroup:
+    """A group of constraints of the same type, lowered to arrays.
+
+    Parameters
+    ----------
+    kind : :class:`type`
+        The :class:`.Constraint` subclass shared by the group's constraints.
+
+    indices : :class:`numpy.ndarray`
+        The (m, k) array of point indices of each of the m constraints.
+
+    targets : :class:`numpy.ndarray`
+        The (m,) array of constraint targets.
+
+    constraints : sequence of :class:`.Constraint`, optional
+        The constraints the group was lowered from, used to :meth:`refresh` the
+        targets.
+
+    positions : :class:`numpy.ndarray`, optional
+        The (m,) array of positions of the group's constraints in the problem's
+        constraint sequence.
+
+    scale : :class:`float`, optional
+        The length scale by which to divide length residuals.
+    """
+
+    def __init__(
+        self, kind, indices, targets, constraints=None, positions=None, scale=1.0
+    ):
+        self.kind = kind
+        self.indices = indices
+        self.targets = targets
+        self.constraints = constraints
+        self.positions = positions
+        self.scale = scale
+        self.weights = self._weights()
+
+    def _weights(self):
+        """The array of factors by which to multiply the residuals: the constraints'
+        weights, divided by the length scale for length residuals."""
+        if self.constraints is None:
+            weights = np.ones(len(self.targets))
+        else:
+            weights = np.array([c.weight for c in self.constraints], dtype=float)
+
+        if self.kind.length_residual:
+            weights /= self.scale
+
+        return np.repeat(weights, self.kind.nresiduals)
+
+    def __getstate__(self):
+        # The constraints are only needed to refresh the targets, which only makes
+        # sense in the original process, so aren't sent to workers.
+        state = self.__dict__.copy()
+        state["constraints"] = None
+        return state
+
+    def refresh(self, scale=None):
+        """Update the targets and weights from the group's constraints.
+
+        Parameters
+        ----------
+        scale : :class:`float`, optional
+            The new length scale. Defaults to the current one.
+
+        Returns
+        -------
+        :class:`bool`
+            True if any target or weight changed, False otherwise.
+        """
+        if scale is not None:
+            self.scale = scale
+
+        if self.constraints is None:
+            return False
+
+        targets = np.array([constraint.target for constraint in self.constraints])
+        weights = self._weights()
+
+        if np.array_equal(targets, self.targets) and np.array_equal(
+            weights, self.weights
+        ):
+            return False
+
+        self.targets = targets
+        self.weights = weights
+        return True
+
+    def __len__(self):
+        return len(self.targets)
+
+    @property
+    def nresiduals(self):
+        """The number of residuals, which is more than the number of constraints for
+        constraints with several residuals."""
+        return len(self) * self.kind.nresiduals
+
+    def residuals(self, coords, targets=None):
+        """The weighted residuals of the group's constraints given the point
+        coordinates.
+
+        The targets default to those of the group.
+        """
+        if targets is None:
+            targets = self.targets
+
+        return self.kind.batch_residuals(coords, self.indices, targets) * self.weights
+
+    def jacobians(self, coords, targets=None):
+        """The weighted residual derivatives of the group's constraints given the point
+        coordinates.
+
+        The targets default to those of the group.
+        """
+        if targets is None:
+            targets = self.targets
+
+        jacobians = self.kind.batch_jacobians(coords, self.indices, targets)
+        return jacobians * self.weights[:, np.newaxis, np.newaxis]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}({self.kind.__name__}, n={len(self)})>"
+
+
+class CompiledProblem:
+    """A problem lowered to flat arrays for fast evaluation.
+
+    The coordinates of all points are held in a single (n, 2) array, and the free
+    parameters are indices into its flattened form. Constraints are grouped by type,
+    each group evaluated in one vectorised call.
+
+    The residuals are those of the constraints, multiplied by the constraints'
+    :attr:`~.Constraint.weight`, and divided by `scale` for :attr:`length residuals
+    <.Constraint.length_residual>`, so that they are independent of the size of the
+    problem.
+
+    Normally this should not be instantiated directly, but via
+    :meth:`.Problem.compile`.
+
+    Parameters
+    ----------
+    store : :class:`.PointStore`
+        The store holding the problem's points.
+
+    free : :class:`numpy.ndarray`
+        The (n, 2) boolean array marking the free parameters of each point in `store`.
+
+    constraints : sequence of :class:`.Constraint`
+        The constraints in the problem.
+
+    points : :class:`numpy.ndarray`, optional
+        The sorted indices of the points in `store` to compile, which must include
+        those of the constraints. Defaults to all points in `store`.
+
+    scale : :class:`float`, optional
+        The length scale by which to divide length residuals.
+    """
+
+    def __init__(self, store, free, constraints, points=None, scale=1.0):
+        self.store = store
+        self.scale = scale
+
+        if points is None:
+            points = np.arange(len(store))
+
+        self.indices = np.asarray(points, dtype=np.intp)
+        self.coords = store.coords[self.indices]
+        self.free = np.flatnonzero(free[self.indices])
+
+        # The free parameters' indices in the flattened store.
+        self._store_free = 2 * self.indices[self.free // 2] + self.free % 2
+
+        # Map from store index to compiled point index.
+        local = np.full(len(store), -1, dtype=np.intp)
+        local[self.indices] = np.arange(len(self.indices))
+
+        grouped = {}
+        for position, constraint in enumerate(constraints):
+            grouped.setdefault(type(constraint), []).append((position, constraint))
+
+        self.groups = [
+            ConstraintGroup(
+                kind,
+                local[np.array([c.point_indices for _, c in group], dtype=np.intp)],
+                np.array([c.target for _, c in group], dtype=float),
+                [c for _, c in group],
+                np.array([position for position, _ in group], dtype=np.intp),
+                scale,
+            )
+            for kind, group in grouped.items()
+        ]
+
+        # Map from flattened coordinate index to free parameter index, or -1 if fixed.
+        self.columns = np.full(self.coords.size, -1, dtype=np.intp)
+        self.columns[self.free] = np.arange(len(self.free))
+
+        self._build_jacobian_pattern()
+
+        # Work array reused between evaluations.
+        self._work = self.coords.copy()
+
+        # Whether a solution has been applied since compilation.
+        self.solved = False
+
+        # Statistics of the current solve, if any.
+        self.stats = None
+
+    @property
+    def nfree(self):
+        """The number of free parameters."""
+        return len(self.free)
+
+    @property
+    def nresiduals(self):
+        """The number of residuals."""
+        return sum(group.nresiduals for group in self.groups)
+
+    @property
+    def x0(self):
+        """The free parameter values at compile time."""
+        return self.coords.ravel()[self.free]
+
+    def coordinates(self, x):
+        """The point coordinates given the free parameter values.
+
+        The returned array is reused between calls and must be copied if it needs to be
+        kept.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The free parameter values.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (n, 2) array of point coordinates.
+        """
+        return self._timed("update", self._scatter, x)
+
+    def _scatter(self, x):
+        self._work.ravel()[self.free] = x
+        return self._work
+
+    def _timed(self, key, function, *args):
+        """Call a function, timing it if statistics are being recorded."""
+        if self.stats is None:
+            return function(*args)
+
+        return self.stats.timed(key, function, *args)
+
+    def _group_residuals(self, group, coords):
+        return self._timed(group.kind.__name__, group.residuals, coords)
+
+    def _group_jacobians(self, group, coords):
+        return self._timed(f"{group.kind.__name__} jacobian", group.jacobians, coords)
+
+    def residuals(self, x):
+        """The constraint residuals given the free parameter values.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The free parameter values.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The residuals, ordered by constraint group.
+        """
+        coords = self.coordinates(x)
+
+        if not self.groups:
+            return np.zeros(0)
+
+        residuals = np.concatenate(
+            [self._group_residuals(group, coords) for group in self.groups]
+        )
+
+        if self.stats is not None:
+            self.stats.record_evaluation(float(residuals @ residuals), x)
+
+        return residuals
+
+    def error(self, x):
+        """The total error given the free parameter values.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The free parameter values.
+
+        Returns
+        -------
+        :class:`float`
+            The total error.
+        """
+        coords = self.coordinates(x)
+        error = float(
+            sum(
+                np.sum(self._group_residuals(group, coords) ** 2)
+                for group in self.groups
+            )
+        )
+
+        if self.stats is not None:
+            self.stats.record_evaluation(error, x)
+
+        return error
+
+    def gradient(self, x):
+        """The gradient of the total error given the free parameter values.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The free parameter values.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The derivatives of the total error with respect to each free parameter.
+        """
+        coords = self.coordinates(x)
+        gradient = np.zeros(self.nfree)
+
+        if self.stats is not None:
+            self.stats.jacobian_evaluations += 1
+
+        for group in self.groups:
+            columns = self._group_columns(group)
+            residuals = self._group_residuals(group, coords)
+            values = 2 * residuals[:, np.newaxis, np.newaxis]
+            values = values * self._group_jacobians(group, coords)
+            free = columns >= 0
+            gradient += np.bincount(
+                columns[free], weights=values[free], minlength=self.nfree
+            )
+
+        return gradient
+
+    def error_and_gradient(self, x):
+        """The total error and its gradient given the free parameter values.
+
+        This is suitable for use as an objective function with ``jac=True``.
+        """
+        return self.error(x), self.gradient(x)
+
+    def _build_jacobian_pattern(self):
+        """Precompute the Jacobian's sparsity pattern in CSR form.
+
+        Each constraint only involves a few points, so the Jacobian has a handful of
+        nonzero entries per row. The pattern only depends on the problem's structure, so
+        evaluating the Jacobian only needs to fill in the values.
+        """
+        rows, cols = [], []
+        # Masks selecting the derivatives with respect to free parameters.
+        self._jacobian_free = []
+        offset = 0
+
+        for group in self.groups:
+            columns = self._group_columns(group)
+            group_rows = np.broadcast_to(
+                offset + np.arange(group.nresiduals)[:, np.newaxis, np.newaxis],
+                columns.shape,
+            )
+            free = columns >= 0
+            rows.append(group_rows[free])
+            cols.append(columns[free])
+            self._jacobian_free.append(free)
+            offset += group.nresiduals
+
+        rows = np.concatenate(rows + [np.zeros(0, dtype=np.intp)])
+        cols = np.concatenate(cols + [np.zeros(0, dtype=np.intp)])
+
+        # Sort the entries by row then column, merging duplicates from points repeated
+        # within a constraint, whose derivatives are summed.
+        entries, self._jacobian_slots = np.unique(
+            rows * self.nfree + cols, return_inverse=True
+        )
+        self._jacobian_slots = self._jacobian_slots.ravel()
+        self._jacobian_indices = entries % max(self.nfree, 1)
+        self._jacobian_indptr = np.concatenate(
+            (
+                [0],
+                np.cumsum(np.bincount(entries // max(self.nfree, 1), minlength=offset)),
+            )
+        )
+
+    def jacobian(self, x):
+        """The sparse Jacobian of the residuals given the free parameter values.
+
+        Only the values are computed; the sparsity pattern is computed at compile time.
+        Memory and time therefore scale linearly with the number of constraints.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The free parameter values.
+
+        Returns
+        -------
+        :class:`scipy.sparse.csr_matrix`
+            The derivatives of each residual (rows, ordered as in :meth:`residuals`)
+            with respect to each free parameter (columns).
+        """
+        from scipy.sparse import csr_matrix
+
+        coords = self.coordinates(x)
+
+        if self.stats is not None:
+            self.stats.jacobian_evaluations += 1
+
+        if not self.groups:
+            return csr_matrix((0, self.nfree))
+
+        values = np.concatenate(
+            [
+                self._group_jacobians(group, coords)[free]
+                for group, free in zip(self.groups, self._jacobian_free)
+            ]
+        )
+        data = np.bincount(
+            self._jacobian_slots, weights=values, minlength=len(self._jacobian_indices)
+        )
+
+        return csr_matrix(
+            (data, self._jacobian_indices, self._jacobian_indptr),
+            shape=(self.nresiduals, self.nfree),
+        )
+
+    def batch_coordinates(self, x):
+        """The point coordinates of a batch of problem instances.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The (b, p) array of the p free parameter values of each of the b instances.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (b, n, 2) array of point coordinates.
+        """
+        x = np.asarray(x, dtype=float)
+        coords = np.repeat(self.coords[np.newaxis], len(x), axis=0)
+        coords.reshape(len(x), -1)[:, self.free] = x
+        return coords
+
+    def batch_residuals(self, x, targets=None):
+        """The constraint residuals of a batch of problem instances.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The (b, p) array of the p free parameter values of each of the b instances.
+
+        targets : :class:`numpy.ndarray`, optional
+            The (b, c) array of the targets of each of the c constraints, in the order
+            they were compiled, of each instance. Defaults to the compiled targets.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (b, r) array of residuals, ordered as in :meth:`residuals`.
+        """
+        coords = self.batch_coordinates(x)
+
+        if not self.groups:
+            return np.zeros((len(coords), 0))
+
+        return np.concatenate(
+            [
+                group.residuals(coords, self._group_targets(group, targets))
+                for group in self.groups
+            ],
+            axis=-1,
+        )
+
+    def batch_jacobian(self, x, targets=None):
+        """The sparse, block diagonal residual Jacobian of a batch of problem
+        instances.
+
+        Parameters are the same as :meth:`batch_residuals`.
+
+        Returns
+        -------
+        :class:`scipy.sparse.csr_matrix`
+            The derivatives of each instance's residuals with respect to its free
+            parameters, with rows and columns ordered by instance then as in
+            :meth:`jacobian`.
+        """
+        from scipy.sparse import csr_matrix
+
+        coords = self.batch_coordinates(x)
+        nbatch = len(coords)
+        nresiduals = self.nresiduals
+        rows, cols, values = [], [], []
+        offset = 0
+
+        for group in self.groups:
+            columns = self._group_columns(group)
+            group_rows = np.broadcast_to(
+                offset + np.arange(group.nresiduals)[:, np.newaxis, np.newaxis],
+                columns.shape,
+            )
+            free = columns >= 0
+            batch = np.arange(nbatch)[:, np.newaxis]
+            rows.append((batch * nresiduals + group_rows[free]).ravel())
+            cols.append((batch * self.nfree + columns[free]).ravel())
+            jacobians = group.jacobians(coords, self._group_targets(group, targets))
+            values.append(jacobians[:, free].ravel())
+            offset += group.nresiduals
+
+        shape = (nbatch * nresiduals, nbatch * self.nfree)
+
+        if not self.groups:
+            return csr_matrix(shape)
+
+        return csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+            shape=shape,
+        )
+
+    def _group_targets(self, group, targets):
+        """A group's targets from an array of targets of all constraints."""
+        if targets is None:
+            return group.targets
+
+        return np.asarray(targets, dtype=float)[..., group.positions]
+
+    def _group_columns(self, group):
+        """The (r, k, 2) free parameter indices of the coordinates of the points of each
+        of a group's r residuals."""
+        indices = np.repeat(group.indices, group.kind.nresiduals, axis=0)
+        flat = 2 * indices[:, :, np.newaxis] + np.arange(2)
+        return self.columns[flat]
+
+    def __getstate__(self):
+        # Only the arrays are needed to evaluate the problem, so the store is not
+        # serialised. Copies cannot be refreshed or applied.
+        state = self.__dict__.copy()
+        state["store"] = None
+        del state["_work"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._work = self.coords.copy()
+
+    def refresh(self, scale=None):
+        """Update the coordinates and targets from the problem's points and
+        constraints.
+
+        This allows a compiled problem to be reused after edits that do not change the
+        problem's structure, such as moving points or changing constraint targets.
+
+        Parameters
+        ----------
+        scale : :class:`float`, optional
+            The new length scale, which changes with the problem's length targets.
+            Defaults to the current one.
+
+        Returns
+        -------
+        :class:`bool`
+            True if anything changed since compilation or the last :meth:`apply`, False
+            otherwise.
+        """
+        coords = self.store.coords[self.indices]
+        changed = not np.array_equal(coords, self.coords)
+
+        if changed:
+            self.coords = coords
+            self._work = coords.copy()
+
+        if scale is not None:
+            self.scale = scale
+
+        for group in self.groups:
+            changed |= group.refresh(scale)
+
+        return changed
+
+    def apply(self, x):
+        """Write free parameter values back to the problem's points.
+
+        Parameters
+        ----------
+        x : :class:`numpy.ndarray`
+            The free parameter values.
+        """
+        self.coords.ravel()[self.free] = x
+        self.store.coords.reshape(-1)[self._store_free] = x
+        self.solved = True
@@ -18,9 +18,81 @@ class Constraint(metaclass=abc.ABCMeta):
         The primitives associated with this constraint.
     """
 
+    #: The name of the attribute holding the target, used by :meth:`many`.
+    _target_attribute = None
+
+    #: Whether the residual is a length, rather than dimensionless. Length residuals are
+    #: divided by the problem's :meth:`~.Problem.length_scale` when solving.
+    length_residual = True
+
+    _weight = 1.0
+
+    #: The number of residuals of each constraint. Most constraints have one, but a
+    #: constraint that removes several degrees of freedom has one for each, so that its
+    #: residual Jacobian has full rank at its solution.
+    nresiduals = 1
+
     def __init__(self, primitives):
         self.primitives = primitives
 
+    @property
+    def weight(self):
+        """The weight of the constraint's residual when solving."""
+        return self._weight
+
+    @weight.setter
+    def weight(self, weight):
+        self._weight = weight
+        self._edited()
+
+    def _edited(self):
+        """Record a change to the target or weight in the store of the constraint's
+        points, so that incremental solves re-solve its component."""
+        self.primitives[0]._store.edits.add(self)
+
+    @classmethod
+    def many(cls, primitives, targets):
+        """Create many constraints of this type at once.
+
+        This is equivalent to creating each constraint individually, but checks the
+        targets together, which is much faster for large numbers of constraints.
+
+        Parameters
+        ----------
+        primitives : sequence of sequence of :class:`.Primitive`
+            The primitives of each constraint, in the order taken by the constructor.
+
+        targets : array-like
+            The target of each constraint.
+
+        Returns
+        -------
+        :class:`list` of :class:`.Constraint`
+            The constraints.
+        """
+        if cls._target_attribute is None:
+            raise NotImplementedError(f"{cls.__name__} cannot be created in bulk")
+
+        targets = cls._validate_targets(np.asarray(targets, dtype=float).reshape(-1))
+
+        if len(targets) != len(primitives):
+            raise ValueError("primitives and targets must have the same length")
+
+        constraints = []
+        for constraint_primitives, target in zip(primitives, targets.tolist()):
+            constraint = cls.__new__(cls)
+            constraint.primitives = list(constraint_primitives)
+            setattr(constraint, cls._target_attribute, target)
+            constraints.append(constraint)
+
+        return constraints
+
+    @staticmethod
+    def _validate_targets(targets):
+        """Check an array of targets as the constructor does, returning them in the
+        form they are stored."""
+        return targets
+
     @property
     def points(self):
         """The points associated with the primitives associated with this constraint."""
@@ -31,6 +103,15 @@ class Constraint(metaclass=abc.ABCMeta):
 
         return points
 
+    @property
+    def point_indices(self):
+        """The store indices of the points associated with this constraint."""
+        indices = []
+        for primitive in self.primitives:
+            indices.extend(primitive.point_indices)
+
+        return indices
+
     @property
     def params(self):
         """The parameters associated with the points within this constraint."""
@@ -46,9 +127,95 @@ class Constraint(metaclass=abc.ABCMeta):
         """The current value of the constrained parameter(s)."""
         raise NotImplementedError
 
-    @abc.abstractmethod
+    def residual(self):
+        """The current residual of this constraint.
+
+        Returns
+        -------
+        :class:`float`
+            The residual, the square of which is the :meth:`error`. For constraints
+            with several residuals, this is their norm.
+        """
+        coords, indices, targets = self._batch()
+        residuals = self.batch_residuals(coords, indices, targets)
+
+        if len(residuals) == 1:
+            return float(residuals[0])
+
+        return float(np.linalg.norm(residuals))
+
     def error(self):
         """The error function for this constraint."""
+        return self.residual() ** 2
+
+    def gradient(self):
+        """The gradient of the error with respect to this constraint's points.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (k, 2) array of derivatives with respect to the x and y coordinates of
+            each of the k points in :attr:`points`.
+        """
+        coords, indices, targets = self._batch()
+        residuals = self.batch_residuals(coords, indices, targets)
+        jacobians = self.batch_jacobians(coords, indices, targets)
+        return 2 * np.tensordot(residuals, jacobians, axes=1)
+
+    def _batch(self):
+        """This constraint as a single-element batch."""
+        coords = np.array([point.params for point in self.points], dtype=float)
+        indices = np.arange(len(coords))[np.newaxis, :]
+        targets = np.array([self.target], dtype=float)
+        return coords, indices, targets
+
+    @property
+    def target(self):
+        """The target value of the constrained parameter(s)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        """Vectorised residuals for a group of constraints of this type.
+
+        The sum of the squares of each constraint's residuals is equal to its
+        :meth:`error`.
+
+        Parameters
+        ----------
+        coords : :class:`numpy.ndarray`
+            The (n, 2) array of point coordinates, optionally with leading batch
+            dimensions.
+
+        indices : :class:`numpy.ndarray`
+            The (m, k) array of indices into `coords` of the k points of each of the m
+            constraints, in the order given by :attr:`points`.
+
+        targets : :class:`numpy.ndarray`
+            The (m,) array of constraint targets, optionally with leading batch
+            dimensions.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (m * r,) array of the :attr:`nresiduals` r residuals of each
+            constraint, ordered by constraint, with any leading batch dimensions.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        """Vectorised residual derivatives for a group of constraints of this type.
+
+        Parameters are the same as :meth:`batch_residuals`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (m * r, k, 2) array of derivatives of each of the residuals with
+            respect to the x and y coordinates of its constraint's k points, with any
+            leading batch dimensions.
+        """
         raise NotImplementedError
 
     def __str__(self):
@@ -70,6 +237,8 @@ class LineLengthConstraint(Constraint):
         The length to constrain the line to.
     """
 
+    _target_attribute = "_length"
+
     def __init__(self, line, length):
         super().__init__([line])
         self._length = None
@@ -86,30 +255,44 @@ class LineLengthConstraint(Constraint):
             raise ValueError("length must be >= 0")
 
         self._length = length
+        self._edited()
+
+    @staticmethod
+    def _validate_targets(targets):
+        if np.any(targets < 0):
+            raise ValueError("length must be >= 0")
+
+        return targets
 
     @property
     def line(self):
         return self.primitives[0]
 
+    @property
+    def target(self):
+        return self.length
+
     def value(self):
         """The current value of the constrained parameter(s)."""
         return self.line.length()
 
-    def error(self):
-        """The current length constraint error.
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        return _separations(coords, indices) - targets
 
-        Returns
-        -------
-        :class:`float`
-            The error.
-        """
-        # The difference in length.
-        return np.abs(self.value() - self.length) ** 2
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        return _separation_jacobians(coords, indices)
 
 
 class LineAngleConstraint(Constraint):
     """Constraint on the angle between two lines.
 
+    The residual is the distance between the unit vector of the second line and that
+    of the first line rotated by the target angle, i.e. twice the sine of half the
+    difference between the angle and its target. This is well defined for all targets,
+    including zero, and only zero when the angle equals the target.
+
     Parameters
     ----------
     line_a, line_b : :class:`.Line`
@@ -119,6 +302,9 @@ class LineAngleConstraint(Constraint):
         The angle (in degrees) to constrain the lines to.
     """
 
+    _target_attribute = "_angle"
+    length_residual = False
+
     def __init__(self, line_a, line_b, angle):
         super().__init__([line_a, line_b])
         self._angle = None
@@ -131,6 +317,11 @@ class LineAngleConstraint(Constraint):
     @angle.setter
     def angle(self, angle):
         self._angle = map_angle_about_zero(angle)
+        self._edited()
+
+    @staticmethod
+    def _validate_targets(targets):
+        return map_angle_about_zero(targets)
 
     @property
     def line_a(self):
@@ -140,19 +331,35 @@ class LineAngleConstraint(Constraint):
     def line_b(self):
         return self.primitives[1]
 
+    @property
+    def target(self):
+        return self.angle
+
     def value(self):
         """The current value of the constrained parameter(s)."""
         return self.line_a.angle_to(self.line_b)
 
-    def error(self):
-        """The current angle constraint error.
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        return 2 * np.sin(_angle_errors(coords, indices, targets)[0] / 2)
 
-        Returns
-        -------
-        :class:`float`
-            The error.
-        """
-        return np.abs((self.value() - self.angle) / self.angle) ** 2
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        errors, ax, ay, bx, by, dot, det = _angle_errors(coords, indices, targets)
+        norm = dot**2 + det**2
+
+        # Derivatives of the angle arctan2(det, dot) with respect to each line's
+        # coordinate differences, scaled by the derivative of the residual with respect
+        # to the angle.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(norm > 0, np.cos(errors / 2) / norm, 0)
+
+        d_delta_a = np.stack((-dot * by - det * bx, dot * bx - det * by), axis=-1)
+        d_delta_b = np.stack((dot * ay - det * ax, -dot * ax - det * ay), axis=-1)
+        d_delta_a *= scale[..., np.newaxis]
+        d_delta_b *= scale[..., np.newaxis]
+
+        return np.stack((-d_delta_a, d_delta_a, -d_delta_b, d_delta_b), axis=-2)
 
 
 class PointToPointDistanceConstraint(Constraint):
@@ -167,10 +374,33 @@ class PointToPointDistanceConstraint(Constraint):
         The distance to constrain the points' separation to.
     """
 
+    _target_attribute = "_distance"
+
     def __init__(self, point_a, point_b, distance):
         super().__init__([point_a, point_b])
+        self._distance = None
         self.distance = distance
 
+    @property
+    def distance(self):
+        """The constraint distance."""
+        return self._distance
+
+    @distance.setter
+    def distance(self, distance):
+        if distance < 0:
+            raise ValueError("distance must be >= 0")
+
+        self._distance = distance
+        self._edited()
+
+    @staticmethod
+    def _validate_targets(targets):
+        if np.any(targets < 0):
+            raise ValueError("distance must be >= 0")
+
+        return targets
+
     @property
     def point_a(self):
         return self.primitives[0]
@@ -179,12 +409,359 @@ class PointToPointDistanceConstraint(Constraint):
     def point_b(self):
         return self.primitives[1]
 
-    def error(self):
-        """The current distance constraint error.
+    @property
+    def target(self):
+        return self.distance
+
+    def value(self):
+        """The current value of the constrained parameter(s)."""
+        return np.hypot(*(self.point_a.params - self.point_b.params))
+
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        return _separations(coords, indices) - targets
+
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        return _separation_jacobians(coords, indices)
+
+
+class GeometricConstraint(Constraint):
+    """A constraint on a geometric relation between primitives, such as two lines being
+    parallel.
+
+    Geometric constraints have no target: they are satisfied when their residual is
+    zero. Their :attr:`target` is always zero, and their :meth:`value` is their
+    residual.
+    """
+
+    #: The target, which is always zero.
+    target = 0.0
+
+    @classmethod
+    def many(cls, primitives, targets=None):
+        """Create many constraints of this type at once.
+
+        Parameters
+        ----------
+        primitives : sequence of sequence of :class:`.Primitive`
+            The primitives of each constraint, in the order taken by the constructor.
+
+        targets : array-like, optional
+            The target of each constraint, which must be zero if given.
 
         Returns
         -------
-        :class:`float`
-            The error.
+        :class:`list` of :class:`.Constraint`
+            The constraints.
         """
-        return np.abs((self.point_a - self.point_b).norm() - self.distance)
+        if targets is not None and np.any(np.asarray(targets, dtype=float) != 0):
+            raise ValueError(f"{cls.__name__} targets must be zero")
+
+        constraints = []
+        for constraint_primitives in primitives:
+            constraint = cls.__new__(cls)
+            constraint.primitives = list(constraint_primitives)
+            constraints.append(constraint)
+
+        return constraints
+
+    def value(self):
+        """The current value of the constrained parameter(s)."""
+        return self.residual()
+
+
+class ParallelConstraint(GeometricConstraint):
+    """Constraint that two lines are parallel.
+
+    The lines may point in the same or opposite directions. The residual is the sine of
+    the angle between the lines.
+
+    Parameters
+    ----------
+    line_a, line_b : :class:`.Line`
+        The lines to constrain.
+    """
+
+    length_residual = False
+
+    def __init__(self, line_a, line_b):
+        super().__init__([line_a, line_b])
+
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        return _line_sines(coords, indices)[0]
+
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        sines, ax, ay, bx, by, scale = _line_sines(coords, indices)
+        # Derivatives of the cross product with respect to each line's differences.
+        d_cross_a = np.stack((by, -bx), axis=-1)
+        d_cross_b = np.stack((-ay, ax), axis=-1)
+        return _normalised_jacobians(sines, ax, ay, bx, by, scale, d_cross_a, d_cross_b)
+
+
+class PerpendicularConstraint(GeometricConstraint):
+    """Constraint that two lines are perpendicular.
+
+    The residual is the cosine of the angle between the lines.
+
+    Parameters
+    ----------
+    line_a, line_b : :class:`.Line`
+        The lines to constrain.
+    """
+
+    length_residual = False
+
+    def __init__(self, line_a, line_b):
+        super().__init__([line_a, line_b])
+
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        return _line_cosines(coords, indices)[0]
+
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        cosines, ax, ay, bx, by, scale = _line_cosines(coords, indices)
+        # Derivatives of the dot product with respect to each line's differences.
+        d_dot_a = np.stack((bx, by), axis=-1)
+        d_dot_b = np.stack((ax, ay), axis=-1)
+        return _normalised_jacobians(cosines, ax, ay, bx, by, scale, d_dot_a, d_dot_b)
+
+
+class EqualLengthConstraint(GeometricConstraint):
+    """Constraint that two lines have the same length.
+
+    The residual is the second line's length less the first's.
+
+    Parameters
+    ----------
+    line_a, line_b : :class:`.Line`
+        The lines to constrain.
+    """
+
+    def __init__(self, line_a, line_b):
+        super().__init__([line_a, line_b])
+
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        return _separations(coords, indices[:, 2:]) - _separations(coords, indices)
+
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        return np.concatenate(
+            (
+                -_separation_jacobians(coords, indices),
+                _separation_jacobians(coords, indices[:, 2:]),
+            ),
+            axis=-2,
+        )
+
+
+class HorizontalConstraint(GeometricConstraint):
+    """Constraint that a line is horizontal.
+
+    The residual is the difference between the end and start y-coordinates.
+
+    Parameters
+    ----------
+    line : :class:`.Line`
+        The line to constrain.
+    """
+
+    #: The coordinate that must be equal at both ends.
+    _axis = 1
+
+    def __init__(self, line):
+        super().__init__([line])
+
+    @classmethod
+    def batch_residuals(cls, coords, indices, targets):
+        return _deltas(coords, indices, 0, 1)[cls._axis]
+
+    @classmethod
+    def batch_jacobians(cls, coords, indices, targets):
+        shape = coords.shape[:-2] + (len(indices), 2, 2)
+        jacobians = np.zeros(shape)
+        jacobians[..., 0, cls._axis] = -1
+        jacobians[..., 1, cls._axis] = 1
+        return jacobians
+
+
+class VerticalConstraint(HorizontalConstraint):
+    """Constraint that a line is vertical.
+
+    The residual is the difference between the end and start x-coordinates.
+
+    Parameters
+    ----------
+    line : :class:`.Line`
+        The line to constrain.
+    """
+
+    _axis = 0
+
+
+class CoincidentConstraint(GeometricConstraint):
+    """Constraint that two points coincide.
+
+    The residuals are the x and y differences between the points, rather than the
+    distance between them, whose derivative is undefined where the points coincide.
+    Their :meth:`residual` is the distance.
+
+    Parameters
+    ----------
+    point_a, point_b : :class:`.Point`
+        The points to constrain.
+    """
+
+    nresiduals = 2
+
+    def __init__(self, point_a, point_b):
+        super().__init__([point_a, point_b])
+
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        delta = coords[..., indices[:, 1], :] - coords[..., indices[:, 0], :]
+        return delta.reshape(delta.shape[:-2] + (-1,))
+
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        shape = coords.shape[:-2] + (len(indices), 2, 2, 2)
+        jacobians = np.zeros(shape)
+
+        for axis in range(2):
+            jacobians[..., axis, 0, axis] = -1
+            jacobians[..., axis, 1, axis] = 1
+
+        return jacobians.reshape(shape[:-4] + (-1, 2, 2))
+
+
+class PointOnLineConstraint(GeometricConstraint):
+    """Constraint that a point lies on the infinite extension of a line.
+
+    The residual is the signed perpendicular distance from the line to the point.
+
+    Parameters
+    ----------
+    point : :class:`.Point`
+        The point to constrain.
+
+    line : :class:`.Line`
+        The line.
+    """
+
+    def __init__(self, point, line):
+        super().__init__([point, line])
+
+    @staticmethod
+    def batch_residuals(coords, indices, targets):
+        ux, uy = _deltas(coords, indices, 1, 2)
+        vx, vy = _deltas(coords, indices, 1, 0)
+        length = np.hypot(ux, uy)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(length > 0, (ux * vy - uy * vx) / length, 0)
+
+    @staticmethod
+    def batch_jacobians(coords, indices, targets):
+        ux, uy = _deltas(coords, indices, 1, 2)
+        vx, vy = _deltas(coords, indices, 1, 0)
+        length = np.hypot(ux, uy)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inverse = np.where(length > 0, 1 / length, 0)
+
+        distance = (ux * vy - uy * vx) * inverse
+        # Derivatives with respect to the point's and line end's offsets from the line
+        # start.
+        d_point = np.stack((-uy, ux), axis=-1) * inverse[..., np.newaxis]
+        d_end = np.stack((vy, -vx), axis=-1) * inverse[..., np.newaxis]
+        d_end -= np.stack((ux, uy), axis=-1) * (distance * inverse**2)[..., np.newaxis]
+
+        return np.stack((d_point, -d_point - d_end, d_end), axis=-2)
+
+
+def _angle_errors(coords, indices, targets):
+    """The differences, in radians in the range (-pi, pi], between the angles between
+    each constraint's two lines and the targets, along with the lines' differences and
+    their dot product and determinant."""
+    ax, ay = _deltas(coords, indices, 0, 1)
+    bx, by = _deltas(coords, indices, 2, 3)
+    dot = ax * bx + ay * by
+    det = ay * bx - ax * by
+
+    # Rotate the second line back by the target before taking the angle, so that the
+    # difference is in range without wrapping.
+    targets = np.radians(targets)
+    cos, sin = np.cos(targets), np.sin(targets)
+    errors = np.arctan2(det * cos - dot * sin, dot * cos + det * sin)
+
+    return errors, ax, ay, bx, by, dot, det
+
+
+def _line_sines(coords, indices):
+    """The sines of the angles between each constraint's two lines, along with the
+    lines' differences and the inverse product of their lengths."""
+    ax, ay = _deltas(coords, indices, 0, 1)
+    bx, by = _deltas(coords, indices, 2, 3)
+    scale = _inverse_length_product(ax, ay, bx, by)
+    return (ax * by - ay * bx) * scale, ax, ay, bx, by, scale
+
+
+def _line_cosines(coords, indices):
+    """The cosines of the angles between each constraint's two lines, along with the
+    lines' differences and the inverse product of their lengths."""
+    ax, ay = _deltas(coords, indices, 0, 1)
+    bx, by = _deltas(coords, indices, 2, 3)
+    scale = _inverse_length_product(ax, ay, bx, by)
+    return (ax * bx + ay * by) * scale, ax, ay, bx, by, scale
+
+
+def _inverse_length_product(ax, ay, bx, by):
+    product = np.hypot(ax, ay) * np.hypot(bx, by)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(product > 0, 1 / product, 0)
+
+
+def _normalised_jacobians(values, ax, ay, bx, by, scale, d_product_a, d_product_b):
+    """The derivatives with respect to each constraint's four points of a product of
+    two lines' differences divided by their lengths, given the derivatives of the
+    product with respect to the differences."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse_a = np.where(scale > 0, 1 / (ax**2 + ay**2), 0)
+        inverse_b = np.where(scale > 0, 1 / (bx**2 + by**2), 0)
+
+    d_delta_a = d_product_a * scale[..., np.newaxis]
+    d_delta_a -= np.stack((ax, ay), axis=-1) * (values * inverse_a)[..., np.newaxis]
+    d_delta_b = d_product_b * scale[..., np.newaxis]
+    d_delta_b -= np.stack((bx, by), axis=-1) * (values * inverse_b)[..., np.newaxis]
+
+    return np.stack((-d_delta_a, d_delta_a, -d_delta_b, d_delta_b), axis=-2)
+
+
+def _deltas(coords, indices, start, end):
+    """The x and y differences between two of each constraint's points.
+
+    Any leading (batch) dimensions of `coords` are preserved.
+    """
+    delta = coords[..., indices[:, end], :] - coords[..., indices[:, start], :]
+    return delta[..., 0], delta[..., 1]
+
+
+def _separations(coords, indices):
+    """The distances from the first to the second point of each constraint."""
+    return np.hypot(*_deltas(coords, indices, 0, 1))
+
+
+def _separation_jacobians(coords, indices):
+    """The derivatives of :func:`_separations` with respect to the two points."""
+    delta = np.stack(_deltas(coords, indices, 0, 1), axis=-1)
+    distance = np.hypot(delta[..., 0], delta[..., 1])[..., np.newaxis]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit = np.where(distance > 0, delta / distance, 0)
+
+    return np.stack((-unit, unit), axis=-2)
@@ -0,0 +1,184 @@
+"""Constructive placement of points."""
+
+import numpy as np
+from .constraints import (
+    LineLengthConstraint,
+    LineAngleConstraint,
+    PointToPointDistanceConstraint,
+    HorizontalConstraint,
+    CoincidentConstraint,
+)
+
+
+def construct_points(problem):
+    """Place the points of a problem that can be constructed from its fixed points.
+
+    Points are placed ruler and compass style, starting from the fully fixed points and
+    repeating until no more can be placed:
+
+    - a line with a length constraint and an angle constraint to a line with both
+      points placed, and one of its own points placed, has its other point placed at
+      the given length and angle;
+    - a point coincident with a placed point is placed at the same position;
+    - a horizontal or vertical line with a length constraint and one of its points
+      placed has its other point placed at the given length, on the side nearest its
+      current position;
+    - a point with distance or line length constraints to two other placed points is
+      placed at the intersection of the corresponding circles nearest its current
+      position.
+
+    Only points with both parameters free are placed. The first two constructions fully
+    determine the placed point, given the points it was constructed from; the others
+    have two solutions, so a point placed this way, and any constructed from it, are not
+    considered determined.
+
+    Parameters
+    ----------
+    problem : :class:`.Problem`
+        The problem. Its points' coordinates are updated in place.
+
+    Returns
+    -------
+    placed, determined : :class:`numpy.ndarray`
+        The boolean arrays marking the points that were placed and those that are
+        fully determined by the fixed points, respectively, in store order. Fixed points
+        are determined but not placed.
+    """
+    coords = problem.store.coords
+    free = problem._free_mask()
+    movable = free.all(axis=1)
+    known = ~free.any(axis=1)
+    determined = known.copy()
+    placed = np.zeros(len(coords), dtype=bool)
+
+    lengths = {}
+    neighbours = {}
+    angles = []
+    coincident = []
+    # The axis along which each horizontal or vertical line's points are separated.
+    axes = {}
+
+    for constraint in problem.constraints:
+        if isinstance(
+            constraint, (LineLengthConstraint, PointToPointDistanceConstraint)
+        ):
+            start, end = constraint.point_indices
+            lengths[start, end] = lengths[end, start] = constraint.target
+            neighbours.setdefault(start, []).append((end, constraint.target))
+            neighbours.setdefault(end, []).append((start, constraint.target))
+        elif isinstance(constraint, LineAngleConstraint):
+            indices = constraint.point_indices
+            angles.append((indices[:2], indices[2:], np.radians(constraint.target)))
+        elif isinstance(constraint, CoincidentConstraint):
+            coincident.append(tuple(constraint.point_indices))
+        elif isinstance(constraint, HorizontalConstraint):
+            # Vertical constraints are horizontal constraints on the other axis.
+            axes[tuple(constraint.point_indices)] = 1 - constraint._axis
+
+    def place(index, position, is_determined):
+        nonlocal changed
+        coords[index] = position
+        known[index] = placed[index] = changed = True
+        determined[index] = is_determined
+
+    changed = True
+    while changed:
+        changed = False
+
+        # Lines at a known length and angle from placed lines. The angle from line a
+        # to line b is clockwise, so b's direction is a's less the angle.
+        for line_a, line_b, angle in angles:
+            for reference, (start, end), turn in (
+                (line_a, line_b, -angle),
+                (line_b, line_a, angle),
+            ):
+                if not known[reference].all() or known[start] == known[end]:
+                    continue
+
+                unknown = end if known[start] else start
+                length = lengths.get((start, end))
+
+                if length is None or not movable[unknown]:
+                    continue
+
+                dx, dy = coords[reference[1]] - coords[reference[0]]
+
+                if dx == dy == 0:
+                    continue
+
+                direction = np.arctan2(dy, dx) + turn
+                offset = length * np.array([np.cos(direction), np.sin(direction)])
+                source = start if unknown == end else end
+                position = coords[source] + (offset if unknown == end else -offset)
+                place(
+                    unknown,
+                    position,
+                    determined[reference].all() and determined[source],
+                )
+
+        # Points coinciding with placed points.
+        for a, b in coincident:
+            for source, target in ((a, b), (b, a)):
+                if known[source] and not known[target] and movable[target]:
+                    place(target, coords[source], determined[source])
+
+        # Horizontal and vertical lines of known length from placed points.
+        for (start, end), axis in axes.items():
+            if known[start] == known[end]:
+                continue
+
+            unknown, source = (end, start) if known[start] else (start, end)
+            length = lengths.get((start, end))
+
+            if length is None or not movable[unknown]:
+                continue
+
+            offset = np.zeros(2)
+            offset[axis] = length
+            candidates = (coords[source] + offset, coords[source] - offset)
+            position = min(
+                candidates,
+                key=lambda candidate: np.hypot(*(candidate - coords[unknown])),
+            )
+            place(unknown, position, False)
+
+        # Points at known distances from two placed points.
+        for index, others in neighbours.items():
+            if known[index] or not movable[index]:
+                continue
+
+            centres = [(other, radius) for other, radius in others if known[other]]
+
+            for (a, radius_a), (b, radius_b) in zip(centres, centres[1:]):
+                position = _circle_intersection(
+                    coords[a], radius_a, coords[b], radius_b, coords[index]
+                )
+
+                if position is not None:
+                    place(index, position, False)
+                    break
+
+    return placed, determined
+
+
+def _circle_intersection(centre_a, radius_a, centre_b, radius_b, near):
+    """The intersection of two circles nearest a point, or None if they don't
+    intersect."""
+    delta = centre_b - centre_a
+    distance = np.hypot(*delta)
+
+    if distance == 0 or distance > radius_a + radius_b:
+        return None
+    if distance < abs(radius_a - radius_b):
+        return None
+
+    # Distance along the line between the centres to the chord between the
+    # intersections, and the chord's half length.
+    along = (distance**2 + radius_a**2 - radius_b**2) / (2 * distance)
+    across = np.sqrt(max(radius_a**2 - along**2, 0))
+    unit = delta / distance
+    normal = np.array([-unit[1], unit[0]])
+    midpoint = centre_a + along * unit
+    candidates = (midpoint + across * normal, midpoint - across * normal)
+
+    return min(candidates, key=lambda candidate: np.hypot(*(candidate - near)))
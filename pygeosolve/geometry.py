@@ -6,29 +6,129 @@ import numpy as np
 from .util import map_angle_about_zero
 
 
-class Primitive(metaclass=abc.ABCMeta):
-    """A primitive shape.
+class PointStore:
+    """Contiguous storage of 2D point coordinates.
+
+    Points are stored as rows of a single float64 array, which grows as needed.
+    :class:`Points <.Point>` and other primitives are lightweight handles holding
+    indices into a store.
+
+    The store also records the constraints on its points whose targets or weights are
+    changed, in :attr:`edits`, so that incremental solves only need to look at the
+    parts of a problem affected by edits.
 
     Parameters
     ----------
-    name : :class:`str`
-        The name.
+    capacity : :class:`int`, optional
+        The initial number of points that can be stored before the array is grown.
+    """
+
+    __slots__ = ("_coords", "_size", "names", "edits")
+
+    def __init__(self, capacity=16):
+        self._coords = np.empty((max(capacity, 1), 2), dtype=float)
+        self._size = 0
+        # Names of explicitly named points, by index.
+        self.names = {}
+        #: The constraints edited since they were last compiled for an incremental
+        #: solve.
+        self.edits = set()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def coords(self):
+        """The (n, 2) array of point coordinates.
+
+        This is a view of the underlying storage, which is replaced when the store
+        grows, so it should not be kept across additions.
+        """
+        return self._coords[: self._size]
+
+    def add(self, x, y):
+        """Add a point.
+
+        Parameters
+        ----------
+        x, y : :class:`float`
+            The coordinates.
+
+        Returns
+        -------
+        :class:`int`
+            The index of the new point.
+        """
+        return self.extend([(x, y)])[0]
 
-    points : sequence
-        The points that make up the primitive.
+    def extend(self, coords):
+        """Add many points.
+
+        Parameters
+        ----------
+        coords : array-like
+            The (n, 2) coordinates of the points to add.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The indices of the new points.
+        """
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        start = self._size
+        stop = start + len(coords)
+
+        if stop > len(self._coords):
+            capacity = max(stop, 2 * len(self._coords))
+            grown = np.empty((capacity, 2), dtype=float)
+            grown[:start] = self._coords[:start]
+            self._coords = grown
+
+        self._coords[start:stop] = coords
+        self._size = stop
+
+        return np.arange(start, stop)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}@{hex(id(self))} (n={len(self)})>"
+
+
+class Primitive(metaclass=abc.ABCMeta):
+    """A primitive shape.
+
+    Primitives are handles to points in a :class:`.PointStore`.
     """
 
-    def __init__(self, name, points):
-        self.name = name
+    __slots__ = ()
+
+    @property
+    @abc.abstractmethod
+    def points(self):
+        """The points that make up the primitive."""
+        raise NotImplementedError
 
-        for i, point in enumerate(points):
-            if not isinstance(point, Point):
-                points[i] = Point(f"__{self.name}_p{i}__", *point)
+    @property
+    @abc.abstractmethod
+    def point_indices(self):
+        """The indices of the primitive's points in its store."""
+        raise NotImplementedError
 
-        # Quick check that names are unique.
-        assert len(set(p.name for p in points)) == len(points)
+    @staticmethod
+    def _point_index(point, store):
+        """The index of a point in a store, adding it to the store if necessary.
 
-        self.points = points
+        Parameters
+        ----------
+        point : :class:`.Point` or :class:`tuple`
+            A point in `store`, or the coordinates of a new point.
+
+        store : :class:`.PointStore`
+            The store.
+        """
+        if isinstance(point, Point):
+            return point._index
+
+        return store.add(*point)
 
     @abc.abstractmethod
     def __str__(self):
@@ -47,6 +147,9 @@ class Point(Primitive):
     Normally points should not be instantiated directly, but via :class:`primitives
     <.Primitive>`.
 
+    Points are handles to a row of a :class:`.PointStore`; two points are equal if they
+    refer to the same row of the same store.
+
     Parameters
     ----------
     name : :class:`str`
@@ -54,19 +157,64 @@ class Point(Primitive):
 
     x, y : :class:`float`
         The x and y coordinates.
+
+    store : :class:`.PointStore`, optional
+        The store to add the point to. Defaults to a new store.
     """
 
-    def __init__(self, name, x, y):
-        super().__init__(name, [self])
-        self.params = [x, y]
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, name, x, y, store=None):
+        if store is None:
+            store = PointStore(capacity=1)
+
+        self._store = store
+        self._index = store.add(x, y)
+
+        if name is not None:
+            store.names[self._index] = name
+
+    @classmethod
+    def _view(cls, store, index):
+        """A handle to an existing point in a store."""
+        point = cls.__new__(cls)
+        point._store = store
+        point._index = int(index)
+        return point
+
+    @property
+    def name(self):
+        return self._store.names.get(self._index, f"__p{self._index}__")
+
+    @property
+    def index(self):
+        """The index of this point in its store, and so in :attr:`.Problem.points`.
+
+        This identifies an existing point to bulk methods such as
+        :meth:`.Problem.add_lines`.
+        """
+        return self._index
+
+    @property
+    def points(self):
+        return (self,)
+
+    @property
+    def point_indices(self):
+        return (self._index,)
+
+    @property
+    def params(self):
+        """The coordinates, as a writable view of the point's row in its store."""
+        return self._store._coords[self._index]
 
     @property
     def x(self):
-        return self.params[0]
+        return self._store._coords[self._index, 0]
 
     @property
     def y(self):
-        return self.params[1]
+        return self._store._coords[self._index, 1]
 
     def norm(self):
         return np.sqrt(np.power(self.x, 2) + np.power(self.y, 2))
@@ -81,6 +229,15 @@ class Point(Primitive):
             self._op_name("-", other), self.x - other.x, self.y - other.y
         )
 
+    def __eq__(self, other):
+        if not isinstance(other, Point):
+            return NotImplemented
+
+        return self._store is other._store and self._index == other._index
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+
     def __str__(self):
         return f"{self.__class__.__name__}({self.name}, ({self.x}, {self.y}))"
 
@@ -93,20 +250,71 @@ class Line(Primitive):
 
     Parameters
     ----------
+    name : :class:`str`
+        The name.
+
     start, end : :class:`tuple` containg two :class:`floats <float>` or
                  :class:`points <.Point>`
+        The points. Points must be in `store`, and are shared; coordinates are added
+        to it as new points.
+
+    store : :class:`.PointStore`, optional
+        The store holding the line's points. Defaults to the store of `start` or
+        `end`, if either is a point, otherwise a new store.
+
+    Raises
+    ------
+    :class:`ValueError`
+        If `start` or `end` is a point in a different store.
     """
 
-    def __init__(self, name, start, end):
-        super().__init__(name, [start, end])
+    __slots__ = ("name", "_store", "_indices")
+
+    def __init__(self, name, start, end, store=None):
+        if store is None:
+            stores = [
+                point._store for point in (start, end) if isinstance(point, Point)
+            ]
+            store = stores[0] if stores else PointStore(capacity=2)
+
+        for point in (start, end):
+            # Points are rows of their store, so can't be shared with another.
+            if isinstance(point, Point) and point._store is not store:
+                raise ValueError(
+                    f"{point} belongs to another store; pass its coordinates to copy it"
+                )
+
+        self.name = name
+        self._store = store
+        self._indices = (
+            self._point_index(start, store),
+            self._point_index(end, store),
+        )
+
+    @classmethod
+    def _view(cls, store, name, start, end):
+        """A line between existing points in a store, given their indices."""
+        line = cls.__new__(cls)
+        line.name = name
+        line._store = store
+        line._indices = (int(start), int(end))
+        return line
+
+    @property
+    def points(self):
+        return tuple(Point._view(self._store, index) for index in self._indices)
+
+    @property
+    def point_indices(self):
+        return self._indices
 
     @property
     def start(self):
-        return self.points[0]
+        return Point._view(self._store, self._indices[0])
 
     @property
     def end(self):
-        return self.points[1]
+        return Point._view(self._store, self._indices[1])
 
     def dx(self):
         """The difference between the end and start x-coordinates.
@@ -116,7 +324,8 @@ class Line(Primitive):
         :class:`float`
             The difference.
         """
-        return self.end.x - self.start.x
+        start, end = self._indices
+        return self._store._coords[end, 0] - self._store._coords[start, 0]
 
     def dy(self):
         """The difference between the end and start y-coordinates.
@@ -126,7 +335,8 @@ class Line(Primitive):
         :class:`float`
             The difference.
         """
-        return self.end.y - self.start.y
+        start, end = self._indices
+        return self._store._coords[end, 1] - self._store._coords[start, 1]
 
     def length(self):
         """The line length.
@@ -136,7 +346,7 @@ class Line(Primitive):
         :class:`float`
             The length.
         """
-        return (self.end - self.start).norm()
+        return np.hypot(self.dx(), self.dy())
 
     def angle(self):
         """The angle of the vector formed by this line translated to the origin.
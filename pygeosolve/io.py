@@ -0,0 +1,413 @@
+"""Binary problem files.
+
+Problems are stored as a set of arrays in a single file: an 8 byte magic string, a
+little-endian 32-bit format version and header length, a JSON header, then the arrays,
+each aligned to 64 bytes. The header describes the location, type and shape of each
+array, and holds the names of the primitives and points and the problem's
+:attr:`~.Problem.scale`.
+
+The arrays are:
+
+``coords``
+    The (n, 2) float64 point coordinates.
+``fixed``
+    The (n, 2) boolean array marking fixed parameters.
+``primitive_kinds``
+    The (q,) uint8 kind of each primitive: 0 for points, 1 for lines.
+``primitive_points``
+    The (q, 2) int64 point indices of each primitive, padded with -1.
+``constraint_kinds``
+    The (c,) uint8 index of each constraint's type in the header's list of types.
+``constraint_primitives``
+    The (c, 2) int64 primitive indices of each constraint, padded with -1.
+``constraint_points``
+    The (c, k) int64 point indices of each constraint, padded with -1.
+``constraint_targets``
+    The (c,) float64 target of each constraint.
+``constraint_weights``
+    The (c,) float64 weight of each constraint.
+``solutions``
+    The (b, p) float64 values of the p free parameters of each of b solutions, in the
+    order of :attr:`.Problem.free_params`.
+
+The first primitives are those of the problem, in the order they were added; any
+further primitives are points referenced by constraints but not added to the problem.
+
+Version 2 added the constraint weights and scale. Version 1 files are loaded with unit
+weights and an automatic scale.
+"""
+
+import json
+import struct
+import numpy as np
+from . import constraints as constraints_module
+from .geometry import Point, Line
+
+#: File signature.
+MAGIC = b"PYGEOSLV"
+
+#: Current format version.
+VERSION = 2
+
+# Alignment of the arrays, in bytes.
+ALIGNMENT = 64
+
+# Primitive kinds.
+POINT = 0
+LINE = 1
+
+
+class ProblemArrays:
+    """A problem stored as arrays.
+
+    Normally this should not be instantiated directly, but via :func:`load_arrays`.
+
+    Parameters
+    ----------
+    arrays : :class:`dict`
+        The arrays, by name; see :mod:`.io`.
+
+    header : :class:`dict`
+        The file header.
+    """
+
+    def __init__(self, arrays, header):
+        self.arrays = arrays
+        self.header = header
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["arrays"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @property
+    def constraint_types(self):
+        """The constraint types, indexed by :attr:`constraint_kinds`."""
+        return [
+            getattr(constraints_module, name) for name in self.header["constraints"]
+        ]
+
+    def to_problem(self):
+        """Build a problem from the arrays.
+
+        Returns
+        -------
+        :class:`.Problem`
+            The problem.
+        """
+        from .problem import Problem
+
+        problem = Problem()
+        store = problem.store
+        store.extend(self.coords)
+        store.names.update(
+            {int(index): name for index, name in self.header["point_names"].items()}
+        )
+
+        names = self.header["names"]
+        primitives = []
+        for index, (kind, points) in enumerate(
+            zip(self.primitive_kinds, self.primitive_points)
+        ):
+            if kind == POINT:
+                primitive = Point._view(store, points[0])
+            elif kind == LINE:
+                start, end = (Point._view(store, point) for point in points)
+                name = names[index] if index < len(names) else None
+                primitive = Line(name, start, end, store=store)
+            else:
+                raise ValueError(f"unknown primitive kind {kind}")
+
+            if index < len(names):
+                problem._add(primitive)
+
+            primitives.append(primitive)
+
+        # Create the constraints of each type together, then restore their order.
+        kinds = np.asarray(self.constraint_kinds)
+        constraints = [None] * len(kinds)
+        for kind, constraint_type in enumerate(self.constraint_types):
+            positions = np.flatnonzero(kinds == kind)
+            arguments = [
+                [primitives[index] for index in references if index >= 0]
+                for references in self.constraint_primitives[positions].tolist()
+            ]
+            targets = self.constraint_targets[positions]
+
+            for position, constraint in zip(
+                positions, constraint_type.many(arguments, targets)
+            ):
+                constraints[position] = constraint
+
+        if "constraint_weights" in self.arrays:
+            for constraint, weight in zip(
+                constraints, self.constraint_weights.tolist()
+            ):
+                if weight != 1:
+                    constraint.weight = weight
+
+        problem.constraints.extend(constraints)
+        problem.scale = self.header.get("scale")
+
+        problem.fixed_points.update(
+            (Point._view(store, index), int(param))
+            for index, param in np.argwhere(self.fixed)
+        )
+        problem._invalidate_caches()
+
+        return problem
+
+
+def save(problem, path, solutions=None):
+    """Save a problem to a file.
+
+    Parameters
+    ----------
+    problem : :class:`.Problem`
+        The problem.
+
+    path : :class:`str` or file
+        The file to write.
+
+    solutions : :class:`numpy.ndarray`, optional
+        The (b, p) array of the values of the p :attr:`.Problem.free_params` of b
+        solutions to store with the problem.
+    """
+    primitives = list(problem.primitives.values())
+    registered = len(primitives)
+    # Map from primitive identity to index; points are equal if they share a row.
+    index = {_primitive_key(primitive): i for i, primitive in enumerate(primitives)}
+
+    types = []
+    kinds = []
+    references = []
+    for constraint in problem.constraints:
+        name = type(constraint).__name__
+        if name not in types:
+            types.append(name)
+        kinds.append(types.index(name))
+
+        constraint_references = []
+        for primitive in constraint.primitives:
+            key = _primitive_key(primitive)
+            if key not in index:
+                index[key] = len(primitives)
+                primitives.append(primitive)
+            constraint_references.append(index[key])
+        references.append(constraint_references)
+
+    primitive_kinds = [POINT if isinstance(p, Point) else LINE for p in primitives]
+    arrays = {
+        "coords": problem.store.coords,
+        "fixed": ~problem._free_mask(),
+        "primitive_kinds": np.array(primitive_kinds, dtype=np.uint8),
+        "primitive_points": _padded([p.point_indices for p in primitives], 2),
+        "constraint_kinds": np.array(kinds, dtype=np.uint8),
+        "constraint_primitives": _padded(references, 2),
+        "constraint_points": _padded(
+            [constraint.point_indices for constraint in problem.constraints]
+        ),
+        "constraint_targets": np.array(
+            [constraint.target for constraint in problem.constraints], dtype=float
+        ),
+        "constraint_weights": np.array(
+            [constraint.weight for constraint in problem.constraints], dtype=float
+        ),
+    }
+
+    if solutions is not None:
+        solutions = np.asarray(solutions, dtype=float)
+
+        if solutions.ndim != 2 or solutions.shape[1] != len(problem.free_params):
+            raise ValueError("solutions must have shape (b, number of free params)")
+
+        arrays["solutions"] = solutions
+
+    header = {
+        "names": [primitive.name for primitive in primitives[:registered]],
+        "point_names": {str(i): name for i, name in problem.store.names.items()},
+        "constraints": types,
+        "scale": problem.scale,
+        "arrays": {},
+    }
+    write_arrays(path, arrays, header)
+
+
+def _primitive_key(primitive):
+    if isinstance(primitive, Point):
+        return ("point", primitive._index)
+
+    return id(primitive)
+
+
+def _padded(rows, width=None):
+    """A 2D int64 array of rows of indices, padded with -1."""
+    if width is None:
+        width = max((len(row) for row in rows), default=0)
+
+    array = np.full((len(rows), width), -1, dtype=np.int64)
+    for i, row in enumerate(rows):
+        array[i, : len(row)] = row
+
+    return array
+
+
+def write_arrays(path, arrays, header):
+    """Write arrays to a file in the problem file format.
+
+    Parameters
+    ----------
+    path : :class:`str` or file
+        The file to write.
+
+    arrays : :class:`dict`
+        The arrays, by name.
+
+    header : :class:`dict`
+        Additional JSON-serialisable header data. Its ``arrays`` item is replaced by
+        the descriptions of the arrays.
+    """
+    arrays = {
+        name: np.ascontiguousarray(array).astype(
+            np.dtype(array.dtype).newbyteorder("<"), copy=False
+        )
+        for name, array in arrays.items()
+    }
+
+    # The offsets depend on the header length, which depends on the offsets, so fix
+    # the header length by reserving space for the largest possible offsets.
+    def encode(start):
+        offset = start
+        descriptions = {}
+        for name, array in arrays.items():
+            offset = _aligned(offset)
+            descriptions[name] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset,
+            }
+            offset += array.nbytes
+        return json.dumps({**header, "arrays": descriptions}).encode()
+
+    prefix = len(MAGIC) + 8
+    size = len(encode(2**62))
+    start = _aligned(prefix + size)
+    encoded = encode(start).ljust(size)
+
+    def write(file):
+        file.write(MAGIC)
+        file.write(struct.pack("<II", VERSION, len(encoded)))
+        file.write(encoded)
+        position = prefix + len(encoded)
+
+        for array in arrays.values():
+            padding = _aligned(position) - position
+            file.write(b"\0" * padding)
+            file.write(array.tobytes())
+            position += padding + array.nbytes
+
+    if hasattr(path, "write"):
+        write(path)
+    else:
+        with open(path, "wb") as file:
+            write(file)
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def read_header(path):
+    """Read the header of a problem file.
+
+    Parameters
+    ----------
+    path : :class:`str`
+        The file.
+
+    Returns
+    -------
+    :class:`dict`
+        The header.
+
+    Raises
+    ------
+    :class:`ValueError`
+        If the file is not a problem file, or has an unsupported version.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a pygeosolve problem file")
+
+        version, size = struct.unpack("<II", file.read(8))
+
+        if version > VERSION:
+            raise ValueError(
+                f"{path} has format version {version}, but only versions up to "
+                f"{VERSION} are supported"
+            )
+
+        header = json.loads(file.read(size))
+
+    header["version"] = version
+    return header
+
+
+def load_arrays(path, mmap=True):
+    """Load the arrays of a problem file.
+
+    Parameters
+    ----------
+    path : :class:`str`
+        The file.
+
+    mmap : :class:`bool`, optional
+        Memory-map the arrays rather than reading them, so that only the parts that
+        are accessed are read from disk. Defaults to True.
+
+    Returns
+    -------
+    :class:`.ProblemArrays`
+        The arrays.
+    """
+    header = read_header(path)
+    arrays = {}
+
+    with open(path, "rb") as file:
+        for name, description in header["arrays"].items():
+            dtype = np.dtype(description["dtype"])
+            shape = tuple(description["shape"])
+            count = int(np.prod(shape))
+
+            if mmap and count:
+                array = np.memmap(
+                    path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=description["offset"],
+                    shape=shape,
+                )
+            else:
+                file.seek(description["offset"])
+                array = np.fromfile(file, dtype=dtype, count=count).reshape(shape)
+
+            arrays[name] = array
+
+    return ProblemArrays(arrays, header)
+
+
+def load(path):
+    """Load a problem from a file.
+
+    Parameters
+    ----------
+    path : :class:`str`
+        The file.
+
+    Returns
+    -------
+    :class:`.Problem`
+        The problem.
+    """
+    return load_arrays(path, mmap=False).to_problem()
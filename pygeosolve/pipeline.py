@@ -0,0 +1,250 @@
+"""Streaming solves of many problems."""
+
+import os
+
+# The reason given by a solve stopped by its time limit.
+_DEADLINE = "deadline reached"
+
+
+class SolveTimeout(Exception):
+    """The error of an item whose solve reached its time limit before finding a
+    solution."""
+
+
+class StreamResult:
+    """The outcome of solving one item of a stream.
+
+    Parameters
+    ----------
+    index : :class:`int`
+        The position of the item in the stream.
+
+    item : object
+        The item.
+
+    problem : :class:`.Problem` or None
+        The solved problem, or None if it could not be loaded.
+
+    result : :class:`scipy.optimize.OptimizeResult` or None
+        The optimisation result, or None if the item could not be loaded or solved.
+
+    error : :class:`Exception` or None
+        The exception raised while loading or solving the item, if any, or a
+        :class:`SolveTimeout` if the solve reached its time limit before finding a
+        solution.
+    """
+
+    __slots__ = ("index", "item", "problem", "result", "error")
+
+    def __init__(self, index, item, problem, result, error):
+        self.index = index
+        self.item = item
+        self.problem = problem
+        self.result = result
+        self.error = error
+
+    @property
+    def success(self):
+        """Whether the item was loaded and solved successfully."""
+        return self.error is None and bool(self.result.success)
+
+    @property
+    def timed_out(self):
+        """Whether the solve was stopped by its time limit."""
+        return self.result is not None and self.result.get("stopped") == _DEADLINE
+
+    def __repr__(self):
+        status = "success" if self.success else f"failure: {self.error!r}"
+        return f"<{self.__class__.__name__}(index={self.index}, {status})>"
+
+
+def load_item(item):
+    """Get the problem defined by a stream item.
+
+    Parameters
+    ----------
+    item : :class:`.Problem`, :class:`str` or :class:`os.PathLike`
+        A problem, or the path to a problem file written by :meth:`.Problem.save`.
+
+    Returns
+    -------
+    :class:`.Problem`
+        The problem.
+    """
+    from .problem import Problem
+
+    if isinstance(item, Problem):
+        return item
+
+    if isinstance(item, (str, os.PathLike)):
+        return Problem.load(item)
+
+    raise TypeError(f"cannot load a problem from {item!r}")
+
+
+def solve_stream(
+    items,
+    load=load_item,
+    workers=None,
+    executor=None,
+    max_pending=None,
+    timeout=None,
+    ordered=False,
+    **kwargs,
+):
+    """Solve a stream of problems, yielding the results as they complete.
+
+    Items are only taken from `items` as there is capacity to solve them, so that at
+    most `max_pending` items are loaded or awaiting collection at once, regardless of
+    the length of the stream. Failures to load or solve an item are reported in its
+    result rather than raised.
+
+    Parameters
+    ----------
+    items : iterable
+        The problem definitions, which can be a generator.
+
+    load : callable, optional
+        Function to build a :class:`.Problem` from an item. When solving in worker
+        processes this is called in the worker, so must be picklable, as must the
+        items. Defaults to :func:`load_item`.
+
+    workers : :class:`int`, optional
+        Solve in parallel using a pool of this many processes. Cannot be used with
+        `executor`. Defaults to solving the items one after the other in this process.
+
+    executor : :class:`concurrent.futures.Executor`, optional
+        Executor with which to solve the items in parallel.
+
+    max_pending : :class:`int`, optional
+        The maximum number of items being solved or awaiting collection. Defaults to
+        twice the number of workers, or one when solving in this process.
+
+    timeout : :class:`float`, optional
+        The time limit for solving each item, in seconds, passed to
+        :meth:`.Problem.solve`. An item reaching it keeps the best solution found so
+        far in its result, and fails with :class:`SolveTimeout` if that does not
+        satisfy the constraints.
+
+    ordered : :class:`bool`, optional
+        Yield the results in the order of the items, rather than as they complete.
+        Defaults to False.
+
+    Other Parameters
+    ----------------
+    kwargs
+        Keyword arguments supported by :meth:`.Problem.solve`. These must be
+        picklable when solving in worker processes.
+
+    Yields
+    ------
+    :class:`.StreamResult`
+        The result of each item.
+    """
+    if workers is not None and executor is not None:
+        raise ValueError("workers and executor cannot both be given")
+
+    if workers is None and executor is None:
+        for index, item in enumerate(items):
+            yield StreamResult(index, item, *_solve_item(load, item, timeout, kwargs))
+        return
+
+    if workers is not None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers) as executor:
+            yield from _stream(
+                items,
+                load,
+                executor,
+                max_pending or 2 * workers,
+                timeout,
+                ordered,
+                kwargs,
+            )
+    else:
+        yield from _stream(
+            items,
+            load,
+            executor,
+            max_pending or 2 * (os.cpu_count() or 1),
+            timeout,
+            ordered,
+            kwargs,
+        )
+
+
+def _stream(items, load, executor, max_pending, timeout, ordered, kwargs):
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    items = enumerate(items)
+    pending = {}
+    # Results completed out of order, when ordering.
+    completed = {}
+    next_index = 0
+    exhausted = False
+
+    try:
+        while True:
+            # Keep the executor busy, without taking more items than can be held.
+            while not exhausted and len(pending) + len(completed) < max_pending:
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                future = executor.submit(_solve_item, load, item, timeout, kwargs)
+                pending[future] = (index, item)
+
+            if not pending and not completed:
+                return
+
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                done = ()
+
+            for future in done:
+                index, item = pending.pop(future)
+
+                try:
+                    outcome = future.result()
+                except Exception as error:
+                    # E.g. the worker process died, or the result couldn't be pickled.
+                    outcome = (None, None, error)
+
+                result = StreamResult(index, item, *outcome)
+
+                if ordered:
+                    completed[index] = result
+                else:
+                    yield result
+
+            while next_index in completed:
+                yield completed.pop(next_index)
+                next_index += 1
+    finally:
+        # The consumer stopped early, or an error occurred.
+        for future in pending:
+            future.cancel()
+
+
+def _solve_item(load, item, timeout, kwargs):
+    """Load and solve an item, returning the problem, result and exception."""
+    problem = None
+
+    try:
+        problem = load(item)
+        result = problem.solve(timeout=timeout, **kwargs)
+    except Exception as error:
+        return problem, None, error
+
+    error = None
+    if not result.success and result.get("stopped") == _DEADLINE:
+        evaluations = result.stats.evaluations
+        error = SolveTimeout(
+            f"solve reached its time limit after {evaluations} evaluations"
+        )
+
+    return problem, result, error
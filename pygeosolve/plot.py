@@ -1,10 +1,5 @@
 """Plotting."""
 
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Arc
-
-
 try:
     from itertools import pairwise
 except ImportError:
@@ -18,6 +13,8 @@ except ImportError:
 
 
 def plot_problem(problem):
+    import matplotlib.pyplot as plt
+
     fig = plt.figure()
     ax = fig.gca()
     ax.set_aspect("equal", "datalim")
@@ -32,4 +29,6 @@ def plot_problem(problem):
 
 
 def show():
+    import matplotlib.pyplot as plt
+
     plt.show()
@@ -1,22 +1,68 @@
 """Constraint problems."""
 
+import copy
 import warnings
 from functools import cached_property
-from scipy.optimize import basinhopping
-from .geometry import Point, Line, Invalid
-from .constraints import LineLengthConstraint, LineAngleConstraint
+from time import perf_counter, time
+import numpy as np
+from .analysis import Analysis, analyse_component
+from .geometry import PointStore, Point, Line, Invalid
+from .constraints import (
+    LineLengthConstraint,
+    LineAngleConstraint,
+    PointToPointDistanceConstraint,
+    ParallelConstraint,
+    PerpendicularConstraint,
+    EqualLengthConstraint,
+    HorizontalConstraint,
+    VerticalConstraint,
+    CoincidentConstraint,
+    PointOnLineConstraint,
+)
+from .compiled import CompiledProblem, ConstraintGroup
+from .constructive import construct_points
+from .io import save as save_problem, load as load_problem
+from .spatial import SpatialIndex, coincident_groups
+from .solvers import get_solver, solve_all, solve_batch, _solve_task
+from .stats import SolveStats
+from .util import map_angle_about_zero
 
 # Indent size.
 INDENT = " " * 4
 
+# Constraints with length targets, which set the length scale.
+LENGTH_CONSTRAINTS = (LineLengthConstraint, PointToPointDistanceConstraint)
+
 
 class Problem:
     def __init__(self):
         self.primitives = {}
         self.constraints = []
         self.fixed_points = set()
-        self._param_id_map = {}
-        self._id_param_map = {}
+        self.store = PointStore()
+        self._initial = None
+        self._constructed = 0
+        self._scale = None
+        self._solved_coords = None
+
+    def __getstate__(self):
+        # The caches hold compiled problems tied to this process's store, so are rebuilt
+        # when needed rather than serialised.
+        state = self.__dict__.copy()
+        for attrib in self._cached + ("_structure",):
+            state.pop(attrib, None)
+        return state
+
+    @property
+    def scale(self):
+        """The length scale by which length residuals are divided, or None to choose it
+        automatically; see :meth:`length_scale`."""
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale):
+        self._scale = scale
+        self._invalidate_caches()
 
     def __getitem__(self, item):
         try:
@@ -25,60 +71,463 @@ class Problem:
             raise ValueError(f"{repr(item)} is not part of this problem")
 
     def add_point(self, *args, **kwargs):
-        self._add(Point(*args, **kwargs))
+        self._add(Point(*args, store=self.store, **kwargs))
+
+    def add_line(self, name, start, end, merge=None):
+        """Add a line.
+
+        Parameters
+        ----------
+        name : :class:`str`
+            The name.
+
+        start, end : :class:`tuple` containg two :class:`floats <float>` or
+                     :class:`points <.Point>`
+            The points. Points must be part of this problem, and are shared;
+            coordinates are added to the problem as new points.
+
+        merge : :class:`float`, optional
+            If given, coordinates given for `start` or `end` within this distance of an
+            existing point use that point rather than adding a new one.
+
+        Raises
+        ------
+        :class:`ValueError`
+            If `start` or `end` is a point that is not part of this problem.
+        """
+        if merge is not None:
+            start, end = (self._merged_point(point, merge) for point in (start, end))
+
+        self._add(Line(name, start, end, store=self.store))
+
+    def add_lines(self, names, start, end, merge=None):
+        """Add many lines at once.
+
+        This is equivalent to calling :meth:`add_line` for each line, but is much
+        faster for large numbers of lines.
+
+        Parameters
+        ----------
+        names : sequence of :class:`str`
+            The names of the m lines.
+
+        start, end : array-like
+            The start and end points of the lines, each either as an (m,) integer array
+            of indices of existing points in :attr:`points`, such as those returned by
+            :meth:`add_points` or given by :attr:`.Point.index`, or an (m, 2) array of
+            the coordinates of new points. Existing lines are instead referred to by
+            name in the bulk constraint methods, such as
+            :meth:`constrain_line_lengths`.
+
+        merge : :class:`float`, optional
+            If given, coordinates given for `start` or `end` within this distance of an
+            existing point, or of each other, share a point rather than each adding a
+            new one.
+        """
+        names = list(names)
+        count = len(names)
+
+        if len(set(names)) != count:
+            raise ValueError("line names must be unique")
+
+        duplicates = [name for name in names if name in self.primitives]
+        if duplicates:
+            raise ValueError(f"{repr(duplicates[0])} already in problem")
+
+        start, end = (self._endpoints(points, count) for points in (start, end))
+        new = [points for points in (start, end) if points.dtype.kind == "f"]
+
+        if new:
+            # Add the new points together, so that they can be merged with each other.
+            indices = iter(np.split(self._add_coords(np.vstack(new), merge), len(new)))
+            start, end = (
+                next(indices) if points.dtype.kind == "f" else points
+                for points in (start, end)
+            )
+
+        store = self.store
+        self.primitives.update(
+            (name, Line._view(store, name, *indices))
+            for name, indices in zip(names, zip(start.tolist(), end.tolist()))
+        )
+        self._invalidate_caches()
+
+    def _endpoints(self, points, count):
+        """Check line endpoints given to :meth:`add_lines`."""
+        points = np.asarray(points)
 
-    def add_line(self, *args, **kwargs):
-        self._add(Line(*args, **kwargs))
+        if points.dtype.kind in "iu" and points.shape == (count,):
+            if np.any((points < 0) | (points >= len(self.store))):
+                raise ValueError("point index out of range")
+
+            return points.astype(np.intp)
+
+        if points.shape == (count, 2):
+            return points.astype(float)
+
+        raise ValueError(
+            "line endpoints must be an array of point indices or coordinates, with one "
+            "for each line"
+        )
+
+    def _merged_point(self, point, merge):
+        """The existing point within `merge` of the coordinates `point`, if any."""
+        if isinstance(point, Point):
+            return point
+
+        _, index = self.spatial_index.nearest(point, merge)
+
+        return point if index < 0 else Point._view(self.store, index)
+
+    def add_points(self, coords, merge=None):
+        """Add unnamed points.
+
+        The points can be used as line endpoints via :attr:`points`.
+
+        Parameters
+        ----------
+        coords : array-like
+            The (n, 2) coordinates of the points.
+
+        merge : :class:`float`, optional
+            If given, coordinates within this distance of an existing point, or of each
+            other, share a point rather than each adding a new one. Coordinates are
+            grouped transitively, so a chain of close coordinates shares one point,
+            which is an existing point if any of them is close to one.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (n,) indices in :attr:`points` of the point at each of the coordinates.
+        """
+        indices = self._add_coords(coords, merge)
+        self._invalidate_caches()
+        return indices
+
+    def _add_coords(self, coords, merge=None):
+        """Add points at coordinates, returning their indices in the store."""
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+
+        if merge is None:
+            return self.store.extend(coords)
+
+        count = len(self.store)
+        _, nearest = self.spatial_index.nearest(coords, merge)
+        groups = coincident_groups(coords, merge)
+        # Each group shares the first existing point near any of its coordinates, if
+        # there is one.
+        indices = np.full(len(coords), count, dtype=np.intp)
+        np.minimum.at(indices, groups, np.where(nearest < 0, count, nearest))
+        indices = indices[groups]
+
+        new = np.flatnonzero(indices == count)
+        first = new[groups[new] == new]
+        # The store index of the point added for each group, by its first coordinate.
+        added = np.empty(len(coords), dtype=np.intp)
+        added[first] = self.store.extend(coords[first])
+        indices[new] = added[groups[new]]
+
+        return indices
 
     def _add(self, primitive):
         if primitive.name in self.primitives:
             raise ValueError(f"{repr(primitive.name)} already in problem")
 
         self.primitives[primitive.name] = primitive
+        self._invalidate_caches()
 
     @cached_property
     def points(self):
-        points = set()
+        """The points in this problem, in the order they were added."""
+        return [Point._view(self.store, index) for index in range(len(self.store))]
 
-        for primitive in self.primitives.values():
-            points.update(primitive.points)
+    @cached_property
+    def spatial_index(self):
+        """The index of the points' coordinates, for proximity queries.
+
+        The index follows changes to the points' coordinates, including those made by
+        solving.
+
+        Returns
+        -------
+        :class:`.SpatialIndex`
+            The index.
+        """
+        return SpatialIndex(self.store)
+
+    def nearest_point(self, x, y, max_distance=np.inf):
+        """Find the point nearest to some coordinates.
 
-        return points
+        Parameters
+        ----------
+        x, y : :class:`float`
+            The coordinates.
+
+        max_distance : :class:`float`, optional
+            Only consider points at most this far away.
+
+        Returns
+        -------
+        :class:`.Point` or None
+            The nearest point, or None if there is no point within `max_distance`.
+        """
+        _, index = self.spatial_index.nearest((x, y), max_distance)
+
+        if index < 0:
+            return None
+
+        return Point._view(self.store, index)
+
+    def points_within(self, x, y, radius):
+        """Find the points within a distance of some coordinates.
+
+        Parameters
+        ----------
+        x, y : :class:`float`
+            The coordinates.
+
+        radius : :class:`float`
+            The distance.
+
+        Returns
+        -------
+        :class:`list` of :class:`.Point`
+            The points, in the order they were added.
+        """
+        indices = self.spatial_index.within((x, y), radius)
+        return [Point._view(self.store, index) for index in indices]
+
+    def points_in_box(self, xmin, ymin, xmax, ymax):
+        """Find the points within an axis-aligned bounding box.
+
+        Parameters
+        ----------
+        xmin, ymin, xmax, ymax : :class:`float`
+            The box's bounds, which are included in the box.
+
+        Returns
+        -------
+        :class:`list` of :class:`.Point`
+            The points, in the order they were added.
+        """
+        indices = self.spatial_index.in_box(xmin, ymin, xmax, ymax)
+        return [Point._view(self.store, index) for index in indices]
+
+    @cached_property
+    def _lines(self):
+        """The lines, in the order they were added, and the (m, 2) array of the store
+        indices of their points."""
+        lines = [
+            primitive
+            for primitive in self.primitives.values()
+            if isinstance(primitive, Line)
+        ]
+        indices = np.array([line.point_indices for line in lines], dtype=np.intp)
+        return lines, indices.reshape(-1, 2)
+
+    @cached_property
+    def _other_primitives(self):
+        """The primitives other than lines, in the order they were added."""
+        return [
+            primitive
+            for primitive in self.primitives.values()
+            if not isinstance(primitive, Line)
+        ]
+
+    @property
+    def line_names(self):
+        """The names of the lines, in the order they were added.
+
+        This is the order of the results of the line queries such as
+        :meth:`line_lengths`.
+        """
+        return [line.name for line in self._lines[0]]
+
+    def point_coords(self):
+        """The coordinates of all of the points.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (n, 2) array of the coordinates of the n :attr:`points`.
+        """
+        return self.store.coords.copy()
+
+    def line_lengths(self):
+        """The lengths of all of the lines.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The length of each line, in the order of :attr:`line_names`.
+        """
+        dx, dy = self._line_deltas()
+        return np.hypot(dx, dy)
+
+    def line_angles(self):
+        """The angles of all of the lines; see :meth:`.Line.angle`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The angle of each line, in degrees, in the order of :attr:`line_names`.
+        """
+        dx, dy = self._line_deltas()
+        return map_angle_about_zero(np.degrees(np.arctan2(dx, dy)))
+
+    def angles_between_lines(self, lines_a, lines_b):
+        """The angles between pairs of lines; see :meth:`.Line.angle_to`.
+
+        Parameters
+        ----------
+        lines_a, lines_b : array-like
+            The first and second line of each pair, as either the indices of the lines
+            in :attr:`line_names` or their names.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The angle from the first to the second line of each pair, in degrees.
+        """
+        ax, ay = self._line_deltas(self._line_rows(lines_a))
+        bx, by = self._line_deltas(self._line_rows(lines_b))
+        dot = ax * bx + ay * by
+        det = ay * bx - ax * by
+        return map_angle_about_zero(np.degrees(np.arctan2(det, dot)))
+
+    def _line_rows(self, lines):
+        """The indices in :attr:`line_names` of lines given by index or name."""
+        lines = np.asarray(lines).reshape(-1)
+
+        if lines.dtype.kind in "iu":
+            return lines
+
+        rows = {line.name: row for row, line in enumerate(self._lines[0])}
+
+        try:
+            return np.array([rows[name] for name in lines.tolist()], dtype=np.intp)
+        except KeyError as error:
+            raise ValueError(f"{repr(error.args[0])} is not a line in this problem")
+
+    def _line_deltas(self, rows=slice(None)):
+        """The x and y differences between the end and start of lines."""
+        indices = self._lines[1][rows]
+        delta = self.store.coords[indices[:, 1]] - self.store.coords[indices[:, 0]]
+        return delta[:, 0], delta[:, 1]
 
     @cached_property
     def free_params(self):
-        """Free parameter names in this problem."""
-        params = set()
+        """The free parameters in this problem.
 
-        for point in self.points:
-            for param_index in range(len(point.params)):
-                name = self._param_to_id(point, param_index)
-                if name not in self.fixed_points:
-                    params.add(name)
+        The layout is stable: parameters are ordered by their point's position in
+        :attr:`points`, then by their index within the point.
 
-        return params
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The (p, 2) array of the point index and param index of each of the p free
+            parameters.
+        """
+        return np.argwhere(self._free_mask())
 
     @property
     def free_values(self):
-        values = []
+        """The current values of the :attr:`free_params`.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The values.
+        """
+        return self.store.coords[tuple(self.free_params.T)]
+
+    def save_solution(self, path):
+        """Save the current free parameter values.
+
+        The values are saved along with the :attr:`free_params` layout, so that they
+        can be reloaded exactly into a problem of the same structure with
+        :meth:`load_solution`.
+
+        Parameters
+        ----------
+        path : :class:`str` or file
+            The file to save to, in NumPy ``.npz`` format.
+        """
+        np.savez(path, free_params=self.free_params, free_values=self.free_values)
+
+    def load_solution(self, path):
+        """Load free parameter values saved with :meth:`save_solution`.
+
+        Parameters
+        ----------
+        path : :class:`str` or file
+            The file to load from.
+
+        Raises
+        ------
+        :class:`ValueError`
+            If the saved layout does not match this problem's :attr:`free_params`.
+        """
+        with np.load(path) as data:
+            if not np.array_equal(data["free_params"], self.free_params):
+                raise ValueError("saved solution layout does not match this problem")
+
+            self.store.coords[self._free_mask()] = data["free_values"]
+
+    def save(self, path, solutions=None):
+        """Save the problem in pygeosolve's binary format.
+
+        See :mod:`.io` for a description of the format.
+
+        Parameters
+        ----------
+        path : :class:`str` or file
+            The file to write.
+
+        solutions : :class:`numpy.ndarray`, optional
+            The (b, p) array of the values of the p :attr:`free_params` of b solutions
+            to store with the problem, such as the ``x`` attribute of the result of
+            :meth:`solve_batch`. These can be read without building the problem with
+            :func:`.load_arrays`.
+        """
+        save_problem(self, path, solutions)
+
+    @classmethod
+    def load(cls, path):
+        """Load a problem saved with :meth:`save`.
 
-        for name in self.free_params:
-            point, param_index = self._id_to_param(name)
-            values.append(point.params[param_index])
+        Parameters
+        ----------
+        path : :class:`str`
+            The file.
+
+        Returns
+        -------
+        :class:`.Problem`
+            The problem.
+        """
+        return load_problem(path)
 
-        return values
+    def _free_mask(self):
+        """The (n, 2) boolean array marking the free parameters of each point."""
+        free = np.ones((len(self.store), 2), dtype=bool)
 
-    def _param_to_id(self, point, param_index):
-        key = point, param_index
-        if key not in self._param_id_map:
-            name = f"{repr(point)}#{param_index}"
-            self._param_id_map[key] = name
-            self._id_param_map[name] = key
+        for point, param_index in self.fixed_points:
+            free[point._index, param_index] = False
 
-        return self._param_id_map[key]
+        return free
 
-    def _id_to_param(self, name):
-        return self._id_param_map[name]
+    # Cached properties depending on the problem's structure.
+    _cached = (
+        "points",
+        "free_params",
+        "_compiled_components",
+        "_owners",
+        "_fixed_component",
+        "_length_targets",
+        "_lines",
+        "_other_primitives",
+    )
 
     def _invalidate_caches(self):
         def invalidate(attrib):
@@ -87,20 +536,22 @@ class Problem:
             except AttributeError:
                 pass
 
-        for attrib in ("points", "free_params"):
+        for attrib in self._cached:
             invalidate(attrib)
 
-        self._param_id_map.clear()
-        self._id_param_map.clear()
-
     def validate(self):
         """Validate the problem.
 
         This checks that primitives in the problem are valid, e.g. that lines have
         nonzero length.
         """
-        status = [primitive.validate() for primitive in self.primitives.values()]
-        invalid = list(filter(lambda s: isinstance(s, Invalid), status))
+        lines, _ = self._lines
+        # Check the line lengths together rather than via Line.validate, and only
+        # validate the other primitives individually.
+        zero_length = np.flatnonzero(np.isclose(self.line_lengths(), 0))
+        invalid = [Invalid(lines[i], "zero length") for i in zero_length]
+        status = [primitive.validate() for primitive in self._other_primitives]
+        invalid.extend(filter(lambda s: isinstance(s, Invalid), status))
 
         if invalid:
             invalid_str = ", ".join(str(s) for s in invalid)
@@ -116,10 +567,36 @@ class Problem:
         """
         for point in self[name].points:
             for param_index in range(len(point.params)):
-                name = self._param_to_id(point, param_index)
-                self.fixed_points.add(name)
+                self.fixed_points.add((point, param_index))
+
+        self._invalidate_caches()
+
+    def constrain_positions(self, names):
+        """Fix the current positions of many primitives.
+
+        Parameters
+        ----------
+        names : sequence of :class:`str`
+            The names of the primitives to fix.
+        """
+        self.fixed_points.update(
+            (point, param_index)
+            for primitive in self._named(names)
+            for point in primitive.points
+            for param_index in range(2)
+        )
+        self._invalidate_caches()
 
-    def constrain_line_length(self, name, length):
+    def _named(self, names):
+        """The primitives with the given names."""
+        primitives = self.primitives
+
+        try:
+            return [primitives[name] for name in names]
+        except KeyError as error:
+            raise ValueError(f"{repr(error.args[0])} is not part of this problem")
+
+    def constrain_line_length(self, name, length, weight=1):
         """Add a constraint on the length of a line.
 
         Parameters
@@ -129,10 +606,14 @@ class Problem:
 
         length : :class:`float`
             The line length to target.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
         """
-        self.constraints.append(LineLengthConstraint(self[name], length))
+        self._constrain(LineLengthConstraint(self[name], length), weight)
 
-    def constrain_angle_between_lines(self, line_a, line_b, angle):
+    def constrain_angle_between_lines(self, line_a, line_b, angle, weight=1):
         """Add a constraint on the angle between two lines.
 
         Parameters
@@ -142,64 +623,1121 @@ class Problem:
 
         :class:`float`
             The angle (in degrees) to target.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(LineAngleConstraint(self[line_a], self[line_b], angle), weight)
+
+    def constrain_parallel(self, line_a, line_b, weight=1):
+        """Add a constraint that two lines are parallel.
+
+        Parameters
+        ----------
+        line_a, line_b : :class:`str`
+            The names of the lines to constrain.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
         """
-        self.constraints.append(LineAngleConstraint(self[line_a], self[line_b], angle))
+        self._constrain(ParallelConstraint(self[line_a], self[line_b]), weight)
+
+    def constrain_perpendicular(self, line_a, line_b, weight=1):
+        """Add a constraint that two lines are perpendicular.
+
+        Parameters
+        ----------
+        line_a, line_b : :class:`str`
+            The names of the lines to constrain.
 
-    def _update(self, values):
-        """Update current free parameter values."""
-        for name, value in zip(self.free_params, values):
-            point, param_index = self._id_to_param(name)
-            point.params[param_index] = value
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(PerpendicularConstraint(self[line_a], self[line_b]), weight)
+
+    def constrain_equal_length(self, line_a, line_b, weight=1):
+        """Add a constraint that two lines have the same length.
+
+        Parameters
+        ----------
+        line_a, line_b : :class:`str`
+            The names of the lines to constrain.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(EqualLengthConstraint(self[line_a], self[line_b]), weight)
+
+    def constrain_horizontal(self, name, weight=1):
+        """Add a constraint that a line is horizontal.
+
+        Parameters
+        ----------
+        name : :class:`str`
+            The name of the line to constrain.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(HorizontalConstraint(self[name]), weight)
+
+    def constrain_vertical(self, name, weight=1):
+        """Add a constraint that a line is vertical.
+
+        Parameters
+        ----------
+        name : :class:`str`
+            The name of the line to constrain.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(VerticalConstraint(self[name]), weight)
+
+    def constrain_coincident(self, point_a, point_b, weight=1):
+        """Add a constraint that two points coincide.
+
+        Parameters
+        ----------
+        point_a, point_b : :class:`str` or :class:`.Point`
+            The names of the points to constrain, or the points themselves, such as a
+            line's :attr:`~.Line.start` or :attr:`~.Line.end`.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(
+            CoincidentConstraint(self._point(point_a), self._point(point_b)),
+            weight,
+        )
+
+    def constrain_point_on_line(self, point, line, weight=1):
+        """Add a constraint that a point lies on the extension of a line.
+
+        Parameters
+        ----------
+        point : :class:`str` or :class:`.Point`
+            The name of the point to constrain, or the point itself.
+
+        line : :class:`str`
+            The name of the line.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(PointOnLineConstraint(self._point(point), self[line]), weight)
+
+    def constrain_distance(self, point_a, point_b, distance, weight=1):
+        """Add a constraint on the distance between two points.
+
+        Parameters
+        ----------
+        point_a, point_b : :class:`str` or :class:`.Point`
+            The names of the points to constrain, or the points themselves.
+
+        distance : :class:`float`
+            The distance to target.
+
+        weight : :class:`float`, optional
+            The weight of the constraint's residual when solving; see
+            :attr:`.Constraint.weight`.
+        """
+        self._constrain(
+            PointToPointDistanceConstraint(
+                self._point(point_a), self._point(point_b), distance
+            ),
+            weight,
+        )
+
+    def _constrain(self, constraint, weight=1):
+        if weight < 0:
+            raise ValueError("weight must be >= 0")
+
+        if weight != 1:
+            constraint.weight = float(weight)
+
+        self.constraints.append(constraint)
+        self._invalidate_caches()
+
+    def _point(self, point):
+        """A point given by name, or as a point of this problem."""
+        if isinstance(point, Point):
+            if point._store is not self.store:
+                raise ValueError(f"{point} is not part of this problem")
+
+            return point
+
+        primitive = self[point]
+
+        if not isinstance(primitive, Point):
+            raise ValueError(f"{repr(point)} is not a point")
+
+        return primitive
+
+    def constrain_line_lengths(self, names, lengths, weights=None):
+        """Add constraints on the lengths of many lines.
+
+        Parameters
+        ----------
+        names : sequence of :class:`str`
+            The names of the lines to constrain.
+
+        lengths : array-like
+            The line length to target for each line.
+
+        weights : array-like, optional
+            The weight of each constraint's residual when solving; see
+            :attr:`.Constraint.weight`. Defaults to 1.
+        """
+        lines = self._named(names)
+        self._constrain_many(
+            LineLengthConstraint.many([(line,) for line in lines], lengths), weights
+        )
+
+    def constrain_angles_between_lines(self, lines_a, lines_b, angles, weights=None):
+        """Add constraints on the angles between many pairs of lines.
+
+        Parameters
+        ----------
+        lines_a, lines_b : iterable of :class:`str`
+            The names of the first and second line of each pair to constrain.
+
+        angles : array-like
+            The angle (in degrees) to target for each pair.
+
+        weights : array-like, optional
+            The weight of each constraint's residual when solving; see
+            :attr:`.Constraint.weight`. Defaults to 1.
+        """
+        lines_a, lines_b = self._named(lines_a), self._named(lines_b)
+
+        if len(lines_a) != len(lines_b):
+            raise ValueError("lines_a and lines_b must have the same length")
+
+        pairs = list(zip(lines_a, lines_b))
+        self._constrain_many(LineAngleConstraint.many(pairs, angles), weights)
+
+    def _constrain_many(self, constraints, weights=None):
+        if weights is not None:
+            weights = np.broadcast_to(
+                np.asarray(weights, dtype=float), (len(constraints),)
+            )
+
+            if np.any(weights < 0):
+                raise ValueError("weight must be >= 0")
+
+            for constraint, weight in zip(constraints, weights.tolist()):
+                if weight != 1:
+                    constraint.weight = weight
+
+        self.constraints.extend(constraints)
+        self._invalidate_caches()
+
+    def compile(self, constraints=None):
+        """Lower the problem to flat arrays for fast evaluation.
+
+        The compiled problem captures the current point coordinates and constraint
+        targets; it must be recompiled after the problem is modified.
+
+        Parameters
+        ----------
+        constraints : sequence of :class:`.Constraint`, optional
+            Compile only these constraints and the free parameters of their points,
+            such as one of the :meth:`components` of the problem. Defaults to the whole
+            problem.
+
+        Returns
+        -------
+        :class:`.CompiledProblem`
+            The compiled problem.
+        """
+        return self._compile(self._free_mask(), constraints)
+
+    def _compile(self, free, constraints=None, scale=None):
+        """Compile the problem with the given free parameter mask and length scale."""
+        if scale is None:
+            scale = self.length_scale()
+
+        if constraints is None:
+            return CompiledProblem(self.store, free, self.constraints, scale=scale)
+
+        points = np.unique(
+            [index for constraint in constraints for index in constraint.point_indices]
+        )
+        return CompiledProblem(self.store, free, constraints, points, scale)
+
+    def length_scale(self):
+        """The length scale of the problem.
+
+        Length residuals are divided by this scale, so that the error, and so the
+        tolerances of the solvers, are relative to the size of the problem. It is
+        :attr:`scale` if set, otherwise the median of the positive line length and
+        point distance targets, or if there are none, the median positive line length.
+
+        Returns
+        -------
+        :class:`float`
+            The scale.
+        """
+        targets = [
+            constraint.target
+            for constraint in self.constraints
+            if isinstance(constraint, LENGTH_CONSTRAINTS)
+        ]
+        return self._length_scale(np.array(targets, dtype=float))
+
+    def _length_scale(self, targets):
+        """The length scale given the line length and point distance targets."""
+        if self.scale is not None:
+            return float(self.scale)
+
+        lengths = targets[targets > 0]
+
+        if not len(lengths):
+            lengths = self.line_lengths()
+            lengths = lengths[lengths > 0]
+
+        return float(np.median(lengths)) if len(lengths) else 1.0
+
+    @cached_property
+    def _compiled_components(self):
+        """The compiled components, reused between incremental solves."""
+        self._structure = self._signature()
+        # The compiled components include any edits made so far, and are yet to be
+        # solved.
+        self.store.edits.clear()
+        self._solved_coords = None
+        free = self._free_mask()
+        scale = self.length_scale()
+        components = [
+            self._compile(free, component, scale)
+            for component in self._components(free)
+        ]
+        # The total error of each component when it was last solved.
+        self._errors = np.zeros(len(components))
+        return components
+
+    @cached_property
+    def _owners(self):
+        """The compiled component of each constraint, used to find the components
+        affected by edits.
+
+        Returns
+        -------
+        owners : :class:`dict`
+            The index in :attr:`_compiled_components` of the component of each
+            constraint, by the constraint's id, or -1 for constraints involving only
+            fixed points.
+
+        points, point_owners : :class:`numpy.ndarray`
+            The store index of each point of each constraint, and the component of
+            that constraint.
+        """
+        owners = {
+            id(constraint): index
+            for index, component in enumerate(self._compiled_components)
+            for group in component.groups
+            for constraint in group.constraints
+        }
+        indices = [constraint.point_indices for constraint in self.constraints]
+        constraint_owners = [owners.setdefault(id(c), -1) for c in self.constraints]
+        points = np.array([i for row in indices for i in row], dtype=np.intp)
+        point_owners = np.repeat(constraint_owners, [len(row) for row in indices])
+        return owners, points, point_owners
+
+    @cached_property
+    def _fixed_component(self):
+        """The constraints involving only fixed points, compiled, or None if there are
+        none."""
+        fixed = self._fixed_constraints()
+
+        if not fixed:
+            return None
+
+        return self._compile(self._free_mask(), fixed)
+
+    @cached_property
+    def _length_targets(self):
+        """The position of each length constraint, by its id, and the array of their
+        targets, which is updated as they are edited."""
+        constraints = [c for c in self.constraints if isinstance(c, LENGTH_CONSTRAINTS)]
+        positions = {id(constraint): i for i, constraint in enumerate(constraints)}
+        return positions, np.array([c.target for c in constraints], dtype=float)
+
+    def _signature(self):
+        """A cheap summary of the problem structure, used to detect changes not made
+        via this object's methods.
+
+        The constraints are compared by identity, so replacing one is detected even if
+        the number of constraints is unchanged. Holding them also stops their ids being
+        reused.
+        """
+        return len(self.primitives), tuple(self.constraints), len(self.fixed_points)
+
+    def components(self):
+        """Split the constraints into independent groups.
+
+        Two constraints are dependent if they share a point with at least one free
+        parameter. Each group can be solved independently of the others. Constraints
+        involving only fixed points are not part of any group.
+
+        Returns
+        -------
+        :class:`list` of :class:`list` of :class:`.Constraint`
+            The groups, in order of their first constraint.
+        """
+        return self._components(self._free_mask())
+
+    def _components(self, free):
+        """Split the constraints into groups given the free parameter mask."""
+        free_points = free.any(axis=1).tolist()
+        parents = list(range(len(free_points)))
+
+        def find(index):
+            root = index
+            while parents[root] != root:
+                root = parents[root]
+            # Compress the path to the root.
+            while parents[index] != root:
+                parents[index], index = root, parents[index]
+            return root
+
+        roots = []
+        for constraint in self.constraints:
+            indices = [i for i in constraint.point_indices if free_points[i]]
+
+            if not indices:
+                roots.append(None)
+                continue
+
+            root = find(indices[0])
+            for index in indices[1:]:
+                other = find(index)
+                if other != root:
+                    parents[other] = root
+
+            roots.append(indices[0])
+
+        groups = {}
+        for constraint, index in zip(self.constraints, roots):
+            if index is not None:
+                groups.setdefault(find(index), []).append(constraint)
+
+        return list(groups.values())
+
+    def _fixed_constraints(self):
+        """The constraints involving only fixed points."""
+        free_points = self._free_mask().any(axis=1)
+        return [
+            constraint
+            for constraint in self.constraints
+            if not free_points[constraint.point_indices].any()
+        ]
+
+    def check(self, tolerance=1e-10):
+        """Check that no constraints involving only fixed points are violated.
+
+        Such constraints are not part of any of the :meth:`components` and so are
+        never solved. Unless they are already satisfied, the problem has no solution.
+
+        Parameters
+        ----------
+        tolerance : :class:`float`, optional
+            The maximum error of a satisfied constraint.
+
+        Raises
+        ------
+        :class:`ValueError`
+            If any such constraints are violated.
+        """
+        self._check(self._fixed_constraints(), tolerance)
+
+    @staticmethod
+    def _check(constraints, tolerance=1e-10):
+        """Check that constraints between fixed points are satisfied."""
+        violated = [
+            constraint for constraint in constraints if constraint.error() > tolerance
+        ]
+
+        if violated:
+            violated_str = ", ".join(str(constraint) for constraint in violated)
+            raise ValueError(
+                "The following constraints between fixed points are violated: "
+                f"{violated_str}"
+            )
+
+    def analyse(self, tolerance=1e-10):
+        """Analyse the degrees of freedom of the problem at the current point
+        positions.
+
+        Each of the independent :meth:`components` is analysed separately; see
+        :func:`.analyse_component`. Large components are analysed using only the
+        structure of their constraints, which is fast but can miss redundant
+        constraints.
+
+        Parameters
+        ----------
+        tolerance : :class:`float`, optional
+            The maximum error of a satisfied constraint, and the relative tolerance
+            below which a Jacobian singular value is considered zero.
+
+        Returns
+        -------
+        :class:`.Analysis`
+            The analysis.
+        """
+        fixed = self._fixed_constraints()
+
+        return Analysis(
+            [
+                analyse_component(self.compile(component), tolerance)
+                for component in self.components()
+            ],
+            fixed,
+            [constraint for constraint in fixed if constraint.error() > tolerance],
+        )
 
     def error(self):
         """Calculate the current free parameter values' total error.
 
+        This is the sum of the squares of the constraints' residuals, weighted and
+        scaled as when solving; see :class:`.CompiledProblem`.
+
         Returns
         -------
         :class:`float`
             The total error.
         """
-        return sum(constraint.error() for constraint in self.constraints)
+        grouped = {}
+        for constraint in self.constraints:
+            grouped.setdefault(type(constraint), []).append(constraint)
+
+        # Evaluate each type of constraint together.
+        error = 0.0
+        scale = self.length_scale()
+        for kind, constraints in grouped.items():
+            indices = np.array([c.point_indices for c in constraints], dtype=np.intp)
+            targets = np.array([c.target for c in constraints], dtype=float)
+            group = ConstraintGroup(kind, indices, targets, constraints, scale=scale)
+            residuals = group.residuals(self.store.coords)
+            error += float(residuals @ residuals)
 
-    def solve(self, **kwargs):
+        return error
+
+    def solve(
+        self,
+        method="least_squares",
+        decompose=True,
+        executor=None,
+        workers=None,
+        incremental=False,
+        check=True,
+        construct=True,
+        cache=None,
+        timeout=None,
+        **kwargs,
+    ):
         """Solve the problem.
 
-        This attempts to minimise the error function given the defined constraints. A
-        successful minimisation results in the new, optimised parameter values being
-        assigned.
+        This attempts to minimise the error function given the defined constraints. The
+        best parameter values found are assigned, even if the minimisation is
+        unsuccessful.
+
+        Parameters
+        ----------
+        method : :class:`str` or :class:`.Solver`, optional
+            The solver to use: "least_squares" (the default) for fast local
+            minimisation of the constraint residuals, "basinhopping" for slower global
+            minimisation of the total error, or a :class:`.Solver` instance.
+
+        decompose : :class:`bool`, optional
+            Solve each of the problem's independent :meth:`components` separately.
+            Defaults to True.
+
+        executor : :class:`concurrent.futures.Executor`, optional
+            Executor with which to solve the components in parallel. Defaults to
+            solving them one after the other.
+
+        workers : :class:`int`, optional
+            Solve in parallel using a pool of this many processes. Components are
+            solved in parallel, and stochastic solvers such as basinhopping divide
+            their work between this many independent starts, keeping the best. The
+            starts' random seeds are derived from the solver's ``seed``, so results
+            are reproducible for a given seed and number of workers. Cannot be used
+            with `executor`.
+
+        incremental : :class:`bool`, optional
+            Reuse the compiled components from the previous incremental solve, and only
+            re-solve those with points or constraint targets that have changed since
+            then (or which could not previously be solved), warm-started from the
+            current point positions. Only those components are refreshed and
+            evaluated, and only edited constraints between fixed points are checked,
+            so the cost of a solve after dragging a point scales with the size of its
+            component rather than of the problem. The structure of the problem is
+            recompiled if primitives or constraints have been added. Requires
+            `decompose`. Defaults to False.
+
+        check : :class:`bool`, optional
+            Before solving, :meth:`check` that the problem can be satisfied, and skip
+            components whose constraints are already satisfied. When components cannot
+            be solved, :meth:`analyse` them to report any redundant constraints, which
+            for large components only finds those redundant because of the structure
+            of the constraints. Defaults to True.
+
+        construct : :class:`bool`, optional
+            Before solving, place the points that can be constructed from the fixed
+            points; see :func:`.construct_points`. Points fully determined this way are
+            held in place, leaving only the rest of the problem to the solver. Ignored
+            when solving incrementally. Defaults to True.
+
+        cache : :class:`.SolutionCache`, optional
+            Cache of solutions. If it holds a solution for this problem with the same
+            initial positions, that solution is used without solving. Otherwise, if it
+            holds a solution for a problem with the same structure and constraint
+            targets and nearby initial positions (see
+            :attr:`.SolutionCache.warm_distance`), the solve is warm-started from that
+            solution, restoring the initial positions if it fails with a larger error
+            than they had. Successful solutions are added to the cache.
+
+        timeout : :class:`float`, optional
+            The time limit for the whole solve, in seconds, after which to stop and
+            apply the best solution found so far. The limit is checked at each
+            objective evaluation. Solvers can also be given a ``target`` error and a
+            ``patience``; see :class:`.Solver`.
 
         Other Parameters
         ----------------
         kwargs
-            Keyword arguments supported by :meth:`scipy.optimize.basinhopping`.
+            Keyword arguments supported by the solver's underlying optimiser, i.e.
+            :func:`scipy.optimize.least_squares` or
+            :func:`scipy.optimize.basinhopping`, or the ``progress`` and ``sink``
+            callbacks and ``tolerance`` of :class:`.Solver`.
 
         Returns
         -------
         :class:`scipy.optimize.OptimizeResult`
-            The optimisation result.
+            The optimisation result. When decomposing, this summarises the results of
+            each component, which are available in its ``components`` attribute. The
+            :class:`.SolveStats` recorded during the solve are available in its
+            ``stats`` attribute. When checking, the :class:`.ComponentAnalysis` of each
+            component that could not be solved is available in its ``analysis``
+            attribute.
+
+        Raises
+        ------
+        :class:`ValueError`
+            If checking and the problem cannot be satisfied.
         """
+        if workers is not None and executor is not None:
+            raise ValueError("workers and executor cannot both be given")
 
-        def f(x, *_):
-            self._update(x)
-            return self.error()
+        solver = get_solver(method, **kwargs)
+        start = perf_counter()
 
-        self._invalidate_caches()
-        self.validate()
+        if timeout is not None:
+            solver = copy.copy(solver)
+            solver.deadline = time() + timeout
+
+        if cache is not None:
+            key, structure_key = cache.keys(self)
+            coords = cache.get(key)
+
+            if coords is not None:
+                self.store.coords[:] = coords
+                return self._cached_result(perf_counter() - start)
+
+            # Only warm-start from solutions found from nearby initial positions, since
+            # those further away may have been solved to a different solution.
+            initial = self.store.coords.copy()
+            distance = cache.warm_distance * self.length_scale()
+            coords = cache.get(structure_key, initial, distance)
+            warm = coords is not None
+
+            if warm:
+                initial_error = self.error()
+                self.store.coords[:] = coords
+
+        components, compiled = self._prepare(decompose, incremental, check, construct)
+        compile_time = perf_counter() - start
+
+        if workers is not None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(workers) as executor:
+                solutions = solve_all(solver, compiled, executor, starts=workers)
+        else:
+            solutions = solve_all(solver, compiled, executor)
+
+        result = self._conclude(
+            components, compiled, solutions, decompose, check, incremental
+        )
+        result.stats.times["compile"] = compile_time
+        result.stats.wall_time += compile_time
+
+        if cache is not None:
+            if result.success:
+                cache.put(key, self.store.coords)
+                cache.put(structure_key, self.store.coords, initial)
+            elif warm and result.error > initial_error:
+                # The initial positions were better than the best solution found from
+                # the warm start.
+                self.store.coords[:] = initial
+                result.x = self.free_values
+                result.error = initial_error
+
+        return result
+
+    def _cached_result(self, wall_time):
+        """The result of a solve that found its solution in a cache."""
+        from scipy.optimize import OptimizeResult
+
+        stats = SolveStats()
+        stats.wall_time = wall_time
+
+        return OptimizeResult(
+            x=self.free_values,
+            success=True,
+            message="Solution found in cache",
+            nfev=0,
+            error=self.error(),
+            components=[],
+            stats=stats,
+            analysis=[],
+        )
+
+    async def solve_async(
+        self,
+        method="least_squares",
+        executor=None,
+        timeout=None,
+        decompose=True,
+        check=True,
+        construct=True,
+        **kwargs,
+    ):
+        """Solve the problem without blocking the event loop.
+
+        The problem is checked and compiled, and the solutions applied, in the event
+        loop's default executor, and each component is solved in `executor`.
+        Components are submitted separately, so concurrent solves sharing an executor
+        are interleaved at component granularity.
+
+        If `timeout` expires, the solve stops at the next objective evaluation and the
+        best solution found so far is applied; see :class:`.Solver`. If the task is
+        cancelled, the solve is abandoned, leaving the points unchanged. Solves running
+        in the calling process, e.g. in a thread pool, stop at their next objective
+        evaluation; those already running in worker processes continue until they
+        finish or reach the timeout.
+
+        Parameters
+        ----------
+        method : :class:`str` or :class:`.Solver`, optional
+            The solver to use; see :meth:`solve`.
+
+        executor : :class:`concurrent.futures.Executor`, optional
+            Executor with which to solve the components. Defaults to the event loop's
+            default executor.
+
+        timeout : :class:`float`, optional
+            The time limit, in seconds, after which to stop solving and apply the best
+            solution found so far.
+
+        decompose, check, construct : :class:`bool`, optional
+            See :meth:`solve`.
+
+        Other Parameters
+        ----------------
+        kwargs
+            Keyword arguments supported by the solver; see :meth:`solve`.
+
+        Returns
+        -------
+        :class:`scipy.optimize.OptimizeResult`
+            The optimisation result; see :meth:`solve`. If the solve was stopped, its
+            ``stopped`` attribute holds the reason.
+        """
+        import asyncio
+        import threading
+
+        loop = asyncio.get_running_loop()
+        solver = copy.copy(get_solver(method, **kwargs))
+        solver.cancel = threading.Event()
+
+        if timeout is not None:
+            solver.deadline = time() + timeout
+
+        initial = self.store.coords.copy()
+
+        async def run(function, *args):
+            # Run a step that modifies the points in a thread. It can't be interrupted,
+            # so if cancelled, wait for it to finish before restoring the points.
+            future = loop.run_in_executor(None, function, *args)
+
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                await asyncio.wait([future])
+                self.store.coords[:] = initial
+                raise
+
+        start = perf_counter()
+        components, compiled = await run(
+            self._prepare, decompose, False, check, construct
+        )
+        compile_time = perf_counter() - start
+
+        futures = [
+            loop.run_in_executor(executor, _solve_task, solver, component)
+            for component in compiled
+        ]
 
-        # Perform optimisation, or, if there's an error, restore the original solution.
-        xpre = self.free_values
         try:
-            solution = basinhopping(f, x0=self.free_values, **kwargs)
-        except:
-            self._update(xpre)
+            solutions = await asyncio.gather(*futures)
+        except asyncio.CancelledError:
+            # Stop the solves that are already running in this process. Those not yet
+            # started have been cancelled along with their futures. Undo any
+            # construction.
+            solver.cancel.set()
+            self.store.coords[:] = initial
             raise
 
-        if not solution.success:
-            warnings.warn("Unable to find solution")
+        result = await run(
+            self._conclude, components, compiled, solutions, decompose, check
+        )
+        result.stats.times["compile"] = compile_time
+        result.stats.wall_time += compile_time
+
+        return result
+
+    def _prepare(self, decompose, incremental, check=True, construct=True):
+        """Validate and compile the problem for solving.
+
+        Returns
+        -------
+        :class:`tuple`
+            The compiled components, and those of them that need to be solved.
+        """
+        if incremental and not decompose:
+            raise ValueError("incremental solving requires decompose")
+
+        if not incremental or self._signature() != getattr(self, "_structure", None):
+            self._invalidate_caches()
+
+        # Incremental solves reusing the compiled components only check the
+        # constraints affected by edits.
+        reused = incremental and "_compiled_components" in self.__dict__
+        self.validate()
+
+        if check and not reused:
+            self.check()
+
+        self._initial = None
+        held = None
+
+        if construct and not incremental:
+            held = self._construct()
+
+        # Components with all of their free points held are solved by construction
+        # alone, so aren't compiled.
+        self._constructed = 0
+
+        if held is not None:
+            free = self._free_mask()
+            movable = free.any(axis=1) & ~held
+
+            for component in self._components(free):
+                indices = [i for c in component for i in c.point_indices]
+                self._constructed += not movable[indices].any()
+
+            free = free & ~held[:, np.newaxis]
+
+            if decompose:
+                scale = self.length_scale()
+                components = [
+                    self._compile(free, component, scale)
+                    for component in self._components(free)
+                ]
+            else:
+                components = [self._compile(free)]
+        elif decompose:
+            components = self._compiled_components
+        else:
+            components = [self.compile()]
+
+        if incremental:
+            compiled = self._changed(components, check)
+        else:
+            compiled = components
+
+        if check and decompose:
+            compiled = [c for c in compiled if not self._satisfied(c)]
+
+        return components, compiled
+
+    def _changed(self, components, check=True):
+        """Refresh the compiled components affected by edits since the last
+        incremental solve.
+
+        Components are affected if any of their points have moved or their constraints
+        have been edited, or if they could not previously be solved. Edited or moved
+        constraints involving only fixed points are checked if `check` is set.
+
+        Returns
+        -------
+        :class:`list` of :class:`.CompiledProblem`
+            The affected components that have changed or could not previously be
+            solved.
+        """
+        owners, points, point_owners = self._owners
+        positions, targets = self._length_targets
+        edited = [
+            constraint for constraint in self.store.edits if id(constraint) in owners
+        ]
+        self.store.edits.clear()
+        affected = {owners[id(constraint)] for constraint in edited}
+
+        if self._solved_coords is None:
+            # Nothing has been solved since compiling.
+            affected.update(range(-1, len(components)))
         else:
-            self._update(solution.x)
+            moved = np.any(self.store.coords != self._solved_coords, axis=1)
+            affected.update(np.unique(point_owners[moved[points]]).tolist())
+            affected.update(
+                index
+                for index, component in enumerate(components)
+                if not component.solved
+            )
+
+        # The length scale changes with the length targets.
+        for constraint in edited:
+            if id(constraint) in positions:
+                targets[positions[id(constraint)]] = constraint.target
+
+        scale = self._length_scale(targets)
+        fixed = self._fixed_component
+
+        if -1 in affected and fixed is not None:
+            if check:
+                self._check([c for group in fixed.groups for c in group.constraints])
 
-        return solution
+            fixed.refresh(scale)
+
+        self._affected = sorted(affected - {-1})
+        return [
+            components[index]
+            for index in self._affected
+            if components[index].refresh(scale) or not components[index].solved
+        ]
+
+    def _construct(self, tolerance=1e-10):
+        """Place the constructible points.
+
+        Returns
+        -------
+        :class:`numpy.ndarray` or None
+            The boolean array marking the placed points that can be held in place while
+            solving, or None if there are none.
+        """
+        initial = self.store.coords.copy()
+        placed, determined = construct_points(self)
+
+        if not placed.any():
+            return None
+
+        # Remember where the points were, to tell which components construction moved.
+        self._initial = initial
+        held = placed & determined
+        free = self._free_mask().any(axis=1) & ~held
+
+        # Holding the points is only valid if the constraints between them are
+        # satisfied; otherwise leave them to the solver, starting from their
+        # constructed positions.
+        for constraint in self.constraints:
+            if not free[constraint.point_indices].any():
+                if constraint.error() > tolerance:
+                    return None
+
+        return held if held.any() else None
+
+    @staticmethod
+    def _satisfied(compiled, tolerance=1e-10):
+        """Mark a compiled component as solved if its constraints are satisfied."""
+        if compiled.error(compiled.x0) > tolerance:
+            return False
+
+        compiled.apply(compiled.x0)
+        return True
+
+    def _conclude(
+        self, components, compiled, solutions, decompose, check=True, incremental=False
+    ):
+        """Apply the solutions of the solved components and summarise them."""
+        from scipy.optimize import OptimizeResult
+
+        # Leave the best solution found applied, even if it's not a solution.
+        for component, solution in zip(compiled, solutions):
+            component.apply(solution.x)
+            component.solved = bool(solution.success)
+
+        failed = [
+            component
+            for component, solution in zip(compiled, solutions)
+            if not solution.success and "stopped" not in solution
+        ]
+        analysis = []
+
+        if failed:
+            message = "Unable to find solution; the best solution found was applied"
+
+            if check:
+                analysis = [analyse_component(component) for component in failed]
+                redundant = [
+                    constraint
+                    for component in analysis
+                    for constraint in component.redundant
+                ]
+
+                if redundant:
+                    redundant_str = ", ".join(
+                        str(constraint) for constraint in redundant
+                    )
+                    message += (
+                        "; the following constraints are redundant and may conflict: "
+                        f"{redundant_str}"
+                    )
+
+            warnings.warn(message)
+
+        stopped = [
+            solution.stopped
+            for solution in solutions
+            if "stopped" in solution and not solution.success
+        ]
+
+        if stopped:
+            warnings.warn(
+                f"Solve stopped ({stopped[0]}) before finding a solution; the best "
+                "solution found was applied"
+            )
+
+        if not decompose:
+            solutions[0].analysis = analysis
+            return solutions[0]
+
+        stats = SolveStats()
+        for solution in solutions:
+            stats.merge(solution.stats)
+
+        if incremental:
+            # Only the affected components' errors can have changed.
+            for index in self._affected:
+                component = components[index]
+                self._errors[index] = component.error(component.x0)
+
+            fixed = self._fixed_component
+            error = float(np.sum(self._errors))
+            error += 0.0 if fixed is None else fixed.error(fixed.x0)
+        else:
+            error = self.error()
+
+        self._solved_coords = self.store.coords.copy()
+
+        return OptimizeResult(
+            x=self.free_values,
+            success=all(component.solved for component in components),
+            message=self._summary(components, compiled),
+            nfev=sum(solution.nfev for solution in solutions),
+            error=error,
+            components=solutions,
+            stats=stats,
+            analysis=analysis,
+            stopped=next(
+                (solution.stopped for solution in solutions if "stopped" in solution),
+                None,
+            ),
+        )
+
+    def _summary(self, components, compiled):
+        """Describe how the components were solved."""
+        solved = {id(component) for component in compiled}
+        skipped = [component for component in components if id(component) not in solved]
+        placed = self._constructed
+
+        if self._initial is not None:
+            # Skipped components with points moved by construction were satisfied by
+            # it, rather than beforehand.
+            placed += sum(
+                not np.array_equal(
+                    self._initial[component.indices],
+                    self.store.coords[component.indices],
+                )
+                for component in skipped
+            )
+
+        total = len(components) + self._constructed
+        satisfied = len(skipped) + self._constructed - placed
+        message = f"Solved {len(compiled)} of {total} independent component(s)"
+
+        if placed:
+            message += f"; {placed} placed constructively"
+        if satisfied:
+            message += f"; {satisfied} already satisfied"
+
+        return message
+
+    def solve_batch(self, targets=None, positions=None, tolerance=1e-10, **kwargs):
+        """Solve many instances of this problem with different targets or initial
+        positions.
+
+        The problem's structure is compiled once and used as a template for all of the
+        instances, which are solved together with vectorised least squares. The
+        problem itself is not modified.
+
+        Parameters
+        ----------
+        targets : :class:`numpy.ndarray`, optional
+            The (b, c) array of the targets of each of the problem's c
+            :attr:`constraints` of each of the b instances. Defaults to the current
+            targets.
+
+        positions : :class:`numpy.ndarray`, optional
+            The (b, p) array of the initial values of each of the problem's p
+            :attr:`free_params` of each instance. Defaults to the current values.
+
+        tolerance : :class:`float`, optional
+            The maximum total error of an instance to consider it solved.
+
+        Other Parameters
+        ----------------
+        kwargs
+            Keyword arguments supported by :func:`scipy.optimize.least_squares`.
+
+        Returns
+        -------
+        :class:`scipy.optimize.OptimizeResult`
+            The optimisation result. Its ``x``, ``coordinates``, ``error`` and
+            ``success`` attributes hold arrays of the optimised free parameter values,
+            point coordinates (ordered as :attr:`points`), total errors and success
+            flags of each instance, respectively.
+        """
+        self._invalidate_caches()
+        self.validate()
+
+        return solve_batch(
+            self.compile(),
+            targets=targets,
+            positions=positions,
+            tolerance=tolerance,
+            **kwargs,
+        )
 
     def __str__(self):
         primitivestrs = []
@@ -229,3 +1767,49 @@ class Problem:
 
         if show:
             show_problem()
+
+
+def solve_many(problems, method="least_squares", workers=None, **kwargs):
+    """Solve many problems in parallel.
+
+    The problems' independent components are compiled to arrays and solved in a pool
+    of processes, then the solutions are applied to the problems.
+
+    Parameters
+    ----------
+    problems : sequence of :class:`.Problem`
+        The problems to solve.
+
+    method : :class:`str` or :class:`.Solver`, optional
+        The solver to use; see :meth:`.Problem.solve`.
+
+    workers : :class:`int`, optional
+        The number of processes. Defaults to the number of processors.
+
+    Other Parameters
+    ----------------
+    kwargs
+        Keyword arguments supported by the solver's underlying optimiser.
+
+    Returns
+    -------
+    :class:`list` of :class:`scipy.optimize.OptimizeResult`
+        The optimisation result of each problem.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    solver = get_solver(method, **kwargs)
+    prepared = [problem._prepare(True, False) for problem in problems]
+    compiled = [component for _, pending in prepared for component in pending]
+
+    with ProcessPoolExecutor(workers) as executor:
+        solutions = solve_all(solver, compiled, executor)
+
+    results = []
+    offset = 0
+    for problem, (components, pending) in zip(problems, prepared):
+        problem_solutions = solutions[offset : offset + len(pending)]
+        results.append(problem._conclude(components, pending, problem_solutions, True))
+        offset += len(pending)
+
+    return results
@@ -0,0 +1,498 @@
+"""Solvers."""
+
+import abc
+from time import perf_counter
+import numpy as np
+from .stats import SolveStats, SolveStopped
+
+
+class Solver(metaclass=abc.ABCMeta):
+    """A strategy for minimising the error of a :class:`.CompiledProblem`.
+
+    Parameters
+    ----------
+    progress : callable, optional
+        Function called with the solve's :class:`.SolveStats` after each objective
+        evaluation.
+
+    sink : callable, optional
+        Function called with events and their data; see :class:`.SolveStats`.
+
+    tolerance : :class:`float`, optional
+        The maximum total error of a successful solve. Optimisers can converge to a
+        local minimum with a larger error, such as when constraints conflict.
+
+    deadline : :class:`float`, optional
+        Time, as returned by :func:`time.time`, after which to stop solving and return
+        the best solution found so far.
+
+    cancel : :class:`threading.Event`, optional
+        Event which, when set, stops the solve and returns the best solution found so
+        far.
+
+    target : :class:`float`, optional
+        Total error at or below which to stop solving.
+
+    patience : :class:`int`, optional
+        Number of objective evaluations without a reduction in the lowest total error
+        after which to stop solving and return the best solution found.
+
+    Other Parameters
+    ----------------
+    kwargs
+        Keyword arguments supported by the underlying optimiser.
+
+    Notes
+    -----
+    The callbacks and cancellation event are not sent to worker processes, so only
+    apply to solves in the calling process. The deadline applies everywhere.
+
+    Stopping is checked at each objective evaluation. A stopped solve's result has a
+    ``stopped`` attribute giving the reason, and is successful if the best solution
+    found is within the tolerance.
+    """
+
+    def __init__(
+        self,
+        progress=None,
+        sink=None,
+        tolerance=1e-10,
+        deadline=None,
+        cancel=None,
+        target=None,
+        patience=None,
+        **kwargs,
+    ):
+        self.progress = progress
+        self.sink = sink
+        self.tolerance = tolerance
+        self.deadline = deadline
+        self.cancel = cancel
+        self.target = target
+        self.patience = patience
+        self.kwargs = kwargs
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["progress"] = None
+        state["sink"] = None
+        state["cancel"] = None
+        return state
+
+    def solve(self, compiled, x0=None):
+        """Minimise the error of a compiled problem.
+
+        Parameters
+        ----------
+        compiled : :class:`.CompiledProblem`
+            The problem to solve.
+
+        x0 : :class:`numpy.ndarray`, optional
+            The initial free parameter values. Defaults to the values at compile time.
+
+        Returns
+        -------
+        :class:`scipy.optimize.OptimizeResult`
+            The optimisation result. Its ``x`` attribute holds the optimised free
+            parameter values, its ``error`` attribute the corresponding total error, and
+            its ``stats`` attribute the :class:`.SolveStats` recorded during the solve.
+        """
+        from scipy.optimize import OptimizeResult
+
+        if x0 is None:
+            x0 = compiled.x0
+
+        stats = SolveStats(
+            progress=self.progress,
+            sink=self.sink,
+            deadline=self.deadline,
+            cancel=self.cancel,
+            target=self.target,
+            patience=self.patience,
+        )
+        stats.emit(
+            "start", {"free_params": compiled.nfree, "residuals": compiled.nresiduals}
+        )
+        start = perf_counter()
+        compiled.stats = stats
+
+        try:
+            if compiled.nfree == 0 or compiled.nresiduals == 0:
+                # Nothing to optimise.
+                solution = OptimizeResult(
+                    x=np.array(x0, dtype=float),
+                    success=True,
+                    message="Nothing to optimise",
+                    nfev=0,
+                )
+            else:
+                solution = self._solve(compiled, np.array(x0, dtype=float))
+        except SolveStopped as stop:
+            # The stop is raised after recording the evaluation, so there's always a
+            # best solution.
+            solution = OptimizeResult(
+                x=stats.best_x,
+                success=True,
+                message=f"Stopped: {stop.reason}",
+                nfev=stats.evaluations,
+                stopped=stop.reason,
+            )
+        finally:
+            compiled.stats = None
+
+        stats.wall_time = perf_counter() - start
+        solution.error = compiled.error(solution.x)
+        solution.stats = stats
+
+        if solution.success and solution.error > self.tolerance:
+            solution.success = False
+
+            if "stopped" not in solution:
+                solution.message = (
+                    f"Converged to an error of {solution.error}, above the tolerance"
+                )
+
+        stats.emit("finish")
+
+        return solution
+
+    @abc.abstractmethod
+    def _solve(self, compiled, x0):
+        raise NotImplementedError
+
+    def spawn(self, n):
+        """Solvers to use for independent starts.
+
+        Deterministic solvers always return only themselves, since additional starts
+        would give the same result.
+
+        Parameters
+        ----------
+        n : :class:`int`
+            The number of starts.
+
+        Returns
+        -------
+        :class:`list` of :class:`.Solver`
+            The solvers.
+        """
+        return [self]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}@{hex(id(self))}>"
+
+
+class BasinHoppingSolver(Solver):
+    """Global stochastic minimisation of the total error using
+    :func:`scipy.optimize.basinhopping`.
+
+    The local minimiser uses the problem's analytic gradient unless ``jac`` is
+    overridden in ``minimizer_kwargs``.
+
+    Unlike other solvers, the `target` error defaults to 1e-10, so that hopping stops
+    once a solution is found rather than continuing for all ``niter`` hops. Set it to
+    None to always perform every hop.
+    """
+
+    def __init__(self, *args, target=1e-10, **kwargs):
+        super().__init__(*args, target=target, **kwargs)
+
+    def _solve(self, compiled, x0):
+        from scipy.optimize import basinhopping
+
+        kwargs = dict(self.kwargs)
+        minimizer_kwargs = dict(kwargs.pop("minimizer_kwargs", {}))
+        minimizer_kwargs.setdefault("jac", True)
+        stats = compiled.stats
+
+        # Record each hop and local minimiser iteration before calling any user
+        # callbacks.
+        hop_callback = kwargs.pop("callback", None)
+        iteration_callback = minimizer_kwargs.pop("callback", None)
+
+        def hop(x, f, accept):
+            stats.record_hop(f, accept)
+            if hop_callback is not None:
+                return hop_callback(x, f, accept)
+
+        def iteration(*args):
+            stats.record_iteration()
+            if iteration_callback is not None:
+                return iteration_callback(*args)
+
+        kwargs["callback"] = hop
+        minimizer_kwargs["callback"] = iteration
+
+        if minimizer_kwargs["jac"] is True:
+            f = compiled.error_and_gradient
+        else:
+            f = compiled.error
+
+        return basinhopping(f, x0=x0, minimizer_kwargs=minimizer_kwargs, **kwargs)
+
+    def spawn(self, n):
+        """Solvers to use for independent starts.
+
+        The hops are divided between the starts, each of which is given a random seed
+        derived from this solver's ``seed``, which must be an integer or None. The
+        starts are therefore deterministic for a given seed and number of starts.
+
+        Parameters
+        ----------
+        n : :class:`int`
+            The number of starts.
+
+        Returns
+        -------
+        :class:`list` of :class:`.Solver`
+            The solvers.
+        """
+        if n == 1:
+            return [self]
+
+        kwargs = dict(self.kwargs)
+        niter = -(-kwargs.pop("niter", 100) // n)
+        sequence = np.random.SeedSequence(kwargs.pop("seed", None))
+
+        return [
+            self.__class__(
+                progress=self.progress,
+                sink=self.sink,
+                tolerance=self.tolerance,
+                deadline=self.deadline,
+                cancel=self.cancel,
+                target=self.target,
+                patience=self.patience,
+                niter=niter,
+                seed=int(child.generate_state(1)[0]),
+                **kwargs,
+            )
+            for child in sequence.spawn(n)
+        ]
+
+
+class LeastSquaresSolver(Solver):
+    """Local minimisation of the constraint residuals using
+    :func:`scipy.optimize.least_squares`.
+
+    By default this uses the trust region reflective method with the problem's sparse
+    Jacobian, solving each iteration's trust region subproblem with the iterative sparse
+    solver LSMR, so that time and memory scale with the number of nonzero Jacobian
+    entries rather than its full size. LSMR is allowed up to ten iterations per free
+    parameter, since long chains of constraints are ill-conditioned and stop short of
+    the tolerance with its default limit. Problems with at most :attr:`dense_limit`
+    free parameters are small enough to instead solve exactly with a dense Jacobian,
+    which takes fewer iterations. Levenberg-Marquardt can be selected with
+    ``method="lm"``, in which case the Jacobian is always dense.
+
+    The gradient tolerance ``gtol`` defaults to SciPy's default divided by the
+    problem's length scale, since the gradient of the error with respect to the free
+    parameters scales inversely with the size of the sketch.
+    """
+
+    #: The largest number of free parameters for which to use a dense Jacobian.
+    dense_limit = 500
+
+    def _solve(self, compiled, x0):
+        from scipy.optimize import least_squares
+
+        kwargs = dict(self.kwargs)
+        kwargs.setdefault("method", "trf")
+        kwargs.setdefault("gtol", 1e-8 / compiled.scale)
+
+        if kwargs["method"] != "lm" and "tr_solver" not in kwargs:
+            if compiled.nfree <= self.dense_limit:
+                kwargs["tr_solver"] = "exact"
+            else:
+                kwargs["tr_solver"] = "lsmr"
+                kwargs.setdefault("tr_options", {"maxiter": 10 * compiled.nfree})
+
+        if kwargs["method"] == "lm" or kwargs.get("tr_solver") == "exact":
+            jac = lambda x: compiled.jacobian(x).toarray()
+        else:
+            jac = compiled.jacobian
+
+        kwargs.setdefault("jac", jac)
+
+        return least_squares(compiled.residuals, x0, **kwargs)
+
+
+#: Available solvers, by name.
+SOLVERS = {
+    "basinhopping": BasinHoppingSolver,
+    "least_squares": LeastSquaresSolver,
+}
+
+
+def get_solver(method, **kwargs):
+    """Get a solver.
+
+    Parameters
+    ----------
+    method : :class:`str` or :class:`.Solver`
+        The solver name (a key of :data:`.SOLVERS`) or instance.
+
+    Other Parameters
+    ----------------
+    kwargs
+        Keyword arguments to pass to the solver, when `method` is a name.
+
+    Returns
+    -------
+    :class:`.Solver`
+        The solver.
+    """
+    if isinstance(method, Solver):
+        if kwargs:
+            raise ValueError("keyword arguments cannot be given with a solver instance")
+
+        return method
+
+    try:
+        solver = SOLVERS[method]
+    except KeyError:
+        raise ValueError(
+            f"unknown solver {repr(method)} (choose from {', '.join(SOLVERS)})"
+        )
+
+    return solver(**kwargs)
+
+
+def solve_all(solver, compiled, executor=None, starts=1):
+    """Solve compiled problems, optionally in parallel and from multiple starts.
+
+    Parameters
+    ----------
+    solver : :class:`.Solver`
+        The solver.
+
+    compiled : sequence of :class:`.CompiledProblem`
+        The problems to solve.
+
+    executor : :class:`concurrent.futures.Executor`, optional
+        Executor with which to solve the problems and starts in parallel. Defaults to
+        solving them one after the other.
+
+    starts : :class:`int`, optional
+        The number of independent starts for stochastic solvers; see
+        :meth:`.Solver.spawn`. The best result of each problem's starts is selected.
+
+    Returns
+    -------
+    :class:`list` of :class:`scipy.optimize.OptimizeResult`
+        The result of each problem.
+    """
+    solvers = solver.spawn(starts)
+    tasks = [(task_solver, problem) for problem in compiled for task_solver in solvers]
+    mapper = map if executor is None else executor.map
+    results = list(mapper(_solve_task, *zip(*tasks))) if tasks else []
+
+    best = []
+    for index in range(0, len(results), len(solvers)):
+        candidates = results[index : index + len(solvers)]
+        # Prefer successful results, then those with the lowest error. Ties go to the
+        # earliest start so that the selection is deterministic.
+        best.append(
+            min(candidates, key=lambda result: (not result.success, result.error))
+        )
+
+    return best
+
+
+def _solve_task(solver, compiled):
+    return solver.solve(compiled)
+
+
+def solve_batch(compiled, targets=None, positions=None, tolerance=1e-10, **kwargs):
+    """Solve a batch of instances of a compiled problem.
+
+    The instances share the compiled problem's structure but may have different
+    constraint targets and initial free parameter values. They are solved together as
+    one least squares problem with a block diagonal Jacobian, so that each evaluation of
+    the residuals is vectorised across the whole batch.
+
+    Parameters
+    ----------
+    compiled : :class:`.CompiledProblem`
+        The problem to use as a template.
+
+    targets : :class:`numpy.ndarray`, optional
+        The (b, c) array of the targets of each of the c constraints, in the order they
+        were compiled, of each of the b instances. Defaults to the compiled targets.
+
+    positions : :class:`numpy.ndarray`, optional
+        The (b, p) array of the initial values of each of the p free parameters of each
+        instance. Defaults to the compiled values.
+
+    tolerance : :class:`float`, optional
+        The maximum total error of an instance to consider it solved.
+
+    Other Parameters
+    ----------------
+    kwargs
+        Keyword arguments supported by :func:`scipy.optimize.least_squares`.
+
+    Returns
+    -------
+    :class:`scipy.optimize.OptimizeResult`
+        The optimisation result. Its ``x``, ``coordinates``, ``error`` and ``success``
+        attributes hold arrays of the optimised free parameter values, point
+        coordinates, total errors and success flags of each instance, respectively.
+    """
+    from scipy.optimize import OptimizeResult, least_squares
+
+    if targets is None and positions is None:
+        raise ValueError("at least one of targets and positions must be given")
+
+    if positions is None:
+        positions = np.tile(compiled.x0, (len(targets), 1))
+
+    positions = np.asarray(positions, dtype=float)
+    nbatch = len(positions)
+
+    if positions.ndim != 2 or positions.shape[1] != compiled.nfree:
+        raise ValueError(
+            f"positions must have shape (b, {compiled.nfree}), with a column for each "
+            f"free parameter, not {positions.shape}"
+        )
+
+    if targets is not None:
+        targets = np.asarray(targets, dtype=float)
+        nconstraints = sum(len(group.constraints) for group in compiled.groups)
+
+        if targets.ndim != 2 or targets.shape[1] != nconstraints:
+            raise ValueError(
+                f"targets must have shape (b, {nconstraints}), with a column for each "
+                f"constraint, not {targets.shape}"
+            )
+
+        if len(targets) != nbatch:
+            raise ValueError("targets and positions must have the same batch size")
+
+    if compiled.nfree == 0 or compiled.nresiduals == 0:
+        solution = OptimizeResult(
+            x=positions.ravel(), status=0, message="Nothing to optimise", nfev=0
+        )
+    else:
+        kwargs.setdefault("method", "trf")
+
+        def residuals(x):
+            return compiled.batch_residuals(x.reshape(nbatch, -1), targets).ravel()
+
+        def jacobian(x):
+            return compiled.batch_jacobian(x.reshape(nbatch, -1), targets)
+
+        solution = least_squares(residuals, positions.ravel(), jac=jacobian, **kwargs)
+
+    x = solution.x.reshape(nbatch, -1)
+    error = np.sum(compiled.batch_residuals(x, targets) ** 2, axis=-1)
+
+    return OptimizeResult(
+        x=x,
+        coordinates=compiled.batch_coordinates(x),
+        error=error,
+        success=error <= tolerance,
+        status=solution.status,
+        message=solution.message,
+        nfev=solution.nfev,
+    )
@@ -0,0 +1,208 @@
+"""Spatial queries on point coordinates."""
+
+import numpy as np
+
+
+class SpatialIndex:
+    """An index of the points in a store for proximity queries.
+
+    The index is a k-d tree over a snapshot of the store's coordinates. It follows the
+    store without needing to be told about changes: points added since the tree was
+    built are searched directly until there are enough of them to be worth rebuilding
+    the tree, and the tree is rebuilt if any indexed point has moved, such as after a
+    solve. Checking for moved points costs a comparison of the coordinates on each
+    query, so queries on many coordinates should be made together.
+
+    Parameters
+    ----------
+    store : :class:`.PointStore`
+        The store to index.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._tree = None
+        self._snapshot = np.empty((0, 2), dtype=float)
+
+    def __getstate__(self):
+        # The tree is rebuilt when needed.
+        return {"store": self.store}
+
+    def __setstate__(self, state):
+        self.__init__(state["store"])
+
+    def _refresh(self, queries=1):
+        """Bring the tree up to date with the store before searching for some number
+        of coordinates, returning the number of indexed points."""
+        coords = self.store.coords
+        indexed = len(self._snapshot)
+        tail = len(coords) - indexed
+
+        if tail < 0 or not np.array_equal(coords[:indexed], self._snapshot):
+            self._build()
+        elif tail > 64 and tail * queries > indexed // 8:
+            # Rebuild once searching the unindexed tail directly costs enough for the
+            # cost of rebuilding to be amortised.
+            self._build()
+
+        return len(self._snapshot)
+
+    def _build(self):
+        from scipy.spatial import cKDTree
+
+        self._snapshot = self.store.coords.copy()
+        self._tree = cKDTree(self._snapshot) if len(self._snapshot) else None
+
+    def nearest(self, coords, max_distance=np.inf):
+        """Find the nearest points to some coordinates.
+
+        Parameters
+        ----------
+        coords : array-like
+            The (2,) coordinates, or (m, 2) array of m coordinates, to query.
+
+        max_distance : :class:`float`, optional
+            Only return points at most this far away.
+
+        Returns
+        -------
+        distances, indices : :class:`numpy.ndarray`
+            The distance to and store index of the nearest point to each of the
+            coordinates, with the shape of `coords` without its last dimension. Where
+            there is no point within `max_distance`, the distance is infinite and the
+            index is -1.
+        """
+        coords = np.asarray(coords, dtype=float)
+        queries = coords.reshape(-1, 2)
+        indexed = self._refresh(len(queries))
+
+        distances = np.full(len(queries), np.inf)
+        indices = np.full(len(queries), -1, dtype=np.intp)
+
+        if self._tree is not None:
+            distances, indices = self._tree.query(
+                queries, distance_upper_bound=max_distance
+            )
+            indices = np.where(np.isfinite(distances), indices, -1).astype(np.intp)
+
+        tail = self.store.coords[indexed:]
+        if len(tail):
+            delta = queries[:, np.newaxis] - tail[np.newaxis]
+            tail_distances = np.hypot(delta[..., 0], delta[..., 1])
+            closest = np.argmin(tail_distances, axis=1)
+            tail_distances = tail_distances[np.arange(len(queries)), closest]
+            nearer = (tail_distances < distances) & (tail_distances <= max_distance)
+            distances = np.where(nearer, tail_distances, distances)
+            indices = np.where(nearer, closest + indexed, indices)
+
+        shape = coords.shape[:-1]
+        return distances.reshape(shape), indices.reshape(shape)
+
+    def within(self, coords, radius):
+        """Find the points within a distance of some coordinates.
+
+        Parameters
+        ----------
+        coords : array-like
+            The (2,) coordinates to query.
+
+        radius : :class:`float`
+            The distance.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The sorted store indices of the points within `radius` of `coords`.
+        """
+        return self._within(np.asarray(coords, dtype=float), radius, p=2)
+
+    def in_box(self, xmin, ymin, xmax, ymax):
+        """Find the points within an axis-aligned bounding box.
+
+        Parameters
+        ----------
+        xmin, ymin, xmax, ymax : :class:`float`
+            The box's bounds, which are included in the box.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The sorted store indices of the points in the box.
+        """
+        lower = np.array([xmin, ymin], dtype=float)
+        upper = np.array([xmax, ymax], dtype=float)
+
+        if np.any(lower > upper):
+            return np.zeros(0, dtype=np.intp)
+
+        # Query the square around the box using the Chebyshev distance, then trim it
+        # to the box.
+        centre = (lower + upper) / 2
+        half_size = np.max(upper - centre)
+        candidates = self._within(centre, half_size, p=np.inf)
+        coords = self.store.coords[candidates]
+        inside = np.all((coords >= lower) & (coords <= upper), axis=1)
+
+        return candidates[inside]
+
+    def _within(self, coords, radius, p):
+        indexed = self._refresh()
+        indices = []
+
+        if self._tree is not None:
+            indices.append(self._tree.query_ball_point(coords, radius, p=p))
+
+        tail = self.store.coords[indexed:]
+        distances = np.linalg.norm(tail - coords, ord=p, axis=1) if len(tail) else []
+        indices.append(indexed + np.flatnonzero(np.asarray(distances) <= radius))
+
+        return np.sort(np.concatenate(indices).astype(np.intp))
+
+    def __len__(self):
+        return len(self.store)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}(n={len(self)})>"
+
+
+def coincident_groups(coords, tolerance):
+    """Group coordinates that coincide within a tolerance.
+
+    Coordinates are grouped transitively: two coordinates further apart than
+    `tolerance` are in the same group if there is a chain of coordinates between them
+    with each within `tolerance` of the next.
+
+    Parameters
+    ----------
+    coords : :class:`numpy.ndarray`
+        The (n, 2) array of coordinates.
+
+    tolerance : :class:`float`
+        The distance within which coordinates coincide.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The (n,) array of the index of the first coordinate in each coordinate's group.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    count = len(coords)
+
+    if not count:
+        return np.zeros(0, dtype=np.intp)
+
+    pairs = cKDTree(coords).query_pairs(tolerance, output_type="ndarray")
+    graph = coo_matrix(
+        (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(count, count)
+    )
+    _, labels = connected_components(graph, directed=False)
+
+    # Label each group by its first member.
+    first = np.full(labels.max() + 1, count, dtype=np.intp)
+    np.minimum.at(first, labels, np.arange(count))
+
+    return first[labels]
@@ -0,0 +1,245 @@
+"""Solver statistics."""
+
+from time import perf_counter, time
+
+
+class SolveStopped(Exception):
+    """Raised during an objective evaluation to stop a solve early.
+
+    Parameters
+    ----------
+    reason : :class:`str`
+        Why the solve was stopped.
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class SolveStats:
+    """Statistics recorded while solving a problem.
+
+    Recording is cheap enough to always be enabled: each objective evaluation records a
+    handful of timings and appends the total error to :attr:`trace`.
+
+    Parameters
+    ----------
+    progress : callable, optional
+        Function called with this object after each objective evaluation.
+
+    sink : callable, optional
+        Function called with an event name and a :class:`dict` of data when a solve
+        starts, after each basinhopping hop, and when a solve finishes, e.g. to forward
+        the statistics to a tracing or metrics system.
+
+    deadline : :class:`float`, optional
+        Time, as returned by :func:`time.time`, after which to stop the solve.
+
+    cancel : :class:`threading.Event`, optional
+        Event which, when set, stops the solve.
+
+    target : :class:`float`, optional
+        Total error at or below which to stop the solve.
+
+    patience : :class:`int`, optional
+        Number of evaluations without a reduction in the lowest total error after which
+        to stop the solve.
+    """
+
+    def __init__(
+        self,
+        progress=None,
+        sink=None,
+        deadline=None,
+        cancel=None,
+        target=None,
+        patience=None,
+    ):
+        self.progress = progress
+        self.sink = sink
+        self.deadline = deadline
+        self.cancel = cancel
+        self.target = target
+        self.patience = patience
+
+        #: Number of evaluations of the error or residuals.
+        self.evaluations = 0
+        #: Number of evaluations of the gradient or Jacobian.
+        self.jacobian_evaluations = 0
+        #: Number of local minimiser iterations, where reported by the solver.
+        self.iterations = 0
+        #: Total error after each evaluation.
+        self.trace = []
+        #: Summary of each basinhopping hop.
+        self.hops = []
+        #: Total time spent in each phase or constraint type, in seconds.
+        self.times = {}
+        #: Number of times each phase or constraint type was timed.
+        self.calls = {}
+        #: Total wall time, in seconds.
+        self.wall_time = 0.0
+        #: The lowest total error of any evaluation.
+        self.best_error = None
+        #: The free parameter values with the lowest total error.
+        self.best_x = None
+        #: The number of evaluations when the lowest total error was found.
+        self.best_evaluation = 0
+
+        self._hop_start = (0, 0)
+
+    def timed(self, key, function, *args):
+        """Call a function, adding its duration to a key in :attr:`times`."""
+        start = perf_counter()
+        value = function(*args)
+        self.times[key] = self.times.get(key, 0.0) + perf_counter() - start
+        self.calls[key] = self.calls.get(key, 0) + 1
+        return value
+
+    def record_evaluation(self, error, x=None):
+        """Record an objective evaluation with the given total error.
+
+        Parameters
+        ----------
+        error : :class:`float`
+            The total error.
+
+        x : :class:`numpy.ndarray`, optional
+            The free parameter values, kept if they have the lowest error so far.
+
+        Raises
+        ------
+        :class:`.SolveStopped`
+            If the solve should stop.
+        """
+        self.evaluations += 1
+        self.trace.append(error)
+
+        if self.best_error is None or error < self.best_error:
+            self.best_error = error
+            self.best_evaluation = self.evaluations
+
+            if x is not None:
+                self.best_x = x.copy()
+
+        if self.progress is not None:
+            self.progress(self)
+
+        self.check_stop()
+
+    def check_stop(self):
+        """Stop the solve if it has been cancelled, its deadline has passed, it has
+        reached its target error, or it has run out of patience.
+
+        Raises
+        ------
+        :class:`.SolveStopped`
+            If the solve should stop.
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            raise SolveStopped("cancelled")
+
+        if self.deadline is not None and time() > self.deadline:
+            raise SolveStopped("deadline reached")
+
+        if self.target is not None and self.best_error is not None:
+            if self.best_error <= self.target:
+                raise SolveStopped("target reached")
+
+        if self.patience is not None:
+            if self.evaluations - self.best_evaluation >= self.patience:
+                raise SolveStopped("no improvement")
+
+    def record_iteration(self, *_):
+        """Record a local minimiser iteration.
+
+        This accepts and ignores any arguments so it can be used directly as a
+        minimiser callback.
+        """
+        self.iterations += 1
+
+    def record_hop(self, error, accepted):
+        """Record the end of a basinhopping hop."""
+        iterations, evaluations = self._hop_start
+        hop = {
+            "error": float(error),
+            "accepted": bool(accepted),
+            "iterations": self.iterations - iterations,
+            "evaluations": self.evaluations - evaluations,
+        }
+        self.hops.append(hop)
+        self._hop_start = (self.iterations, self.evaluations)
+        self.emit("hop", hop)
+
+    def emit(self, event, data=None):
+        """Send an event to the sink, if there is one."""
+        if self.sink is not None:
+            self.sink(event, self.summary() if data is None else data)
+
+    @property
+    def error(self):
+        """The total error at the last evaluation."""
+        return self.trace[-1] if self.trace else None
+
+    def merge(self, other):
+        """Add another solve's statistics to these.
+
+        The lowest errors of the solves are summed, since the solves are assumed to be
+        of independent components. The parameters are not kept.
+
+        Parameters
+        ----------
+        other : :class:`.SolveStats`
+            The other statistics.
+        """
+        self.evaluations += other.evaluations
+        self.jacobian_evaluations += other.jacobian_evaluations
+        self.iterations += other.iterations
+        self.trace.extend(other.trace)
+        self.hops.extend(other.hops)
+        self.wall_time += other.wall_time
+
+        # The errors of independent components add; their parameters don't combine.
+        if other.best_error is not None:
+            self.best_error = (self.best_error or 0.0) + other.best_error
+
+        for key, value in other.times.items():
+            self.times[key] = self.times.get(key, 0.0) + value
+        for key, value in other.calls.items():
+            self.calls[key] = self.calls.get(key, 0) + value
+
+    def summary(self):
+        """The statistics, without the per-evaluation trace.
+
+        Returns
+        -------
+        :class:`dict`
+            The statistics.
+        """
+        return {
+            "evaluations": self.evaluations,
+            "jacobian_evaluations": self.jacobian_evaluations,
+            "iterations": self.iterations,
+            "hops": len(self.hops),
+            "error": self.error,
+            "times": dict(self.times),
+            "calls": dict(self.calls),
+            "wall_time": self.wall_time,
+        }
+
+    def __getstate__(self):
+        # Callbacks stay in the process they were given in.
+        state = self.__dict__.copy()
+        state["progress"] = None
+        state["sink"] = None
+        state["cancel"] = None
+        return state
+
+    def __str__(self):
+        times = ", ".join(f"{key}={value:.3g}s" for key, value in self.times.items())
+        return (
+            f"{self.__class__.__name__}(evaluations={self.evaluations}, "
+            f"jacobian_evaluations={self.jacobian_evaluations}, "
+            f"iterations={self.iterations}, hops={len(self.hops)}, "
+            f"error={self.error}, wall_time={self.wall_time:.3g}s, times=[{times}])"
+        )
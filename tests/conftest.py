@@ -13,3 +13,9 @@ def problem():
 def tolerance():
     """Tolerance for comparisons."""
     return 1e-3
+
+
+@pytest.fixture(params=("least_squares", "basinhopping"))
+def method(request):
+    """Solver method."""
+    return request.param
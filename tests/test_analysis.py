@@ -0,0 +1,98 @@
+"""Degrees of freedom analysis tests."""
+
+import numpy as np
+import pytest
+
+
+def test_analyse(problem):
+    # An anchored, well-constrained triangle...
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1, 1))
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_line_length("l3", 1)
+    # ...and a free line with a redundant length constraint.
+    problem.add_line("m", (5, 0), (6, 0))
+    problem.constrain_line_length("m", 1)
+    problem.constrain_line_length("m", 1)
+
+    analysis = problem.analyse()
+
+    assert analysis.consistent
+    assert len(analysis.components) == 2
+    triangle, line = analysis.components
+    assert (triangle.status, triangle.dof, triangle.redundant) == (
+        "well-constrained",
+        0,
+        [],
+    )
+    assert line.status == "over-constrained"
+    # Three rigid body motions remain.
+    assert line.dof == 3
+    assert line.redundant == [problem.constraints[3]]
+    assert analysis.redundant == [problem.constraints[3]]
+
+
+def test_violated_fixed_constraint(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l1", 2)
+
+    assert not problem.analyse().consistent
+
+    with pytest.raises(ValueError, match="between fixed points are violated"):
+        problem.solve()
+
+
+def test_satisfied_components_are_skipped(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", (5, 0), (6, 0))
+    problem.constrain_line_length("l1", 1)
+    problem.constrain_line_length("l2", 2)
+
+    result = problem.solve()
+
+    assert result.success
+    assert len(result.components) == 1
+    assert problem["l2"].length() == pytest.approx(2)
+
+
+def test_failure_reports_redundant_constraints(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.constrain_line_length("l1", 1)
+    problem.constrain_line_length("l1", 2)
+
+    with pytest.warns(UserWarning, match="redundant and may conflict"):
+        result = problem.solve()
+
+    assert not result.success
+    assert result.analysis[0].redundant == [problem.constraints[1]]
+
+
+def test_large_failure_is_analysed_structurally(problem, monkeypatch):
+    def qr(*args, **kwargs):
+        raise AssertionError("large component analysed with a dense decomposition")
+
+    monkeypatch.setattr("scipy.linalg.qr", qr)
+
+    # A horizontal chain of 300 unit lines, anchored at one end, with a conflicting
+    # length constraint on the last line.
+    count = 300
+    names = [f"l{i}" for i in range(count)]
+    points = problem.add_points([(i, 0) for i in range(count + 1)])
+    problem.add_lines(names, points[:-1], points[1:])
+    problem.constrain_position("l0")
+    problem.constrain_line_lengths(names[1:], np.ones(count - 1))
+    for name in names[1:]:
+        problem.constrain_horizontal(name)
+    problem.constrain_line_length(names[-1], 2)
+
+    with pytest.warns(UserWarning, match="redundant and may conflict"):
+        result = problem.solve()
+
+    assert not result.success
+    (analysis,) = result.analysis
+    assert analysis.structural
+    assert analysis.nfree == 598
+    assert (analysis.dof, len(analysis.redundant)) == (0, 1)
@@ -0,0 +1,100 @@
+"""Asynchronous solve tests."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+
+@pytest.fixture
+def sketch(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1.5, 1))
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_line_length("l3", 1)
+    return problem
+
+
+def test_solve_async(sketch, tolerance):
+    result = asyncio.run(sketch.solve_async(construct=False))
+
+    assert result.success
+    assert result.stopped is None
+    assert sketch["l2"].length() == pytest.approx(1, abs=tolerance)
+
+
+def test_solve_async_timeout(sketch):
+    async def solve():
+        with ThreadPoolExecutor(1) as executor:
+            return await sketch.solve_async(
+                method="basinhopping",
+                executor=executor,
+                timeout=0.2,
+                construct=False,
+                niter=100000,
+                seed=1,
+                target=None,
+            )
+
+    # The first hop finds the solution, after which the rest make no progress.
+    result = asyncio.run(solve())
+
+    assert result.stopped == "deadline reached"
+    assert result.success
+    assert result.error == pytest.approx(0, abs=1e-10)
+    assert sketch["l2"].length() == pytest.approx(1, abs=1e-5)
+
+
+def test_solve_async_cancel(sketch):
+    initial = sketch.store.coords.copy()
+
+    async def solve():
+        with ThreadPoolExecutor(1) as executor:
+            task = asyncio.create_task(
+                sketch.solve_async(
+                    method="basinhopping",
+                    executor=executor,
+                    construct=False,
+                    niter=100000,
+                    target=None,
+                )
+            )
+            await asyncio.sleep(0.1)
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(solve())
+
+    assert sketch.store.coords.tolist() == initial.tolist()
+
+
+def test_solve_async_responsive(sketch, monkeypatch):
+    """The event loop keeps running while the problem is prepared."""
+    prepare = sketch._prepare
+
+    def slow_prepare(*args, **kwargs):
+        time.sleep(0.3)
+        return prepare(*args, **kwargs)
+
+    monkeypatch.setattr(sketch, "_prepare", slow_prepare)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def solve():
+        ticker = asyncio.create_task(tick())
+        try:
+            return await sketch.solve_async(construct=False)
+        finally:
+            ticker.cancel()
+
+    assert asyncio.run(solve()).success
+    assert ticks >= 10
@@ -0,0 +1,95 @@
+"""Bulk construction tests."""
+
+import numpy as np
+import pytest
+from pygeosolve import Problem
+from pygeosolve.cache import problem_keys
+
+
+def _square(bulk):
+    corners = [(0, 0), (1, 0), (1.1, 0.9), (-0.1, 1.1)]
+    names = ["a", "b", "c", "d"]
+    problem = Problem()
+
+    if bulk:
+        points = problem.add_points(corners)
+        problem.add_lines(names, points, np.roll(points, -1))
+        problem.constrain_positions(["a"])
+        problem.constrain_line_lengths(names[1:], [1, 1, 1])
+        problem.constrain_angles_between_lines(names, names[1:] + names[:1], [-90] * 4)
+    else:
+        problem.add_line("a", corners[0], corners[1])
+        problem.add_line("b", problem["a"].end, corners[2])
+        problem.add_line("c", problem["b"].end, corners[3])
+        problem.add_line("d", problem["c"].end, problem["a"].start)
+        problem.constrain_position("a")
+        for name in names[1:]:
+            problem.constrain_line_length(name, 1)
+        for line_a, line_b in zip(names, names[1:] + names[:1]):
+            problem.constrain_angle_between_lines(line_a, line_b, -90)
+
+    return problem
+
+
+def test_bulk_matches_individual(tolerance):
+    bulk = _square(bulk=True)
+    individual = _square(bulk=False)
+
+    assert problem_keys(bulk) == problem_keys(individual)
+    assert bulk.error() == pytest.approx(individual.error())
+
+    assert bulk.solve(construct=False).success
+    assert individual.solve(construct=False).success
+    assert bulk.error() < tolerance
+    assert bulk["c"].end.params == pytest.approx(individual["c"].end.params)
+
+
+def test_add_lines_from_coordinates():
+    problem = Problem()
+    segments = np.array([[(0, 0), (1, 0)], [(1, 1e-9), (1, 1)], [(1, 1), (0, 1)]])
+    problem.add_lines(["a", "b", "c"], segments[:, 0], segments[:, 1], merge=1e-6)
+
+    assert len(problem.points) == 4
+    assert problem["b"].start == problem["a"].end
+    assert problem["c"].start == problem["b"].end
+
+    # Coordinates and existing point indices can be mixed.
+    assert problem.points[problem["a"].start.index] == problem["a"].start
+    problem.add_lines(["d"], [(0, 1)], [problem["a"].start.index], merge=1e-6)
+    assert problem["d"].start == problem["c"].end
+    assert problem["d"].end == problem["a"].start
+
+
+def test_bulk_errors():
+    problem = Problem()
+    points = problem.add_points([(0, 0), (1, 0)])
+
+    with pytest.raises(ValueError):
+        problem.add_lines(["a", "a"], points, points[::-1])
+    with pytest.raises(ValueError):
+        problem.add_lines(["a"], [0], [2])
+    with pytest.raises(ValueError):
+        problem.add_lines(["a", "b"], [0], [1])
+
+    problem.add_lines(["a"], [0], [1])
+    with pytest.raises(ValueError):
+        problem.add_lines(["a"], [1], [0])
+    with pytest.raises(ValueError):
+        problem.constrain_line_lengths(["a"], [-1])
+    with pytest.raises(ValueError):
+        problem.constrain_line_lengths(["b"], [1])
+    with pytest.raises(ValueError):
+        problem.constrain_line_lengths(["a"], [1, 2])
+    with pytest.raises(ValueError, match="same length"):
+        problem.constrain_angles_between_lines(["a", "a"], ["a"], [0, 0])
+
+
+def test_bulk_iterables():
+    """Names can be given as any iterable, such as a generator."""
+    problem = Problem()
+    problem.add_lines(["a", "b"], [(0, 0), (1, 0)], [(1, 0), (2, 1)])
+    problem.constrain_line_lengths((name for name in "ab"), [1, 1])
+    problem.constrain_angles_between_lines(iter(["a"]), (name for name in "b"), [90])
+
+    assert len(problem.constraints) == 3
+    assert problem.constraints[2].primitives == [problem["a"], problem["b"]]
@@ -0,0 +1,120 @@
+"""Solution cache tests."""
+
+import pytest
+from pygeosolve import Problem, SolutionCache
+from pygeosolve.cache import problem_keys
+
+
+def _sketch(end=(1, 1), length=1, prefix=""):
+    problem = Problem()
+    problem.add_line(f"{prefix}l1", (0, 0), (1, 0))
+    problem.add_line(f"{prefix}l2", problem[f"{prefix}l1"].end, end)
+    problem.constrain_position(f"{prefix}l1")
+    problem.constrain_line_length(f"{prefix}l2", length)
+    return problem
+
+
+def test_problem_keys():
+    key, structure_key = problem_keys(_sketch())
+
+    # Names don't matter.
+    assert problem_keys(_sketch(prefix="x")) == (key, structure_key)
+    # Initial positions within the quantum only change the full key.
+    assert problem_keys(_sketch(end=(1, 1 + 1e-9))) == (key, structure_key)
+    assert problem_keys(_sketch(end=(1, 1.1))) != (key, structure_key)
+    assert problem_keys(_sketch(end=(1, 1.1)))[1] == structure_key
+    # Targets change both keys.
+    other_key, other_structure_key = problem_keys(_sketch(length=2))
+    assert other_key != key
+    assert other_structure_key != structure_key
+
+
+def test_solve_with_cache(tmp_path, tolerance):
+    cache = SolutionCache(path=tmp_path)
+
+    first = _sketch(end=(1.5, 1))
+    result = first.solve(cache=cache, construct=False)
+    assert result.success
+    assert result.nfev > 0
+    assert len(cache) == 2
+
+    # A repeat is found in the cache.
+    repeat = _sketch(end=(1.5, 1))
+    result = repeat.solve(cache=cache, construct=False)
+    assert result.success
+    assert result.nfev == 0
+    assert repeat.free_values == pytest.approx(first.free_values)
+
+    # A near miss is warm-started from the cached solution.
+    near = _sketch(end=(1.5, 1.01))
+    result = near.solve(cache=cache, construct=False)
+    assert result.success
+    assert result.nfev <= 1
+    assert near["l2"].length() == pytest.approx(1, abs=tolerance)
+
+    # Solutions are reloaded from disk.
+    cache = SolutionCache(path=tmp_path)
+    assert len(cache) == 0
+    result = _sketch(end=(1.5, 1)).solve(cache=cache, construct=False)
+    assert result.nfev == 0
+    assert cache.hits == 1
+
+
+def test_cache_eviction():
+    cache = SolutionCache(maxsize=2)
+    cache.put("a", [[0, 0]])
+    cache.put("b", [[1, 1]])
+    cache.get("a")
+    cache.put("c", [[2, 2]])
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a").tolist() == [[0, 0]]
+
+
+def _triangle(apex):
+    problem = Problem()
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, apex)
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_line_length("l3", 1)
+    return problem
+
+
+def test_cache_keeps_solution_branch(tolerance):
+    """Solves aren't warm-started from solutions found from distant initial
+    positions, which may be a different one of the problem's solutions."""
+    cache = SolutionCache()
+    assert _triangle((0.5, 1)).solve(cache=cache, construct=False).success
+
+    mirrored = _triangle((0.5, -1))
+    result = mirrored.solve(cache=cache, construct=False)
+    assert result.success
+    assert result.nfev > 1
+    apex = mirrored["l2"].end.params
+    assert apex.tolist() == pytest.approx([0.5, -(3**0.5) / 2], abs=tolerance)
+
+
+def test_failed_solve_with_cache(tolerance):
+    """A failed solve leaves the best solution applied whether or not it uses a
+    cache."""
+
+    def conflicting():
+        problem = Problem()
+        problem.add_line("l1", (0, 0), (1, 0))
+        problem.constrain_line_length("l1", 1)
+        problem.constrain_line_length("l1", 2)
+        return problem
+
+    uncached = conflicting()
+    cached = conflicting()
+
+    with pytest.warns(UserWarning):
+        assert not uncached.solve(construct=False).success
+    with pytest.warns(UserWarning):
+        assert not cached.solve(construct=False, cache=SolutionCache()).success
+
+    assert uncached["l1"].length() == pytest.approx(1.5, abs=tolerance)
+    assert cached.point_coords() == pytest.approx(uncached.point_coords())
@@ -0,0 +1,51 @@
+"""Compiled problem tests."""
+
+import math
+import pytest
+
+
+@pytest.fixture
+def triangle(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (0.5, math.sqrt(3) / 2))
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 2)
+    problem.constrain_line_length("l3", 1.5)
+    problem.constrain_angle_between_lines("l1", "l2", -90)
+    problem.constrain_angle_between_lines("l2", "l3", 170)
+    return problem
+
+
+def test_compiled_error_matches_constraints(triangle):
+    """The compiled error equals the problem's error: the sum of the squares of the
+    constraints' weighted residuals, with those of lengths divided by the length
+    scale."""
+    compiled = triangle.compile()
+    assert compiled.nfree == 2
+    assert compiled.error(compiled.x0) == pytest.approx(triangle.error())
+
+
+def test_compiled_apply(triangle):
+    """Applying free parameter values updates the problem's points."""
+    compiled = triangle.compile()
+    x = compiled.x0 + 0.25
+    error = compiled.error(x)
+    compiled.apply(x)
+    assert triangle.error() == pytest.approx(error)
+    # Fixed points are unchanged.
+    assert triangle["l1"].start.params.tolist() == [0, 0]
+    assert triangle["l1"].end.params.tolist() == [1, 0]
+
+
+def test_compiled_gradient(triangle):
+    """The analytic gradient and Jacobian match finite differences."""
+    from scipy.optimize import approx_fprime
+
+    compiled = triangle.compile()
+    x = compiled.x0 + [0.1, -0.2]
+    gradient = approx_fprime(x, compiled.error, 1e-8)
+    jacobian = approx_fprime(x, lambda x: compiled.residuals(x).copy(), 1e-8)
+
+    assert compiled.gradient(x) == pytest.approx(gradient, rel=1e-4, abs=1e-6)
+    assert compiled.jacobian(x).toarray() == pytest.approx(jacobian, rel=1e-4, abs=1e-6)
@@ -0,0 +1,252 @@
+"""Constraint tests."""
+
+import numpy as np
+import pytest
+from pygeosolve import Problem
+from pygeosolve.constraints import (
+    LineLengthConstraint,
+    LineAngleConstraint,
+    PointToPointDistanceConstraint,
+    ParallelConstraint,
+    PerpendicularConstraint,
+    EqualLengthConstraint,
+    HorizontalConstraint,
+    VerticalConstraint,
+    CoincidentConstraint,
+    PointOnLineConstraint,
+)
+from pygeosolve.solvers import LeastSquaresSolver
+
+# Constraint types, with the number of points and a target.
+KINDS = [
+    (LineLengthConstraint, 2, 1.5),
+    (LineAngleConstraint, 4, 30),
+    (PointToPointDistanceConstraint, 2, 1.5),
+    (ParallelConstraint, 4, 0),
+    (PerpendicularConstraint, 4, 0),
+    (EqualLengthConstraint, 4, 0),
+    (HorizontalConstraint, 2, 0),
+    (VerticalConstraint, 2, 0),
+    (CoincidentConstraint, 2, 0),
+    (PointOnLineConstraint, 3, 0),
+]
+
+
+@pytest.mark.parametrize(
+    "kind,npoints,target", KINDS, ids=[kind.__name__ for kind, *_ in KINDS]
+)
+def test_batch_jacobians(kind, npoints, target):
+    """The Jacobians match finite differences of the residuals, with and without
+    leading batch dimensions."""
+    rng = np.random.default_rng(0)
+    coords = rng.normal(size=(3, 6, 2))
+    indices = np.array([rng.permutation(6)[:npoints] for _ in range(4)])
+    targets = np.full((3, 4), target, dtype=float)
+
+    nresiduals = 4 * kind.nresiduals
+    assert kind.batch_residuals(coords, indices, targets).shape == (3, nresiduals)
+    jacobians = kind.batch_jacobians(coords, indices, targets)
+    assert jacobians.shape == (3, nresiduals, npoints, 2)
+    assert kind.batch_jacobians(coords[0], indices, targets[0]) == pytest.approx(
+        jacobians[0]
+    )
+
+    step = 1e-6
+    for row, point, param in np.ndindex(nresiduals, npoints, 2):
+        shifted = coords.copy()
+        shifted[:, indices[row // kind.nresiduals, point], param] += step
+        forward = kind.batch_residuals(shifted, indices, targets)[:, row]
+        shifted[:, indices[row // kind.nresiduals, point], param] -= 2 * step
+        backward = kind.batch_residuals(shifted, indices, targets)[:, row]
+        expected = (forward - backward) / (2 * step)
+        assert jacobians[:, row, point, param] == pytest.approx(expected, abs=1e-6)
+
+
+def test_sketch(tolerance):
+    """A sketch using each kind of geometric constraint."""
+    problem = Problem()
+    problem.add_line("bottom", (0.1, -0.1), (4, 0.2))
+    problem.add_line("right", problem["bottom"].end, (4.3, 2.9))
+    problem.add_line("top", (3.8, 3.1), (-0.2, 2.8))
+    problem.add_line("left", problem["top"].end, problem["bottom"].start)
+    problem.add_line("diagonal", (0.1, 0.1), (4.2, 3.2))
+    problem.add_point("centre", 2.3, 1.4)
+
+    problem.add_point("origin", 0, 0)
+
+    problem.constrain_position("origin")
+    problem.constrain_coincident("origin", problem["bottom"].start)
+    problem.constrain_line_length("bottom", 4)
+    problem.constrain_horizontal("bottom")
+    problem.constrain_vertical("right")
+    problem.constrain_parallel("top", "bottom")
+    problem.constrain_perpendicular("left", "top")
+    problem.constrain_equal_length("right", "bottom")
+    problem.constrain_coincident(problem["top"].start, problem["right"].end)
+    problem.constrain_coincident(problem["diagonal"].start, problem["bottom"].start)
+    problem.constrain_coincident(problem["diagonal"].end, problem["right"].end)
+    problem.constrain_point_on_line("centre", "diagonal")
+    problem.constrain_distance("centre", problem["bottom"].start, 1)
+
+    assert problem.solve(construct=False).success
+    assert problem.error() < tolerance**2
+
+    assert problem["bottom"].start.params == pytest.approx([0, 0], abs=tolerance)
+    assert problem["right"].start.params == pytest.approx([4, 0], abs=tolerance)
+    assert problem["top"].start.params == pytest.approx([4, 4], abs=tolerance)
+    assert problem["top"].end.params == pytest.approx([0, 4], abs=tolerance)
+    assert problem["centre"].params == pytest.approx([2**-0.5] * 2, abs=tolerance)
+
+
+def test_coincident_analysis(problem, tolerance):
+    """Coincident points remove two degrees of freedom, including once solved."""
+    problem.add_line("a", (0, 0), (1, 0))
+    problem.add_line("b", (1.1, 0.1), (1.2, 0.9))
+    problem.constrain_position("a")
+    problem.constrain_coincident(problem["a"].end, problem["b"].start)
+    problem.constrain_line_length("b", 1)
+    problem.constrain_perpendicular("a", "b")
+
+    def check_analysis():
+        (component,) = problem.analyse().components
+        assert (component.status, component.dof, component.redundant) == (
+            "well-constrained",
+            0,
+            [],
+        )
+
+    check_analysis()
+    result = problem.solve(construct=False)
+    assert result.success
+    # Convergence is quadratic, so takes only a few evaluations.
+    assert result.nfev < 10
+    assert problem["b"].start.params == pytest.approx([1, 0], abs=1e-12)
+    assert problem["b"].end.params == pytest.approx([1, 1], abs=tolerance)
+    check_analysis()
+
+
+def test_geometric_constraint_targets(problem):
+    problem.add_line("a", (0, 0), (1, 0))
+    problem.add_line("b", (0, 0), (1, 1))
+    problem.constrain_parallel("a", "b")
+
+    constraint = problem.constraints[0]
+    assert constraint.target == 0
+    assert constraint.value() == pytest.approx(2**-0.5)
+    assert constraint.error() == pytest.approx(0.5)
+
+    lines = [(problem["a"], problem["b"])]
+    assert len(ParallelConstraint.many(lines, [0])) == 1
+    with pytest.raises(ValueError):
+        ParallelConstraint.many(lines, [1])
+
+    with pytest.raises(ValueError):
+        problem.constrain_coincident("a", "b")
+
+
+def test_save_and_construct(tmp_path, tolerance):
+    """Geometric constraints are saved and loaded, and used to construct points."""
+    problem = Problem()
+    problem.add_point("origin", 0, 0)
+    problem.add_line("a", (0.2, 0.1), (2, 0.5))
+    problem.add_line("b", problem["a"].end, (2.5, 3))
+    problem.constrain_position("origin")
+    problem.constrain_coincident("origin", problem["a"].start)
+    problem.constrain_horizontal("a")
+    problem.constrain_line_length("a", 2)
+    problem.constrain_vertical("b")
+    problem.constrain_line_length("b", 3)
+
+    path = tmp_path / "sketch.pgs"
+    problem.save(path)
+    loaded = Problem.load(path)
+    assert [type(c) for c in loaded.constraints] == [
+        type(c) for c in problem.constraints
+    ]
+    assert loaded.error() == pytest.approx(problem.error())
+
+    result = loaded.solve()
+    assert result.success
+    # The points were placed by construction, without needing to solve.
+    assert result.nfev == 0
+    assert loaded["b"].end.params == pytest.approx([2, 3], abs=tolerance)
+
+
+def _right_angle(size):
+    problem = Problem()
+    problem.add_line("a", (0, 0), (size, 0))
+    problem.add_line("b", problem["a"].end, (1.2 * size, 0.9 * size))
+    problem.constrain_position("a")
+    problem.constrain_line_length("b", size)
+    problem.constrain_angle_between_lines("a", "b", -90)
+    return problem
+
+
+@pytest.mark.parametrize("size", (1e-3, 1e3))
+def test_scale_invariance(size):
+    """The error and the solve don't depend on the size of the sketch."""
+    problem = _right_angle(size)
+    unit = _right_angle(1)
+    assert problem.length_scale() == pytest.approx(size)
+    assert problem.error() == pytest.approx(unit.error())
+
+    result = problem.solve(construct=False)
+    assert result.success
+    assert result.nfev == unit.solve(construct=False).nfev
+    assert problem["b"].end.params == pytest.approx([size, size])
+
+
+def test_angle_residual():
+    """Angle residuals are finite and bounded, with a zero target, and the same for
+    angles a full turn apart."""
+    residuals = []
+    for angle in (0, 180, 360):
+        problem = Problem()
+        problem.add_line("a", (0, 0), (1, 0))
+        problem.add_line("b", (0, 0), (-1, 0))
+        problem.constrain_angle_between_lines("a", "b", angle)
+        residuals.append(problem.error())
+
+    assert residuals == pytest.approx([4, 0, 4])
+
+
+def test_weights(tmp_path):
+    problem = Problem()
+    problem.add_line("a", (0, 0), (2, 0))
+    problem.constrain_line_length("a", 1)
+    problem.constrain_line_length("a", 3, weight=2)
+    problem.scale = 1
+
+    assert [c.weight for c in problem.constraints] == [1, 2]
+    assert problem.error() == pytest.approx(5)
+
+    # The conflicting lengths settle nearer the more heavily weighted one, at 2.6.
+    result = LeastSquaresSolver().solve(problem.compile())
+    assert not result.success
+    assert result.error == pytest.approx(1.6**2 + (2 * 0.4) ** 2)
+
+    path = tmp_path / "sketch.pgs"
+    problem.save(path)
+    loaded = Problem.load(path)
+    assert [c.weight for c in loaded.constraints] == [1, 2]
+    assert loaded.scale == 1
+    assert loaded.error() == pytest.approx(problem.error())
+
+    with pytest.raises(ValueError):
+        problem.constrain_line_length("a", 1, weight=-1)
+
+
+def test_incremental_scale():
+    """Incremental solves normalise by the current length scale."""
+    problem = _right_angle(1)
+    assert problem.solve(incremental=True).success
+
+    problem.constraints[0].length = 3
+    assert problem.solve(incremental=True).success
+    assert problem.length_scale() == 3
+    assert [c.scale for c in problem._compiled_components] == [3]
+
+    problem.scale = 10
+    assert problem.solve(incremental=True).success
+    assert [c.scale for c in problem._compiled_components] == [10]
+    assert problem["b"].length() == pytest.approx(3)
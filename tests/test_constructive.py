@@ -0,0 +1,78 @@
+"""Constructive placement tests."""
+
+import math
+import pytest
+from pygeosolve.constructive import construct_points
+
+
+def test_length_and_angle(problem, tolerance):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1, 1))
+    problem.add_line("l3", problem["l2"].end, (0, 3))
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 2)
+    problem.constrain_angle_between_lines("l1", "l2", -90)
+    problem.constrain_line_length("l3", 1)
+    problem.constrain_angle_between_lines("l3", "l2", 45)
+
+    placed, determined = construct_points(problem)
+
+    assert placed.tolist() == [False, False, True, True]
+    assert determined.all()
+    assert problem["l2"].end.params.tolist() == pytest.approx([1, 2])
+    assert problem["l1"].angle_to(problem["l2"]) == pytest.approx(-90)
+    assert problem["l3"].angle_to(problem["l2"]) == pytest.approx(45)
+    assert problem["l3"].length() == pytest.approx(1)
+    assert problem.error() == pytest.approx(0, abs=1e-20)
+
+
+def test_circle_intersection(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (0.5, -0.1))
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_line_length("l3", 1)
+
+    placed, determined = construct_points(problem)
+
+    assert placed.tolist() == [False, False, True]
+    assert not determined[2]
+    # The intersection nearest the initial position is chosen.
+    assert problem["l2"].end.params.tolist() == pytest.approx([0.5, -math.sqrt(3) / 2])
+
+
+def test_solve_constructs(problem, tolerance):
+    """A fully constructible sketch needs no numeric optimisation."""
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1, 1))
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_angle_between_lines("l1", "l2", -120)
+    problem.constrain_angle_between_lines("l2", "l3", -120)
+
+    result = problem.solve()
+
+    assert result.success
+    assert result.nfev == 0
+    assert result.message.endswith("1 placed constructively")
+    assert problem["l3"].length() == pytest.approx(1, abs=tolerance)
+
+
+def test_solve_residue(problem, tolerance):
+    """Constructed points are held while the rest is solved numerically."""
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1.2, 0.7))
+    problem.add_line("m", (3, 3), (4, 4))
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_angle_between_lines("l1", "l2", -90)
+    problem.constrain_line_length("m", 2)
+
+    result = problem.solve()
+
+    assert result.success
+    assert len(result.components) == 1
+    assert problem["l2"].end.params.tolist() == pytest.approx([1, 1], abs=tolerance)
+    assert problem["m"].length() == pytest.approx(2, abs=tolerance)
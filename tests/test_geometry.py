@@ -1,7 +1,7 @@
 """Triangle tests."""
 
 import pytest
-from pygeosolve.geometry import Line
+from pygeosolve.geometry import PointStore, Point, Line
 
 
 @pytest.mark.parametrize(
@@ -20,3 +20,73 @@ def test_line_angles(p1, p2, p3, p4, angle):
     l1 = Line("l1", p1, p2)
     l2 = Line("l2", p3, p4)
     assert l1.angle_to(l2) == pytest.approx(angle)
+
+
+def test_point_to_point_distance_constraint():
+    from pygeosolve.constraints import PointToPointDistanceConstraint
+
+    p1 = Point("p1", 0, 0)
+    p2 = Point("p2", 3, 4)
+    constraint = PointToPointDistanceConstraint(p1, p2, 4)
+    assert constraint.value() == pytest.approx(5)
+    assert constraint.error() == pytest.approx(1)
+    assert constraint.gradient().ravel() == pytest.approx([-1.2, -1.6, 1.2, 1.6])
+
+
+def test_point_store():
+    store = PointStore(capacity=1)
+    l1 = Line("l1", (0, 0), (1, 0), store=store)
+    l2 = Line("l2", l1.end, (1, 1))
+
+    # Points are shared handles into one contiguous store, which grows as needed.
+    assert l2.start == l1.end
+    assert len(store) == 3
+    assert store.coords.tolist() == [[0, 0], [1, 0], [1, 1]]
+    assert store.coords.nbytes == 3 * 16
+    assert not hasattr(l1.start, "__dict__")
+    assert not hasattr(l1, "__dict__")
+
+    # Writes through a point are seen by all of its handles.
+    l1.end.params[1] = 2
+    assert l2.start.y == 2
+    assert l2.length() == pytest.approx(1)
+
+
+def test_problem_geometry_queries():
+    from pygeosolve import Problem
+
+    problem = Problem()
+    problem.add_line("a", (0, 0), (1, 0))
+    problem.add_line("b", problem["a"].end, (2, 1))
+    problem.add_point("p", 5, 5)
+    problem.add_line("c", problem["b"].end, (2, -3))
+    lines = [problem[name] for name in problem.line_names]
+
+    assert problem.line_names == ["a", "b", "c"]
+    assert problem.point_coords().tolist() == [[0, 0], [1, 0], [2, 1], [5, 5], [2, -3]]
+    assert problem.line_lengths() == pytest.approx([line.length() for line in lines])
+    assert problem.line_angles() == pytest.approx([line.angle() for line in lines])
+
+    pairs = [(0, 1), (1, 2), (2, 0)]
+    expected = [lines[a].angle_to(lines[b]) for a, b in pairs]
+    lines_a, lines_b = zip(*pairs)
+    assert problem.angles_between_lines(lines_a, lines_b) == pytest.approx(expected)
+    assert problem.angles_between_lines(["a", "b"], ["b", "c"]) == pytest.approx(
+        expected[:2]
+    )
+
+    with pytest.raises(ValueError):
+        problem.angles_between_lines(["a"], ["p"])
+
+
+def test_point_from_another_store(problem):
+    """Points can't be shared between stores, so must be copied explicitly."""
+    point = Point("p", 1, 1)
+
+    with pytest.raises(ValueError, match="another store"):
+        problem.add_line("a", (0, 0), point)
+    assert len(problem.store) == 0
+
+    problem.add_line("a", (0, 0), point.params)
+    assert problem["a"].end != point
+    assert problem["a"].end.params.tolist() == [1, 1]
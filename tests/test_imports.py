@@ -0,0 +1,18 @@
+"""Import tests."""
+
+import subprocess
+import sys
+
+
+def test_import_is_lightweight():
+    """Importing pygeosolve doesn't import the optional or slow-to-import modules only
+    needed to solve or plot problems."""
+    heavy = ("scipy", "matplotlib", "concurrent.futures.process")
+    code = (
+        "import sys, pygeosolve; "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == ""
@@ -0,0 +1,120 @@
+"""Binary problem file tests."""
+
+import io
+import struct
+import numpy as np
+import pytest
+from pygeosolve import Problem
+from pygeosolve.constraints import PointToPointDistanceConstraint
+from pygeosolve.io import MAGIC, VERSION, load_arrays, read_header, write_arrays
+
+
+@pytest.fixture
+def sketch(problem):
+    problem.add_point("p", 3, 3)
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1, 1))
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_angle_between_lines("l1", "l2", -120)
+    problem.constraints.append(
+        PointToPointDistanceConstraint(problem["p"], problem["l2"].end, 2)
+    )
+    return problem
+
+
+def test_round_trip(sketch, tmp_path):
+    path = tmp_path / "sketch.pgs"
+    sketch.save(path)
+    loaded = Problem.load(path)
+
+    assert list(loaded.primitives) == list(sketch.primitives)
+    assert loaded.store.coords.tolist() == sketch.store.coords.tolist()
+    assert loaded.free_params.tolist() == sketch.free_params.tolist()
+    assert [type(c) for c in loaded.constraints] == [
+        type(c) for c in sketch.constraints
+    ]
+    assert [c.target for c in loaded.constraints] == [
+        c.target for c in sketch.constraints
+    ]
+    assert loaded["l3"].end == loaded["l1"].start
+    assert loaded.error() == pytest.approx(sketch.error())
+
+    assert loaded.solve().success
+    assert sketch.solve().success
+    assert loaded.free_values.tolist() == pytest.approx(sketch.free_values.tolist())
+
+
+def test_memory_mapped_solutions(sketch, tmp_path):
+    path = tmp_path / "sketch.pgs"
+    solutions = np.arange(3 * len(sketch.free_params), dtype=float).reshape(3, -1)
+    sketch.save(path, solutions=solutions)
+
+    arrays = load_arrays(path)
+
+    assert isinstance(arrays.solutions, np.memmap)
+    assert arrays.solutions.tolist() == solutions.tolist()
+    assert arrays.constraint_points.tolist() == [
+        [2, 3, -1, -1],
+        [1, 2, 2, 3],
+        [0, 3, -1, -1],
+    ]
+    assert read_header(path)["version"] == VERSION
+
+
+def test_not_a_problem_file(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"something else")
+
+    with pytest.raises(ValueError, match="not a pygeosolve problem file"):
+        Problem.load(path)
+
+
+def _with_version(path, version, drop=()):
+    """Rewrite a problem file as another format version, without some of its arrays
+    and header items."""
+    arrays = load_arrays(path, mmap=False)
+    header = {
+        key: value
+        for key, value in arrays.header.items()
+        if key not in drop and key != "version"
+    }
+    buffer = io.BytesIO()
+    write_arrays(
+        buffer,
+        {name: array for name, array in arrays.arrays.items() if name not in drop},
+        header,
+    )
+    data = bytearray(buffer.getvalue())
+    data[len(MAGIC) : len(MAGIC) + 4] = struct.pack("<I", version)
+    path.write_bytes(data)
+
+
+def test_version_1(sketch, tmp_path):
+    """Version 1 files, without weights or a scale, load with unit weights and an
+    automatic scale."""
+    sketch.constraints[0].weight = 3
+    sketch.scale = 10
+    path = tmp_path / "sketch.pgs"
+    sketch.save(path)
+    _with_version(path, 1, drop=("constraint_weights", "scale"))
+
+    assert read_header(path)["version"] == 1
+    loaded = Problem.load(path)
+
+    assert [c.weight for c in loaded.constraints] == [1, 1, 1]
+    assert loaded.scale is None
+    sketch.constraints[0].weight = 1
+    sketch.scale = None
+    assert loaded.length_scale() == pytest.approx(sketch.length_scale())
+    assert loaded.error() == pytest.approx(sketch.error())
+
+
+def test_future_version(sketch, tmp_path):
+    path = tmp_path / "sketch.pgs"
+    sketch.save(path)
+    _with_version(path, VERSION + 1)
+
+    with pytest.raises(ValueError, match=f"format version {VERSION + 1}"):
+        Problem.load(path)
@@ -0,0 +1,92 @@
+"""Streaming solve tests."""
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pygeosolve import Problem
+from pygeosolve.pipeline import SolveTimeout, solve_stream
+
+
+def _sketch(length):
+    problem = Problem()
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1, 1))
+    problem.constrain_line_length("l2", length)
+    return problem
+
+
+def _items(lengths, taken):
+    for length in lengths:
+        taken.append(length)
+        yield length
+
+
+def test_solve_stream(tolerance):
+    lengths = [1, 2, -1, 3]
+    results = list(solve_stream(lengths, load=_sketch))
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert [result.success for result in results] == [True, True, False, True]
+    assert isinstance(results[2].error, ValueError)
+    assert results[3].problem["l2"].length() == pytest.approx(3, abs=tolerance)
+
+
+@pytest.mark.parametrize("ordered", (False, True))
+def test_solve_stream_parallel(ordered):
+    lengths = list(range(1, 11))
+    taken = []
+
+    with ThreadPoolExecutor(2) as executor:
+        stream = solve_stream(
+            _items(lengths, taken),
+            load=_sketch,
+            executor=executor,
+            max_pending=3,
+            ordered=ordered,
+        )
+        first = next(stream)
+        # Items are only taken as there is capacity for them.
+        assert len(taken) <= 4
+        results = [first, *stream]
+
+    indices = [result.index for result in results]
+    assert sorted(indices) == list(range(10))
+    if ordered:
+        assert indices == list(range(10))
+    assert all(result.success for result in results)
+    assert [result.item for result in sorted(results, key=lambda r: r.index)] == lengths
+
+
+def test_solve_stream_timeout():
+    """An item reaching its time limit keeps its result, with the best solution
+    found applied."""
+    with pytest.warns(UserWarning, match="deadline reached"):
+        results = list(
+            solve_stream([2], load=_sketch, timeout=0, construct=False, check=False)
+        )
+
+    (result,) = results
+    assert result.timed_out
+    assert not result.success
+    assert isinstance(result.error, SolveTimeout)
+    assert result.result.stopped == "deadline reached"
+    assert result.problem.error() == pytest.approx(result.result.error)
+
+
+def test_solve_stream_timeout_not_reached():
+    (result,) = solve_stream([2], load=_sketch, timeout=60)
+
+    assert result.success
+    assert not result.timed_out
+
+
+def test_solve_stream_processes(tmp_path):
+    paths = []
+    for length in (1, 2):
+        path = tmp_path / f"{length}.pgs"
+        _sketch(length).save(path)
+        paths.append(path)
+
+    results = list(solve_stream(paths, workers=2, ordered=True))
+
+    assert [result.success for result in results] == [True, True]
+    assert results[1].problem["l2"].length() == pytest.approx(2, abs=1e-3)
@@ -1,10 +1,13 @@
 """Triangle tests."""
 
 import math
+import numpy as np
 import pytest
+from pygeosolve import Problem, solve_many
+from pygeosolve.constraints import PointToPointDistanceConstraint
 
 
-def test_triangle__right_to_equilateral(problem, tolerance):
+def test_triangle__right_to_equilateral(problem, method, tolerance):
     """Right angled triangle constrained to be equilateral."""
     problem.add_line("l1", (0, 0), (1, 0))
     problem.add_line("l2", problem["l1"].end, (1, 1))
@@ -14,7 +17,7 @@ def test_triangle__right_to_equilateral(problem, tolerance):
     problem.constrain_line_length("l2", 1)
     problem.constrain_line_length("l3", 1)
 
-    result = problem.solve()
+    result = problem.solve(method=method)
 
     assert result.success
     # There are two solutions to the problem, with +120° or -120° angles between lines.
@@ -22,7 +25,7 @@ def test_triangle__right_to_equilateral(problem, tolerance):
     assert abs(problem["l2"].angle_to(problem["l3"])) == pytest.approx(120, abs=tolerance)
 
 
-def test_triangle__equilateral_to_right(problem, tolerance):
+def test_triangle__equilateral_to_right(problem, method, tolerance):
     """Equilateral triangle constrained to be right."""
     problem.add_line("l1", (0, 0), (1, 0))
     problem.add_line("l2", problem["l1"].end, (0.5, math.sqrt(3) / 2))
@@ -32,7 +35,7 @@ def test_triangle__equilateral_to_right(problem, tolerance):
     problem.constrain_line_length("l2", 1)
     problem.constrain_angle_between_lines("l1", "l2", -90)
 
-    result = problem.solve()
+    result = problem.solve(method=method)
 
     assert result.success
     assert problem["l1"].angle_to(problem["l2"]) == pytest.approx(-90, abs=tolerance)
@@ -40,7 +43,7 @@ def test_triangle__equilateral_to_right(problem, tolerance):
 
 
 
-def test_square__constrained_angles(problem, tolerance):
+def test_square__constrained_angles(problem, method, tolerance):
     """Square."""
     problem.add_line("l1", (0, 0), (1, 0))
     problem.add_line("l2", problem["l1"].end, (1, 1))
@@ -55,7 +58,7 @@ def test_square__constrained_angles(problem, tolerance):
     problem.constrain_angle_between_lines("l2", "l3", -90)
     problem.constrain_angle_between_lines("l3", "l4", -90)
 
-    result = problem.solve()
+    result = problem.solve(method=method)
 
     assert result.success
     assert problem["l1"].length() == pytest.approx(1, abs=tolerance)
@@ -66,3 +69,249 @@ def test_square__constrained_angles(problem, tolerance):
     assert problem["l2"].angle_to(problem["l3"]) == pytest.approx(-90, abs=tolerance)
     assert problem["l3"].angle_to(problem["l4"]) == pytest.approx(-90, abs=tolerance)
     assert problem["l4"].angle_to(problem["l1"]) == pytest.approx(-90, abs=tolerance)
+
+
+def test_unknown_solver(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.constrain_line_length("l1", 2)
+
+    with pytest.raises(ValueError, match="unknown solver"):
+        problem.solve(method="newton")
+
+
+def _add_triangle(problem, prefix, offset):
+    l1, l2, l3 = (f"{prefix}{i}" for i in range(1, 4))
+    problem.add_line(l1, (offset, 0), (offset + 1, 0))
+    problem.add_line(l2, problem[l1].end, (offset + 1, 1))
+    problem.add_line(l3, problem[l2].end, problem[l1].start)
+    problem.constrain_position(l1)
+    problem.constrain_line_length(l2, 1)
+    problem.constrain_line_length(l3, 1)
+
+
+def test_components(problem):
+    """Clusters sharing only fixed points are independent."""
+    _add_triangle(problem, "a", 0)
+    _add_triangle(problem, "b", 5)
+    # Connect the two clusters' fixed points.
+    problem.add_line("c", problem["a1"].end, problem["b1"].start)
+    problem.constrain_line_length("c", 4)
+
+    components = problem.components()
+
+    assert [len(component) for component in components] == [2, 2]
+    assert {constraint.line.name for constraint in components[0]} == {"a2", "a3"}
+    assert {constraint.line.name for constraint in components[1]} == {"b2", "b3"}
+
+
+def test_decomposed_solve(problem, tolerance):
+    """Independent components solved in parallel."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    _add_triangle(problem, "a", 0)
+    _add_triangle(problem, "b", 5)
+
+    with ThreadPoolExecutor(2) as executor:
+        result = problem.solve(executor=executor, construct=False)
+
+    assert result.success
+    assert len(result.components) == 2
+    for name in ("a2", "a3", "b2", "b3"):
+        assert problem[name].length() == pytest.approx(1, abs=tolerance)
+
+
+def test_incremental_solve(problem, tolerance):
+    """Only components changed since the last incremental solve are re-solved."""
+    _add_triangle(problem, "a", 0)
+    _add_triangle(problem, "b", 5)
+
+    result = problem.solve(incremental=True)
+    assert result.success
+    assert len(result.components) == 2
+
+    # Nothing changed.
+    result = problem.solve(incremental=True)
+    assert result.success
+    assert len(result.components) == 0
+
+    # Change a constraint target.
+    problem.constraints[2].length = 2
+    result = problem.solve(incremental=True)
+    assert len(result.components) == 1
+    assert problem["b2"].length() == pytest.approx(2, abs=tolerance)
+    assert problem["a2"].length() == pytest.approx(1, abs=tolerance)
+
+    # Drag a point.
+    problem["a2"].end.params[0] += 0.1
+    result = problem.solve(incremental=True)
+    assert len(result.components) == 1
+    assert problem["a2"].length() == pytest.approx(1, abs=tolerance)
+
+    # Change the structure. The components are recompiled, but the one that is still
+    # satisfied is skipped.
+    problem.add_line("c", problem["a2"].end, (2, 2))
+    problem.constrain_line_length("c", 3)
+    result = problem.solve(incremental=True)
+    assert result.success
+    assert len(result.components) == 1
+    assert problem["c"].length() == pytest.approx(3, abs=tolerance)
+
+
+def test_incremental_solve__replaced_constraint(problem, tolerance):
+    """Replacing a constraint with one on different points recompiles the problem."""
+    _add_triangle(problem, "a", 0)
+    _add_triangle(problem, "b", 5)
+    assert problem.solve(incremental=True).success
+
+    # Swap a length constraint for a distance joining the two triangles' apexes.
+    apex_a, apex_b = problem["a2"].end, problem["b2"].end
+    problem.constraints[2] = PointToPointDistanceConstraint(apex_a, apex_b, 4)
+    result = problem.solve(incremental=True)
+    assert result.success
+    assert np.hypot(*(apex_a.params - apex_b.params)) == pytest.approx(
+        4, abs=tolerance
+    )
+
+
+def test_incremental_solve__edits(problem, tolerance):
+    """Edits only re-solve and re-evaluate the components they affect, and edited
+    constraints between fixed points are still checked."""
+    _add_triangle(problem, "a", 0)
+    _add_triangle(problem, "b", 5)
+    assert problem.solve(incremental=True).success
+
+    # A weight edit alone leaves the solution unchanged.
+    problem.constraints[2].weight = 2
+    result = problem.solve(incremental=True)
+    assert result.success
+    assert len(result.components) == 0
+
+    # Move the other triangle's free point far away, so its error dominates until
+    # re-solved.
+    problem["a2"].end.params[:] = 100
+    result = problem.solve(incremental=True)
+    assert len(result.components) == 1
+    assert result.success
+    assert result.error == pytest.approx(problem.error(), abs=tolerance)
+
+    # The fixed line's length is a constraint between fixed points.
+    problem.constrain_line_length("a1", 1)
+    fixed = problem.constraints[-1]
+    assert problem.solve(incremental=True).success
+    fixed.length = 2
+    with pytest.raises(ValueError, match="between fixed points are violated"):
+        problem.solve(incremental=True)
+
+
+def test_solve_batch(problem, tolerance):
+    """Many instances with the same structure and different targets."""
+    problem.add_line("a", (0, 0), (30, 0))
+    problem.add_line("b", problem["a"].start, (15, 15))
+    problem.constrain_position("a")
+    problem.constrain_line_length("b", 30)
+    problem.constrain_angle_between_lines("a", "b", 90)
+
+    lengths = np.linspace(10, 50, 5)
+    angles = np.linspace(60, 120, 5)
+    result = problem.solve_batch(targets=np.column_stack((lengths, angles)))
+
+    assert result.success.all()
+    assert result.x.shape == (5, 2)
+
+    # The problem itself is unchanged.
+    assert problem["b"].end.params.tolist() == [15, 15]
+
+    end = list(problem.points).index(problem["b"].end)
+
+    for coordinates, length, angle in zip(result.coordinates, lengths, angles):
+        single = Problem()
+        single.add_line("a", (0, 0), (30, 0))
+        single.add_line("b", single["a"].start, (15, 15))
+        single.constrain_position("a")
+        single.constrain_line_length("b", length)
+        single.constrain_angle_between_lines("a", "b", angle)
+        single.solve()
+
+        assert coordinates[end] == pytest.approx(single["b"].end.params, abs=tolerance)
+
+
+def test_solve_batch__shapes(problem):
+    """Targets and positions must have a column for each constraint and free
+    parameter."""
+    problem.add_line("a", (0, 0), (30, 0))
+    problem.add_line("b", problem["a"].start, (15, 15))
+    problem.constrain_position("a")
+    problem.constrain_line_length("b", 30)
+    problem.constrain_angle_between_lines("a", "b", 90)
+
+    with pytest.raises(ValueError, match=r"targets must have shape \(b, 2\)"):
+        problem.solve_batch(targets=np.ones((5, 3)))
+
+    with pytest.raises(ValueError, match=r"targets must have shape \(b, 2\)"):
+        problem.solve_batch(targets=np.ones(5))
+
+    with pytest.raises(ValueError, match=r"positions must have shape \(b, 2\)"):
+        problem.solve_batch(positions=np.ones((5, 4)))
+
+
+def test_parallel_basinhopping_is_deterministic(tolerance):
+    """Multiple basinhopping starts in parallel give the same result for a seed."""
+    results = []
+
+    for _ in range(2):
+        problem = Problem()
+        _add_triangle(problem, "a", 0)
+        result = problem.solve(method="basinhopping", workers=2, seed=42, niter=4)
+        assert result.success
+        assert problem["a2"].length() == pytest.approx(1, abs=tolerance)
+        results.append(result.x)
+
+    assert np.array_equal(*results)
+
+
+def test_free_params_layout(problem):
+    """Free parameters are ordered by point then parameter."""
+    _add_triangle(problem, "a", 0)
+
+    assert problem.points == [problem["a1"].start, problem["a1"].end, problem["a2"].end]
+    assert problem.free_params.tolist() == [[2, 0], [2, 1]]
+    assert problem.free_values.tolist() == [1, 1]
+
+
+def test_save_load_solution(tmp_path):
+    path = tmp_path / "solution.npz"
+
+    problem = Problem()
+    _add_triangle(problem, "a", 0)
+    problem.solve()
+    problem.save_solution(path)
+    solved = problem.free_values
+
+    problem = Problem()
+    _add_triangle(problem, "a", 0)
+    problem.load_solution(path)
+    assert np.array_equal(problem.free_values, solved)
+
+    problem = Problem()
+    _add_triangle(problem, "a", 0)
+    problem.add_line("c", (5, 5), (6, 6))
+    with pytest.raises(ValueError, match="does not match"):
+        problem.load_solution(path)
+
+
+def test_solve_many(tolerance):
+    problems = []
+
+    for length in (1, 2, 3):
+        problem = Problem()
+        problem.add_line("a", (0, 0), (1, 0))
+        problem.add_line("b", problem["a"].end, (2, 1))
+        problem.constrain_position("a")
+        problem.constrain_line_length("b", length)
+        problems.append(problem)
+
+    results = solve_many(problems, workers=2)
+
+    assert all(result.success for result in results)
+    for problem, length in zip(problems, (1, 2, 3)):
+        assert problem["b"].length() == pytest.approx(length, abs=tolerance)
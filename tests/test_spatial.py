@@ -0,0 +1,78 @@
+"""Spatial index tests."""
+
+import numpy as np
+import pytest
+from pygeosolve import Problem
+from pygeosolve.geometry import PointStore
+from pygeosolve.spatial import SpatialIndex, coincident_groups
+
+
+def test_spatial_index():
+    rng = np.random.default_rng(0)
+    store = PointStore()
+    store.extend(rng.random((500, 2)))
+    index = SpatialIndex(store)
+    queries = rng.random((20, 2))
+
+    def brute_nearest(coords):
+        distances = np.hypot(*(store.coords - coords).T)
+        return distances.min(), distances.argmin()
+
+    distances, indices = index.nearest(queries)
+    expected = [brute_nearest(query) for query in queries]
+    assert distances == pytest.approx([distance for distance, _ in expected])
+    assert indices.tolist() == [i for _, i in expected]
+
+    # Points added after the tree was built are found.
+    added = store.add(0.5, 0.5)
+    assert index.nearest((0.5, 0.5 + 1e-9))[1] == added
+    assert added in index.within((0.5, 0.5), 1e-6)
+
+    # Moved points are found at their new positions.
+    store.coords[0] = (10, 10)
+    assert index.nearest((10, 10), max_distance=1e-6)[1] == 0
+    assert index.nearest((20, 20), max_distance=1)[1] == -1
+
+    radius = np.hypot(*(store.coords - (0.2, 0.3)).T)
+    assert (
+        index.within((0.2, 0.3), 0.1).tolist() == np.flatnonzero(radius <= 0.1).tolist()
+    )
+
+    box = np.all((store.coords >= (0.1, 0.4)) & (store.coords <= (0.3, 0.9)), axis=1)
+    assert index.in_box(0.1, 0.4, 0.3, 0.9).tolist() == np.flatnonzero(box).tolist()
+
+
+def test_coincident_groups():
+    coords = [(0, 0), (1, 1), (0, 1e-7), (1, 1 + 1e-7), (0, 2e-7), (5, 5)]
+    assert coincident_groups(coords, 1e-6).tolist() == [0, 1, 0, 1, 0, 5]
+
+
+def test_problem_queries():
+    problem = Problem()
+    problem.add_line("a", (0, 0), (1, 0))
+    problem.add_line("b", (1, 1e-9), (1, 1), merge=1e-6)
+    problem.add_line("c", (1, 1), (2, 2))
+
+    assert problem["b"].start == problem["a"].end
+    # Lines only share points when merging.
+    assert problem["c"].start != problem["b"].end
+    assert problem.nearest_point(0.9, 0.1) == problem["a"].end
+    assert problem.nearest_point(5, 5, max_distance=1) is None
+    assert problem.points_within(0, 0, 1) == [problem["a"].start, problem["a"].end]
+    assert problem.points_in_box(1.5, 1.5, 3, 3) == [problem["c"].end]
+
+    indices = problem.add_points([(2, 2), (3, 3), (3, 3 + 1e-9)], merge=1e-6)
+    assert indices.tolist() == [problem["c"].end.index, 5, 5]
+    assert len(problem.points) == 6
+
+
+def test_merge_is_transitive():
+    """A chain of close coordinates shares the existing point near any of them."""
+    problem = Problem()
+    problem.add_points([(0, 0), (10, 0)])
+
+    indices = problem.add_points([(1.6, 0), (5, 5), (0.8, 0), (5.5, 5)], merge=1)
+
+    assert indices.tolist() == [0, 2, 0, 2]
+    assert len(problem.points) == 3
+    assert problem.points[2].params.tolist() == [5, 5]
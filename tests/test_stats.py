@@ -0,0 +1,102 @@
+"""Solver statistics tests."""
+
+import pytest
+
+
+@pytest.fixture
+def triangle(problem):
+    problem.add_line("l1", (0, 0), (1, 0))
+    problem.add_line("l2", problem["l1"].end, (1, 1))
+    problem.add_line("l3", problem["l2"].end, problem["l1"].start)
+    problem.constrain_position("l1")
+    problem.constrain_line_length("l2", 1)
+    problem.constrain_angle_between_lines("l1", "l2", -120)
+    return problem
+
+
+def test_stats(triangle):
+    evaluations = []
+    events = []
+
+    result = triangle.solve(
+        construct=False,
+        progress=lambda stats: evaluations.append(stats.error),
+        sink=lambda event, data: events.append(event),
+    )
+
+    stats = result.stats
+    assert stats.evaluations == len(evaluations) == len(stats.trace)
+    assert stats.jacobian_evaluations > 0
+    assert stats.trace[-1] == pytest.approx(0, abs=1e-12)
+    assert stats.trace == evaluations
+    assert {"compile", "update", "LineLengthConstraint", "LineAngleConstraint"} <= set(
+        stats.times
+    )
+    assert stats.wall_time >= sum(
+        stats.times[key] for key in ("compile", "update", "LineLengthConstraint")
+    )
+    assert events == ["start", "finish"]
+
+
+def test_basinhopping_hop_stats(triangle):
+    result = triangle.solve(
+        method="basinhopping", construct=False, niter=3, seed=1, target=None
+    )
+
+    stats = result.stats
+    # Newer versions of scipy also report the initial minimisation as a hop.
+    assert len(stats.hops) in (3, 4)
+    assert stats.iterations == sum(hop["iterations"] for hop in stats.hops) > 0
+    assert all(hop["evaluations"] > 0 for hop in stats.hops)
+
+
+def test_basinhopping_stops_at_target(triangle):
+    result = triangle.solve(method="basinhopping", construct=False, niter=100, seed=1)
+
+    assert result.success
+    assert result.stopped == "target reached"
+    assert len(result.stats.hops) < 100
+
+
+def test_patience(triangle):
+    result = triangle.solve(
+        method="basinhopping",
+        construct=False,
+        niter=100,
+        seed=1,
+        target=None,
+        patience=50,
+    )
+
+    assert result.stopped == "no improvement"
+    assert result.success
+    assert triangle.error() == pytest.approx(result.stats.best_error)
+
+
+def test_timeout(triangle):
+    result = triangle.solve(
+        method="basinhopping", construct=False, niter=100000, target=None, timeout=0.1
+    )
+
+    assert result.stopped == "deadline reached"
+    assert result.stats.wall_time < 1
+    # The best solution found is applied.
+    assert triangle.error() == pytest.approx(result.stats.best_error)
+
+
+def test_failed_solve_applies_best(problem):
+    """The best solution found is applied even when it doesn't satisfy the
+    constraints."""
+    problem.add_line("a", (0, 0), (1, 0))
+    problem.constrain_position("a")
+    problem.add_line("b", problem["a"].end, (1.2, 0.5))
+    problem.constrain_line_length("b", 1)
+    problem.constrain_line_length("b", 3, weight=2)
+
+    with pytest.warns(UserWarning, match="best solution found was applied"):
+        result = problem.solve(construct=False)
+
+    assert not result.success
+    # The conflicting lengths settle nearer the more heavily weighted one.
+    assert problem["b"].length() == pytest.approx(2.6, abs=1e-3)
+    assert problem.error() == pytest.approx(result.components[0].error)